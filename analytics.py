@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import csv
+
+from storage import write_json_atomic
+from timetable import format_time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SEAT_CLASSES = ("Primeira Classe", "Classe Executiva", "Classe Econômica")
+DAY_SECONDS = 86400
+
+
+class Codes:
+    # Maps labels to consecutive integer codes in first-seen order
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def code(self, label):
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+def plane_type_label(plane):
+    model_name, executive, business, economy = plane.get_plane_key()
+    return f"{model_name} ({executive}/{business}/{economy})"
+
+
+def day_label(departure_ts):
+    return "N/A" if departure_ts is None else format_time(departure_ts)[:10]
+
+
+def flight_columns(flights):
+    # One pass over the Flight objects; everything after this works on columns.
+    destinations, plane_types, days = Codes(), Codes(), Codes()
+    columns = {"capacity": [], "booked": [], "hours": [], "destination": [], "plane_type": [], "day": []}
+    for flight in flights:
+        distribution = flight.plane.get_seat_distribution()
+        available = flight.seats.snapshot()
+        capacity = [distribution.get(seat_class, 0) for seat_class in SEAT_CLASSES]
+        columns["capacity"].append(capacity)
+        columns["booked"].append([max(seats - available.get(seat_class, seats), 0) for seat_class, seats in zip(SEAT_CLASSES, capacity)])
+        if flight.departure_ts is not None and flight.arrival_ts is not None:
+            columns["hours"].append(max(flight.arrival_ts - flight.departure_ts, 0) / 3600)
+        else:
+            columns["hours"].append(0.0)
+        columns["destination"].append(destinations.code(flight.destination))
+        columns["plane_type"].append(plane_types.code(plane_type_label(flight.plane)))
+        day = None if flight.departure_ts is None else flight.departure_ts // DAY_SECONDS
+        columns["day"].append(days.code(day))
+    labels = {
+        "destination": destinations.labels,
+        "plane_type": plane_types.labels,
+        "day": [day_label(None if day is None else day * DAY_SECONDS) for day in days.labels],
+    }
+    return columns, labels
+
+
+def group_rows(group, labels, flights, capacity, booked, seat_hours, booked_seat_hours):
+    rows = []
+    for index, label in enumerate(labels):
+        rows.append({
+            group: label,
+            "flights": int(flights[index]),
+            "capacity": int(capacity[index]),
+            "booked": int(booked[index]),
+            "load_factor": round(booked[index] / capacity[index], 4) if capacity[index] else None,
+            "seat_hours": round(float(seat_hours[index]), 2),
+            "booked_seat_hours": round(float(booked_seat_hours[index]), 2),
+        })
+    if group == "day":
+        rows.sort(key=lambda row: row["day"])
+    return rows
+
+
+def aggregate_numpy(columns, labels):
+    capacity = np.asarray(columns["capacity"], dtype=np.int64).reshape(-1, len(SEAT_CLASSES))
+    booked = np.asarray(columns["booked"], dtype=np.int64).reshape(-1, len(SEAT_CLASSES))
+    hours = np.asarray(columns["hours"], dtype=np.float64)
+    flight_capacity = capacity.sum(axis=1)
+    flight_booked = booked.sum(axis=1)
+    seat_hours = flight_capacity * hours
+    booked_seat_hours = flight_booked * hours
+
+    by_class = [
+        {"seat_class": seat_class, "capacity": int(capacity[:, index].sum()), "booked": int(booked[:, index].sum())}
+        for index, seat_class in enumerate(SEAT_CLASSES)
+    ]
+    groups = {}
+    for group in ("destination", "plane_type", "day"):
+        codes = np.asarray(columns[group], dtype=np.int64)
+        size = len(labels[group])
+        groups[group] = group_rows(
+            group, labels[group],
+            np.bincount(codes, minlength=size),
+            np.bincount(codes, weights=flight_capacity, minlength=size),
+            np.bincount(codes, weights=flight_booked, minlength=size),
+            np.bincount(codes, weights=seat_hours, minlength=size),
+            np.bincount(codes, weights=booked_seat_hours, minlength=size),
+        )
+    totals = (int(flight_capacity.sum()), int(flight_booked.sum()), float(seat_hours.sum()), float(booked_seat_hours.sum()))
+    return by_class, groups, totals
+
+
+def aggregate_python(columns, labels):
+    by_class = [{"seat_class": seat_class, "capacity": 0, "booked": 0} for seat_class in SEAT_CLASSES]
+    sums = {group: [[0] * len(labels[group]) for _ in range(5)] for group in ("destination", "plane_type", "day")}
+    totals = [0, 0, 0.0, 0.0]
+    for row, (capacity, booked, hours) in enumerate(zip(columns["capacity"], columns["booked"], columns["hours"])):
+        for index, entry in enumerate(by_class):
+            entry["capacity"] += capacity[index]
+            entry["booked"] += booked[index]
+        flight_capacity, flight_booked = sum(capacity), sum(booked)
+        values = (1, flight_capacity, flight_booked, flight_capacity * hours, flight_booked * hours)
+        for group, group_sums in sums.items():
+            code = columns[group][row]
+            for column, value in zip(group_sums, values):
+                column[code] += value
+        totals[0] += flight_capacity
+        totals[1] += flight_booked
+        totals[2] += values[3]
+        totals[3] += values[4]
+    groups = {group: group_rows(group, labels[group], *group_sums) for group, group_sums in sums.items()}
+    return by_class, groups, tuple(totals)
+
+
+def load_factor_report(flights):
+    # Load factors (booked / capacity) per seat class, destination, plane type
+    # and departure day, with seat-hour capacity totals. The data has no route
+    # distances, so block hours stand in for kilometres: seat_hours is
+    # seats x scheduled flight time.
+    columns, labels = flight_columns(flights)
+    if np is not None and columns["capacity"]:
+        by_class, groups, totals = aggregate_numpy(columns, labels)
+    else:
+        by_class, groups, totals = aggregate_python(columns, labels)
+    for entry in by_class:
+        entry["load_factor"] = round(entry["booked"] / entry["capacity"], 4) if entry["capacity"] else None
+    capacity, booked, seat_hours, booked_seat_hours = totals
+    return {
+        "flights": len(columns["hours"]),
+        "capacity": capacity,
+        "booked": booked,
+        "load_factor": round(booked / capacity, 4) if capacity else None,
+        "seat_hours": round(seat_hours, 2),
+        "booked_seat_hours": round(booked_seat_hours, 2),
+        "by_class": by_class,
+        "by_destination": groups["destination"],
+        "by_plane_type": groups["plane_type"],
+        "by_day": groups["day"],
+    }
+
+
+def export_report(report, filename):
+    # .csv gets one row per group entry (a "group" column says which table it
+    # belongs to); anything else is written as JSON.
+    if not filename.lower().endswith(".csv"):
+        write_json_atomic(filename, report)
+        return
+    fields = ["group", "key", "flights", "capacity", "booked", "load_factor", "seat_hours", "booked_seat_hours"]
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerow({"group": "total", "key": "", **report})
+        for group, key in (("by_class", "seat_class"), ("by_destination", "destination"), ("by_plane_type", "plane_type"), ("by_day", "day")):
+            for row in report[group]:
+                writer.writerow({"group": group, "key": row[key], **row})
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import json
+import math
+
+from timetable import destination_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_WEIGHT = 23
+MAX_TOTAL_SIZE = 158
+
+# Rejection codes used by baggage_errors; 0 means accepted
+BAGGAGE_OK, BAD_WEIGHT, BAD_DIMENSIONS, TOO_HEAVY, TOO_LARGE = range(5)
+
+
+class BaggageLimits:
+    # Weight (kg) and total size (length + width + height, cm) limits. A
+    # route (destination) entry wins over a seat class entry, which wins over
+    # the default; an entry may set only one of the two limits.
+    def __init__(self, default=None, by_class=None, by_route=None):
+        self.default = {"max_weight": MAX_WEIGHT, "max_total_size": MAX_TOTAL_SIZE, **(default or {})}
+        self.by_class = dict(by_class or {})
+        self.by_route = {destination_key(route): limits for route, limits in (by_route or {}).items()}
+
+    @classmethod
+    def from_file(cls, filename):
+        # {"default": {...}, "by_class": {"Primeira Classe": {...}}, "by_route": {"Funchal": {...}}}
+        with open(filename, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        return cls(data.get("default"), data.get("by_class"), data.get("by_route"))
+
+    def limits_for(self, seat_class=None, destination=None):
+        limits = dict(self.default)
+        limits.update(self.by_class.get(seat_class, {}))
+        if destination is not None:
+            limits.update(self.by_route.get(destination_key(destination), {}))
+        return limits["max_weight"], limits["max_total_size"]
+
+
+def baggage_error(weight, length, width, height, max_weight, max_total_size):
+    if weight <= 0:
+        return BAD_WEIGHT
+    if length <= 0 or width <= 0 or height <= 0:
+        return BAD_DIMENSIONS
+    if weight > max_weight:
+        return TOO_HEAVY
+    if length + width + height > max_total_size:
+        return TOO_LARGE
+    return BAGGAGE_OK
+
+
+def baggage_errors(weights, lengths, widths, heights, max_weights, max_total_sizes):
+    # Same checks as baggage_error over whole columns; one code per bag
+    if np is None or not weights:
+        return [baggage_error(*bag) for bag in zip(weights, lengths, widths, heights, max_weights, max_total_sizes)]
+    weights = np.asarray(weights, dtype=np.float64)
+    dimensions = np.column_stack([np.asarray(column, dtype=np.float64) for column in (lengths, widths, heights)])
+    codes = np.select(
+        [weights <= 0, (dimensions <= 0).any(axis=1),
+         weights > np.asarray(max_weights, dtype=np.float64),
+         dimensions.sum(axis=1) > np.asarray(max_total_sizes, dtype=np.float64)],
+        [BAD_WEIGHT, BAD_DIMENSIONS, TOO_HEAVY, TOO_LARGE],
+        BAGGAGE_OK,
+    )
+    return codes.tolist()
+
+
+def baggage_message(code, max_weight, max_total_size):
+    if code == BAD_WEIGHT:
+        return "O peso deve ser um valor positivo."
+    if code == BAD_DIMENSIONS:
+        return "As dimensões devem ser valores positivos."
+    if code == TOO_HEAVY:
+        return f"Peso da bagagem ultrapassa o limite máximo de {max_weight} kg."
+    if code == TOO_LARGE:
+        return f"Tamanho total da bagagem ultrapassa o limite máximo de {max_total_size} cm."
+    return None
+
+
+def parse_measure(value):
+    # float() that also refuses NaN and infinities; None when invalid
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from datagen import dataset_records, write_dataset
+from main import Flight, FlightManager, Passenger, PassengerManager, PassengerTable, Plane, PlaneManager
+from storage import JsonStore, SQLiteDatabase, import_json, iter_json_array
+
+
+def timed(function, *args):
+    # Unrounded seconds, so rates are computed from the real delta
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def rounded(results):
+    # Rounds the *_seconds timings for display
+    return {key: round(value, 4) if key.endswith("_seconds") and isinstance(value, float) else value
+            for key, value in results.items()}
+
+
+class LockStats(threading.local):
+    # Per thread, so recording does not add contention of its own
+    def __init__(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait = 0.0
+        self.hold = 0.0
+
+
+class TimedLock:
+    # Stands in for a seat inventory's lock and records, for the calling
+    # thread, whether it was already taken, how long acquiring it waited and
+    # how long it was then held
+    def __init__(self, stats):
+        self.lock = threading.Lock()
+        self.stats = stats
+        self.acquired_at = 0.0
+
+    def __enter__(self):
+        start = time.perf_counter()
+        if not self.lock.acquire(blocking=False):
+            self.stats.contended += 1
+            self.lock.acquire()
+        self.acquired_at = time.perf_counter()
+        self.stats.acquisitions += 1
+        self.stats.wait += self.acquired_at - start
+        return self
+
+    def __exit__(self, *exc_info):
+        held = time.perf_counter() - self.acquired_at
+        self.lock.release()
+        self.stats.hold += held
+
+
+def bench_seats(threads, flights=50, seats_per_class=2000, seed=42):
+    # Threads reserve seats at random until every flight is full. Threads
+    # take turns under the GIL, so bookings_per_second does not grow with
+    # threads: it is the cost of a reservation including the hand-offs
+    # between threads. What the request cares about, how much the per-flight
+    # locks get in each other's way, is measured on the locks themselves:
+    # the share of acquisitions that found the lock taken and the mean time
+    # spent waiting for and holding it.
+    plane = Plane("Bench", 1, seats_per_class, seats_per_class, seats_per_class)
+    all_flights = [Flight(i, "Lisboa", "2025-01-01 10:00", "2025-01-01 12:00", plane) for i in range(1, flights + 1)]
+    stats = LockStats()
+    for flight in all_flights:
+        flight.seats.lock = TimedLock(stats)
+    seat_classes = list(all_flights[0].available_seats)
+    capacity = flights * len(seat_classes) * seats_per_class
+    booked = [0] * threads
+    lock_totals = []
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        open_targets = [(flight, seat_class) for flight in all_flights for seat_class in seat_classes]
+        while open_targets:
+            position = rng.randrange(len(open_targets))
+            flight, seat_class = open_targets[position]
+            if flight.seats.reserve(seat_class):
+                booked[index] += 1
+            else:
+                open_targets[position] = open_targets[-1]
+                open_targets.pop()
+        lock_totals.append((stats.acquisitions, stats.contended, stats.wait, stats.hold))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    remaining = sum(sum(flight.available_seats.values()) for flight in all_flights)
+    negative = any(seats < 0 for flight in all_flights for seats in flight.available_seats.values())
+    acquisitions, contended, wait, hold = (sum(values) for values in zip(*lock_totals))
+    return {
+        "benchmark": "seats",
+        "threads": threads,
+        "capacity": capacity,
+        "booked": sum(booked),
+        "oversold": sum(booked) - capacity if sum(booked) > capacity else 0,
+        "consistent": sum(booked) + remaining == capacity and not negative,
+        "seconds": round(elapsed, 4),
+        "bookings_per_second": round(sum(booked) / elapsed) if elapsed else None,
+        "lock_acquisitions": acquisitions,
+        "lock_contended_share": round(contended / acquisitions, 4) if acquisitions else 0,
+        "mean_lock_wait_us": round(wait / acquisitions * 1e6, 3) if acquisitions else 0,
+        "mean_lock_hold_us": round(hold / acquisitions * 1e6, 3) if acquisitions else 0,
+    }
+
+
+def bench_snapshot(passengers):
+    records = list(dataset_records(passengers)[2])
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "passengers.json")
+        json_store = JsonStore(filename, "passenger_id")
+        snapshot_store = JsonStore(filename, "passenger_id", snapshot=True)
+
+        _, json_save = timed(json_store.save_all, records)
+        _, snapshot_save = timed(snapshot_store.write_snapshot, records)
+        _, json_load = timed(json_store.load)
+        _, stream_load = timed(lambda: sum(1 for _ in iter_json_array(filename)))
+        _, snapshot_load = timed(snapshot_store.load)
+
+        manager = PassengerManager(store=json_store)
+        _, json_manager_load = timed(manager.load_passengers)
+        manager = PassengerManager(store=snapshot_store)
+        _, snapshot_manager_load = timed(manager.load_passengers)
+
+        return rounded({
+            "benchmark": "snapshot",
+            "passengers": passengers,
+            "json_bytes": os.path.getsize(filename),
+            "snapshot_bytes": os.path.getsize(snapshot_store.snapshot_filename),
+            "json_save_seconds": json_save,
+            "snapshot_save_seconds": snapshot_save,
+            "json_load_seconds": json_load,
+            "json_stream_load_seconds": stream_load,
+            "snapshot_load_seconds": snapshot_load,
+            "json_manager_load_seconds": json_manager_load,
+            "snapshot_manager_load_seconds": snapshot_manager_load,
+        })
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = build()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return result, used
+
+
+def bench_memory(passengers):
+    # Decoded from JSON text like a real load, so every record owns its strings
+    lines = [json.dumps(record) for record in dataset_records(passengers)[2]]
+
+    def build_objects():
+        return [Passenger(**json.loads(line)) for line in lines]
+
+    def build_table():
+        table = PassengerTable()
+        for line in lines:
+            table.add(**json.loads(line))
+        return table
+
+    objects, object_bytes = measure_memory(build_objects)
+    table, table_bytes = measure_memory(build_table)
+    # The manager's id index holds one row view per passenger on top of the columns
+    _, views_bytes = measure_memory(lambda: [p for p in table])
+    return {
+        "benchmark": "memory",
+        "passengers": passengers,
+        "object_bytes_per_passenger": round(object_bytes / passengers, 1),
+        "table_bytes_per_passenger": round(table_bytes / passengers, 1),
+        "table_with_views_bytes_per_passenger": round((table_bytes + views_bytes) / passengers, 1),
+        "same_records": all(a.to_dict() == b.to_dict() for a, b in zip(objects, table)),
+    }
+
+
+def open_managers(directory, backend, database=None, columnar=False):
+    if backend == "sqlite":
+        stores = {name: database.store(name) for name in ("planes", "flights", "passengers")}
+    else:
+        journal, snapshot = backend == "journal", backend == "snapshot"
+        stores = {
+            name: JsonStore(os.path.join(directory, f"{name}.json"), key, journal=journal, snapshot=snapshot)
+            for name, key in (("planes", "ID"), ("flights", "flight_id"), ("passengers", "passenger_id"))
+        }
+    plane_manager = PlaneManager(store=stores["planes"])
+    flight_manager = FlightManager(plane_manager, store=stores["flights"])
+    passenger_manager = PassengerManager(store=stores["passengers"], columnar=columnar)
+    return plane_manager, flight_manager, passenger_manager
+
+
+def bench_scale(passengers, backend="json", ops=1000, write_ops=20, seed=42, columnar=False):
+    # Generates a dataset, then times each manager's load and save plus
+    # lookups, name search, booking and check-in. Read operations run ops
+    # times; single writes run write_ops times because without a journal or
+    # SQLite every one of them rewrites the whole file.
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        counts, results["generate_seconds"] = timed(write_dataset, directory, None, None, passengers, seed, backend == "snapshot")
+        database = None
+        if backend == "sqlite":
+            database = SQLiteDatabase(os.path.join(directory, "airport.db"))
+            for name, key in (("planes", "ID"), ("flights", "flight_id"), ("passengers", "passenger_id")):
+                import_json(database.store(name), os.path.join(directory, f"{name}.json"))
+        plane_manager, flight_manager, passenger_manager = open_managers(directory, backend, database, columnar)
+
+        _, results["load_planes_seconds"] = timed(plane_manager.load_planes)
+        _, results["load_flights_seconds"] = timed(flight_manager.load_flights)
+        _, results["load_passengers_seconds"] = timed(passenger_manager.load_passengers)
+        _, results["restore_seats_seconds"] = timed(flight_manager.restore_seat_assignments, passenger_manager.passengers)
+
+        all_passengers = list(passenger_manager.passengers_by_id.values())
+        sample = [rng.choice(all_passengers) for _ in range(ops)]
+        ids = [passenger.passenger_id for passenger in sample]
+        passports = [passenger.passport_number for passenger in sample]
+        flight_ids = [rng.randint(1, counts["flights"]) for _ in range(ops)]
+        queries = [passenger.name[:rng.randint(2, len(passenger.name))] for passenger in sample]
+
+        def per_second(function, arguments):
+            _, seconds = timed(lambda: [function(argument) for argument in arguments])
+            return round(len(arguments) / seconds) if seconds else None
+
+        results["passenger_id_lookups_per_second"] = per_second(passenger_manager.find_passenger_by_id, ids)
+        results["passport_lookups_per_second"] = per_second(passenger_manager.find_passenger_by_passport, passports)
+        results["flight_id_lookups_per_second"] = per_second(flight_manager.find_flight_by_id, flight_ids)
+        results["name_searches_per_second"] = per_second(lambda query: passenger_manager.find_passengers(name=query, limit=20), queries)
+        if database:
+            # The same lookups as indexed queries, without the loaded managers
+            flights = [flight_manager.find_flight_by_id(flight_id) for flight_id in flight_ids]
+            passenger_store, flight_store = database.store("passengers"), database.store("flights")
+            results["sqlite_passport_queries_per_second"] = per_second(
+                lambda passport: passenger_store.find(passport_number=passport), passports)
+            results["sqlite_flight_passenger_queries_per_second"] = per_second(
+                lambda flight_id: passenger_store.find(flight_id=flight_id), flight_ids)
+            results["sqlite_departure_window_queries_per_second"] = per_second(
+                lambda flight: flight_store.find("departure_time", flight.departure_time[:10], flight.departure_time,
+                                                 destination=flight.destination), flights)
+
+        # Bookings go to unbooked passengers on flights with free economy seats
+        unbooked = [passenger for passenger in all_passengers if passenger.flight_id is None]
+        open_flights = [flight for flight in flight_manager.flights if flight.available_seats.get("Classe Econômica", 0) > 0]
+        bookings = [(passenger.passenger_id, rng.choice(open_flights).flight_id, "3") for passenger in unbooked[:ops + write_ops]] if open_flights else []
+        batch, single = bookings[:ops], bookings[ops:]
+        if batch:
+            booked, seconds = timed(passenger_manager.book_flights, batch, flight_manager)
+            results["batch_booking_seconds"] = seconds
+            results["batch_booking_size"] = len(batch)
+            results["batch_booking_ok"] = all(result["ok"] for result in booked)
+        if single:
+            _, seconds = timed(lambda: [passenger_manager.book_flights([booking], flight_manager) for booking in single])
+            results["single_booking_seconds_each"] = round(seconds / len(single), 6)
+
+        to_check_in = [passenger.passenger_id for passenger in all_passengers if passenger.flight_id is not None and not passenger.checked_in][:write_ops]
+        if to_check_in:
+            _, seconds = timed(lambda: [passenger_manager.check_in_by_id(passenger_id, 15, 55, 35, 20) for passenger_id in to_check_in])
+            results["check_in_seconds_each"] = round(seconds / len(to_check_in), 6)
+
+        _, results["save_planes_seconds"] = timed(plane_manager.save_planes)
+        _, results["save_flights_seconds"] = timed(flight_manager.save_flights)
+        _, results["save_passengers_seconds"] = timed(passenger_manager.save_passengers)
+        if database:
+            database.close()
+
+    return {
+        "benchmark": "scale",
+        "backend": backend,
+        "columnar": columnar,
+        "seed": seed,
+        "python": platform.python_version(),
+        **counts,
+        **rounded(results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema de gestão aeroportuária")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    seats_parser = subparsers.add_parser("seats", help="Reservas concorrentes no inventário de assentos (contenção medida nos locks de cada voo)")
+    seats_parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    seats_parser.add_argument("--flights", type=int, default=50)
+    seats_parser.add_argument("--seats-per-class", type=int, default=2000)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Tempos de gravação e carregamento JSON vs snapshot binário")
+    snapshot_parser.add_argument("--passengers", type=int, nargs="+", default=[10000, 100000])
+
+    memory_parser = subparsers.add_parser("memory", help="Memória por passageiro: objetos vs tabela por colunas")
+    memory_parser.add_argument("--passengers", type=int, nargs="+", default=[100000])
+
+    scale_parser = subparsers.add_parser("scale", help="Gera dados sintéticos e mede carregamento, gravação, pesquisas, reservas e check-in")
+    scale_parser.add_argument("--passengers", type=int, nargs="+", default=[10000, 100000])
+    scale_parser.add_argument("--backend", choices=["json", "journal", "snapshot", "sqlite"], nargs="+", default=["json"])
+    scale_parser.add_argument("--ops", type=int, default=1000)
+    scale_parser.add_argument("--write-ops", type=int, default=20)
+    scale_parser.add_argument("--seed", type=int, default=42)
+    scale_parser.add_argument("--columnar", action="store_true")
+    scale_parser.add_argument("--output", metavar="FICHEIRO", help="Acrescentar também os resultados (JSON Lines) a este ficheiro")
+
+    args = parser.parse_args()
+    if args.benchmark == "seats":
+        for threads in args.threads:
+            print(json.dumps(bench_seats(threads, args.flights, args.seats_per_class)))
+    elif args.benchmark == "snapshot":
+        for passengers in args.passengers:
+            print(json.dumps(bench_snapshot(passengers)))
+    elif args.benchmark == "memory":
+        for passengers in args.passengers:
+            print(json.dumps(bench_memory(passengers)))
+    elif args.benchmark == "scale":
+        for passengers in args.passengers:
+            for backend in args.backend:
+                line = json.dumps(bench_scale(passengers, backend, args.ops, args.write_ops, args.seed, args.columnar))
+                print(line, flush=True)
+                if args.output:
+                    with open(args.output, "a") as file:
+                        file.write(line + "\n")
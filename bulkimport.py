@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
+import csv
+import functools
+import json
+import os
+
+IMPORT_FIELDS = ("name", "age", "gender", "nationality", "passport_number")
+REJECT_FIELDS = ("line", "reason", "record")
+
+
+def is_valid_passport(passport_number):
+    return passport_number.isdigit() and len(passport_number) in [8, 9]
+
+
+def read_chunks(filename, chunk_size=10000):
+    # Yields lists of (line number, raw record). CSV rows are parsed here (a
+    # quoted field may span lines); JSONL lines are left as text so the
+    # workers do the decoding.
+    chunk = []
+    if filename.lower().endswith(".csv"):
+        with open(filename, "r", newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    else:
+        with open(filename, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    chunk.append((line_number, line.strip()))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_record(raw, gender_codes):
+    # Returns the passenger fields as a tuple, or raises ValueError with the
+    # same messages register_passenger uses.
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ValueError("Linha JSON inválida.")
+        if not isinstance(raw, dict):
+            raise ValueError("Linha JSON inválida.")
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        raise ValueError("Nome em falta.")
+    age = raw.get("age")
+    if isinstance(age, str) and age.strip().isdigit():
+        age = int(age)
+    if not isinstance(age, int) or isinstance(age, bool) or age < 0:
+        raise ValueError("Idade inválida! Deve ser um número inteiro.")
+    gender = str(raw.get("gender") or "").strip()
+    gender = gender_codes.get(gender.lower(), gender)
+    if gender not in gender_codes.values():
+        raise ValueError("Gênero inválido! Deve ser 'M', 'F' ou 'O'.")
+    passport_number = str(raw.get("passport_number") or "").strip()
+    if not is_valid_passport(passport_number):
+        raise ValueError("Número de passaporte inválido! Deve ter 8 ou 9 dígitos.")
+    nationality = str(raw.get("nationality") or "").strip()
+    return name, age, gender, nationality, passport_number
+
+
+def validate_chunk(chunk, gender_codes):
+    # Runs in a worker process: (accepted [(line, fields)], rejected [(line, reason, raw)])
+    accepted, rejected = [], []
+    for line_number, raw in chunk:
+        try:
+            accepted.append((line_number, validate_record(raw, gender_codes)))
+        except ValueError as e:
+            rejected.append((line_number, str(e), raw))
+    return accepted, rejected
+
+
+def validated_chunks(filename, gender_codes, workers=None, chunk_size=10000):
+    # Validates the file's chunks across a process pool and yields the results
+    # in file order. At most two chunks per worker are in flight, so the file
+    # is never held in memory as a whole. workers=1 validates in this process.
+    workers = workers or os.cpu_count() or 1
+    validate = functools.partial(validate_chunk, gender_codes=gender_codes)
+    chunks = read_chunks(filename, chunk_size)
+    if workers == 1:
+        yield from map(validate, chunks)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(validate, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class RejectReport:
+    # CSV with the line, reason and original record of every rejected entry.
+    # The file is only created when the first rejection arrives.
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, line_number, reason, raw):
+        if self.file is None:
+            self.file = open(self.filename, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(REJECT_FIELDS)
+        record = raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False)
+        self.writer.writerow((line_number, reason, record))
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def rejects_filename_for(filename):
+    return os.path.splitext(filename)[0] + "_rejeitados.csv"
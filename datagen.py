@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import argparse
+import datetime
+import heapq
+import json
+import os
+import random
+
+from seating import SeatMap
+from storage import JsonStore, write_json_records
+from timetable import TIME_FORMAT
+
+FIRST_NAMES = [
+    "João", "Maria", "Pedro", "Ana", "Carlos", "Sofia", "Miguel", "Beatriz", "Rui", "Joana",
+    "Tiago", "Marta", "Luís", "Cláudia", "Fernando", "Carla", "Ricardo", "Patrícia",
+    "Fábio", "Sara", "Nuno", "Francisca", "Gonçalo", "Inês"
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins",
+    "Jesus", "Sousa", "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves",
+    "Almeida", "Ribeiro", "Pinto", "Carvalho", "Teixeira", "Moreira", "Correia", "Mendes"
+]
+NATIONALITIES = ["Portugal"] * 6 + ["Brasil", "Brasil", "Espanha", "França", "Angola", "Reino Unido", "Alemanha"]
+GENDERS = ["Masculino", "Feminino", "Outro"]
+DESTINATIONS = [
+    ("Porto", 1), ("Faro", 1), ("Funchal", 2), ("Ponta Delgada", 2), ("Madrid", 1), ("Paris", 2),
+    ("Londres", 2), ("Frankfurt", 3), ("Roma", 3), ("Luanda", 7), ("São Paulo", 10), ("Nova Iorque", 8)
+]
+# model, first, executive, economy
+PLANE_MODELS = [
+    ("Airbus A320", 0, 24, 150), ("Airbus A321", 0, 28, 180), ("Airbus A330", 12, 40, 240),
+    ("Boeing 737", 0, 20, 140), ("Boeing 787", 16, 48, 220), ("Embraer E195", 0, 12, 100)
+]
+SEAT_CLASSES = ("Primeira Classe", "Classe Executiva", "Classe Econômica")
+# Passports are a fixed permutation of the 9-digit range, so they are unique
+# without remembering the ones already issued.
+PASSPORT_BASE = 100000000
+PASSPORT_SPAN = 900000000
+PASSPORT_STEP = 104729
+
+
+def passport_number(index, seed):
+    return str(PASSPORT_BASE + (index * PASSPORT_STEP + seed * 7919) % PASSPORT_SPAN)
+
+
+def plane_records(count, seed=42):
+    rng = random.Random(seed)
+    records = []
+    for plane_id in range(1, count + 1):
+        model_name, first, executive, economy = rng.choice(PLANE_MODELS)
+        records.append({
+            "Modelo": model_name,
+            "ID": plane_id,
+            "Primeira Classe": first,
+            "Classe Executiva": executive,
+            "Classe Econômica": economy,
+            "Total": first + executive + economy
+        })
+    return records
+
+
+def flight_records(count, planes, seed=42, start="2025-01-01 06:00", days=365):
+    # Departures spread over days, rounded to 5 minutes; duration by
+    # destination. Each flight takes the plane that became free first, and
+    # waits for it if needed, so no plane is ever on two flights at once.
+    rng = random.Random(seed)
+    first_departure = datetime.datetime.strptime(start, TIME_FORMAT)
+    slots = days * 24 * 12
+    requests = sorted(
+        (5 * rng.randrange(slots), *rng.choice(DESTINATIONS), 5 * rng.randrange(12))
+        for _ in range(count)
+    )
+    free_at = [(0, index) for index in range(len(planes))]
+    records = []
+    for flight_id, (minute, destination, hours, extra_minutes) in enumerate(requests, 1):
+        available_minute, index = heapq.heappop(free_at)
+        minute = max(minute, available_minute)
+        departure = first_departure + datetime.timedelta(minutes=minute)
+        arrival = departure + datetime.timedelta(hours=hours, minutes=extra_minutes)
+        heapq.heappush(free_at, (minute + hours * 60 + extra_minutes, index))
+        plane = planes[index]
+        records.append({
+            "flight_id": flight_id,
+            "destination": destination,
+            "departure_time": departure.strftime(TIME_FORMAT),
+            "arrival_time": arrival.strftime(TIME_FORMAT),
+            "plane_id": plane["ID"],
+            "status": "Agendado",
+            "available_seats": {seat_class: plane[seat_class] for seat_class in SEAT_CLASSES}
+        })
+    return records
+
+
+def passenger_records(count, flights, seed=42, booked_share=0.7, checked_in_share=0.5):
+    # Yields passengers one at a time. A booked_share of them get a seat on a
+    # random flight that still has room (the flight records' available_seats
+    # are updated in place), and checked_in_share of those are checked in.
+    rng = random.Random(seed)
+    open_flights = list(flights)
+    seat_maps = {}
+    for passenger_id in range(1, count + 1):
+        record = {
+            "passenger_id": passenger_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "age": rng.randint(1, 90),
+            "gender": rng.choice(GENDERS),
+            "nationality": rng.choice(NATIONALITIES),
+            "passport_number": passport_number(passenger_id, seed),
+            "checked_in": False,
+            "baggage_weight": 0,
+            "ticket_status": "Aguardando",
+            "flight_id": None,
+            "seat_class": None,
+            "seat_number": None
+        }
+        booking = rng.random() < booked_share
+        while booking and open_flights:
+            position = rng.randrange(len(open_flights))
+            flight = open_flights[position]
+            available = flight["available_seats"]
+            classes = [seat_class for seat_class in SEAT_CLASSES if available[seat_class] > 0]
+            if not classes:
+                open_flights[position] = open_flights[-1]
+                open_flights.pop()
+                continue
+            # Mostly economy, like real demand
+            seat_class = classes[-1] if rng.random() < 0.85 else rng.choice(classes)
+            seat_map = seat_maps.get(flight["flight_id"])
+            if seat_map is None:
+                capacity = {seat_class: available[seat_class] for seat_class in SEAT_CLASSES}
+                seat_map = seat_maps[flight["flight_id"]] = SeatMap(capacity)
+            available[seat_class] -= 1
+            record.update(flight_id=flight["flight_id"], seat_class=seat_class,
+                          seat_number=seat_map.allocate(seat_class), ticket_status="Confirmado")
+            if rng.random() < checked_in_share:
+                record.update(checked_in=True, baggage_weight=round(rng.uniform(5, 23), 1), ticket_status="Verificado")
+            break
+        yield record
+
+
+def dataset_records(passengers=10000, planes=None, flights=None, seed=42):
+    # (plane records, flight records, passenger record generator). By default
+    # one flight per 100 passengers and one plane per 20 flights (at least 3).
+    # The flights' available_seats drop as the passengers are generated.
+    if flights is None:
+        flights = max(passengers // 100, 1)
+    if planes is None:
+        planes = max(flights // 20, 3)
+    plane_list = plane_records(planes, seed)
+    flight_list = flight_records(flights, plane_list, seed)
+    return plane_list, flight_list, passenger_records(passengers, flight_list, seed)
+
+
+def write_dataset(directory, planes=None, flights=None, passengers=10000, seed=42, snapshot=False):
+    # Writes planes.json, flights.json and passengers.json into directory.
+    # Passengers are streamed to disk, so only planes and flights are held in
+    # memory; snapshot=True also writes the binary snapshots (which do need
+    # every record in memory).
+    plane_list, flight_list, passenger_stream = dataset_records(passengers, planes, flights, seed)
+    os.makedirs(directory, exist_ok=True)
+    stores = {
+        name: JsonStore(os.path.join(directory, f"{name}.json"), key, snapshot=snapshot)
+        for name, key in (("planes", "ID"), ("flights", "flight_id"), ("passengers", "passenger_id"))
+    }
+    if snapshot:
+        stores["passengers"].save_all(list(passenger_stream))
+    else:
+        write_json_records(stores["passengers"].filename, passenger_stream)
+    stores["flights"].save_all(flight_list)
+    stores["planes"].save_all(plane_list)
+    return {"planes": len(plane_list), "flights": len(flight_list), "passengers": passengers}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera planes.json, flights.json e passengers.json sintéticos")
+    parser.add_argument("--passengers", type=int, default=10000)
+    parser.add_argument("--flights", type=int, help="Por omissão, um voo por cada 100 passageiros")
+    parser.add_argument("--planes", type=int, help="Por omissão, um avião por cada 20 voos (mínimo 3)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--directory", default=".")
+    parser.add_argument("--snapshot", action="store_true", help="Gravar também os snapshots binários")
+    args = parser.parse_args()
+    print(json.dumps(write_dataset(args.directory, args.planes, args.flights, args.passengers, args.seed, args.snapshot)))
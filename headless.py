@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import sys
+
+from analytics import load_factor_report
+
+
+def book_flight(menu, passenger_id, flight_id, seat_class):
+    result = menu.passenger_manager.book_flights([(passenger_id, flight_id, seat_class)], menu.flight_manager)[0]
+    if not result["ok"]:
+        raise ValueError(result["error"])
+    return result
+
+
+def book_flights(menu, bookings):
+    return menu.passenger_manager.book_flights([tuple(booking) for booking in bookings], menu.flight_manager)
+
+
+def metrics(menu):
+    if not menu.metrics:
+        raise ValueError("Métricas desativadas (use --metrics).")
+    return menu.metrics.snapshot()
+
+
+# command name -> function(menu, **args)
+COMMANDS = {
+    "add_passenger": lambda menu, **args: menu.passenger_manager.register_passenger(**args),
+    "update_passenger": lambda menu, **args: menu.passenger_manager.edit_passenger(**args),
+    "remove_passenger": lambda menu, **args: menu.passenger_manager.delete_passenger(flight_manager=menu.flight_manager, **args),
+    "list_passengers": lambda menu, **args: menu.passenger_manager.page_passengers(**args),
+    "search_passenger": lambda menu, **args: menu.passenger_manager.find_passengers(**args),
+    "check_in_passenger": lambda menu, **args: menu.passenger_manager.check_in_by_id(flight_manager=menu.flight_manager, **args),
+    "check_in_batch": lambda menu, checkins: menu.passenger_manager.check_in_batch([tuple(checkin) for checkin in checkins], menu.flight_manager),
+    "book_flight": book_flight,
+    "book_flights": book_flights,
+    "cancel_booking": lambda menu, **args: menu.passenger_manager.cancel_booking(flight_manager=menu.flight_manager, **args),
+    "join_waitlist": lambda menu, **args: menu.passenger_manager.join_waitlist(flight_manager=menu.flight_manager, **args),
+    "leave_waitlist": lambda menu, **args: menu.passenger_manager.leave_waitlist(**args),
+    "import_passengers": lambda menu, **args: menu.passenger_manager.import_passengers(**args),
+    "flight_manifest": lambda menu, **args: menu.passenger_manager.flight_manifest(flight_manager=menu.flight_manager, **args),
+    "export_manifest": lambda menu, **args: menu.passenger_manager.export_manifest(flight_manager=menu.flight_manager, **args),
+    "create_plane": lambda menu, **args: menu.plane_manager.register_plane(**args),
+    "update_plane": lambda menu, **args: menu.plane_manager.edit_plane(flight_manager=menu.flight_manager,
+                                                                       passenger_manager=menu.passenger_manager, **args),
+    "list_planes": lambda menu, **args: menu.plane_manager.page_planes(**args),
+    "remove_plane": lambda menu, **args: menu.plane_manager.delete_plane(flight_manager=menu.flight_manager, **args),
+    "add_flight": lambda menu, **args: menu.flight_manager.register_flight(**args),
+    "update_flight_status": lambda menu, **args: menu.flight_manager.set_flight_status(**args),
+    "remove_flight": lambda menu, **args: menu.flight_manager.delete_flight(passenger_manager=menu.passenger_manager, **args),
+    "list_flights": lambda menu, **args: menu.flight_manager.page_flights(**args),
+    "find_flights": lambda menu, **args: menu.flight_manager.find_flights(**args),
+    "load_factor_report": lambda menu: load_factor_report(menu.flight_manager.flights),
+    "free_planes": lambda menu, **args: menu.flight_manager.free_planes(**args),
+    "plane_utilization": lambda menu, **args: menu.flight_manager.plane_utilization(**args),
+    "metrics": metrics,
+}
+
+# Collections a command needs loaded; anything not listed needs the passengers
+# (and with them planes and flights).
+COMMAND_DATA = {
+    "create_plane": ("planes",),
+    "list_planes": ("planes",),
+    "remove_plane": ("flights",),
+    "add_flight": ("flights",),
+    "update_flight_status": ("flights",),
+    "find_flights": ("flights",),
+    "list_flights": ("flights",),
+    "load_factor_report": ("flights",),
+    "free_planes": ("flights",),
+    "plane_utilization": ("flights",),
+    "metrics": (),
+}
+
+
+def to_record(value):
+    if isinstance(value, list):
+        return [to_record(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_record(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return dict(vars(value))
+
+
+def run_command(menu, command):
+    name = command.get("command")
+    if name not in COMMANDS:
+        raise ValueError(f"Comando desconhecido: {name}")
+    menu.ensure_loaded(*COMMAND_DATA.get(name, ("passengers",)))
+    menu.sync()
+    return to_record(COMMANDS[name](menu, **command.get("args", {})))
+
+
+def run_commands(menu, input_stream, output_stream):
+    # Reads one JSON object per line ({"id": ..., "command": ..., "args": {...}})
+    # and writes one JSON result per line. Manager messages go to stderr so the
+    # result stream stays machine-readable.
+    processed = 0
+    with contextlib.redirect_stdout(sys.stderr):
+        for line_number, line in enumerate(input_stream, 1):
+            if not line.strip():
+                continue
+            response = {"id": line_number, "ok": True}
+            try:
+                command = json.loads(line)
+                response["id"] = command.get("id", line_number)
+                response["result"] = run_command(menu, command)
+            except (ValueError, TypeError, KeyError, AttributeError, OSError) as e:
+                response["ok"] = False
+                response["error"] = str(e)
+            except Exception as e:
+                # Anything else fails this command only, never the stream
+                response["ok"] = False
+                response["error"] = f"Erro inesperado ({type(e).__name__}): {e}"
+            output_stream.write(json.dumps(response, ensure_ascii=False) + "\n")
+            processed += 1
+    output_stream.flush()
+    return processed
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+
+
+class LazyLoader:
+    # Runs each registered load step at most once, the first time something
+    # asks for it, after the steps it depends on. A prefetch thread and the
+    # menu may ask at the same time; the lock makes the second one wait for
+    # the load already in progress instead of starting another.
+    def __init__(self):
+        self.steps = {}
+        self.loaded = set()
+        self.lock = threading.RLock()
+        self.thread = None
+
+    def register(self, name, load, depends=()):
+        self.steps[name] = (load, tuple(depends))
+
+    def is_loaded(self, name):
+        return name in self.loaded
+
+    def reset(self, *names):
+        # The next ensure() loads names again
+        with self.lock:
+            self.loaded.difference_update(names)
+
+    def ensure(self, *names):
+        for name in names:
+            if name in self.loaded:
+                continue
+            load, depends = self.steps[name]
+            with self.lock:
+                if name in self.loaded:
+                    continue
+                self.ensure(*depends)
+                load()
+                self.loaded.add(name)
+
+    def prefetch(self, *names):
+        # Loads names (all steps by default) in a daemon thread
+        names = names or tuple(self.steps)
+
+        def run():
+            try:
+                self.ensure(*names)
+            except Exception as e:
+                print(f"Erro ao carregar os dados em segundo plano: {e}", file=sys.stderr)
+
+        self.thread = threading.Thread(target=run, name="prefetch", daemon=True)
+        self.thread.start()
+        return self.thread
@@ -1,8 +1,45 @@
 # -*- coding: utf-8 -*-
+import argparse
+import array
+import bisect
+import contextlib
 import json
 import os
 import random
 import string
+import sys
+import time
+
+from analytics import export_report, load_factor_report
+from baggage import BaggageLimits, baggage_error, baggage_errors, baggage_message, parse_measure
+from bulkimport import IMPORT_FIELDS, RejectReport, is_valid_passport, rejects_filename_for, validated_chunks
+from headless import run_commands
+from lazyload import LazyLoader
+from manifest import manifest_rows, write_manifest
+from metrics import Metrics, MetricsWriter
+from paging import PAGE_SIZE, browse, paginate, parse_sort, sort_key
+from search import NameIndex
+from seating import SEAT_LAYOUT, SeatInventory, SeatMap
+from storage import BackgroundWriter, ConflictError, JsonStore, SQLiteDatabase, export_json, import_json, joint_transaction
+from timetable import FlightSchedule, PlaneSchedule, occupies_plane, parse_time
+from waitlist import WAITLIST_PRIORITIES, Waitlist
+
+SEAT_CLASS_CODES = {
+    "1": "Primeira Classe",
+    "2": "Classe Executiva",
+    "3": "Classe Econômica"
+}
+
+GENDER_CODES = {
+    "m": "Masculino",
+    "f": "Feminino",
+    "o": "Outro"
+}
+
+# Fields the listings can be sorted by; the ID always breaks ties
+PASSENGER_SORTS = ("passenger_id", "name", "age", "nationality", "ticket_status", "flight_id")
+FLIGHT_SORTS = ("flight_id", "departure_time", "destination", "status")
+PLANE_SORTS = ("plane_id", "model_name", "total_seats")
 
 class Flight:
     def __init__(self, flight_id, destination, departure_time, arrival_time, plane, status = "Agendado", available_seats = None):
@@ -10,8 +47,12 @@ class Flight:
         self.destination = destination
         self.departure_time = departure_time
         self.arrival_time = arrival_time
+        # Parsed once; None when the text is not "YYYY-MM-DD HH:MM"
+        self.departure_ts = parse_time(departure_time)
+        self.arrival_ts = parse_time(arrival_time)
         self.plane = plane
         self.status = status
+        self.seat_map = None
 
         if available_seats is None:
             self.available_seats = {
@@ -22,15 +63,51 @@ class Flight:
         else:
             self.available_seats = available_seats
 
+    @property
+    def available_seats(self):
+        return self.seats.available
+
+    @available_seats.setter
+    def available_seats(self, available_seats):
+        self.seats = SeatInventory(available_seats)
+
     def book_seat(self, seat_class):
         if seat_class in self.available_seats:
-            if self.available_seats[seat_class] > 0:
-                self.available_seats[seat_class] -= 1
+            if self.seats.reserve(seat_class):
                 print(f"Reserva confirmada: 1 assento em {seat_class}. Assentos restantes: {self.available_seats[seat_class]}")
             else:
                 print(f"Erro: Nenhum assento disponível na {seat_class}.")
         else:
             print(f"Erro: Classe de assento {seat_class} inválida.")
+
+    def release_seat(self, seat_class):
+        self.seats.release(seat_class)
+
+    def get_seat_map(self):
+        # Built on first use from the plane's cabin configuration
+        if self.seat_map is None:
+            self.seat_map = SeatMap(self.plane.get_seat_distribution())
+        return self.seat_map
+
+    def assign_seat(self, seat_class):
+        with self.seats.lock:
+            return self.get_seat_map().allocate(seat_class)
+
+    def assign_adjacent_seats(self, seat_class, count):
+        with self.seats.lock:
+            seat_map = self.get_seat_map()
+            seats = seat_map.allocate_adjacent(seat_class, count)
+            if seats is None:
+                seats = [seat_map.allocate(seat_class) for _ in range(count)]
+            return seats
+
+    def occupy_seat(self, seat_number):
+        with self.seats.lock:
+            return self.get_seat_map().occupy(seat_number)
+
+    def release_seat_number(self, seat_number):
+        with self.seats.lock:
+            return self.get_seat_map().release(seat_number)
             
     def to_dict(self):
         return {
@@ -40,7 +117,7 @@ class Flight:
             "arrival_time": self.arrival_time,
             "plane_id": self.plane.plane_id,
             "status": self.status,
-            "available_seats": self.available_seats
+            "available_seats": self.seats.snapshot()
         }
     
     @staticmethod
@@ -79,34 +156,214 @@ class Flight:
                 f"Avião: {self.plane.model_name} | Status: {self.status}")
         
 class FlightManager:
-    def __init__(self, plane_manager):
+    def __init__(self, plane_manager, journal=False, store=None, snapshot=False, writer=None, cache=False, shared=False):
         self.flights = []
+        self.flights_by_id = {}
+        # plane id -> {flight id: flight}
+        self.flights_by_plane = {}
+        self.schedule = FlightSchedule()
+        self.plane_schedule = PlaneSchedule()
         self.id_counter = 1
+        self.partial_load = False
         self.plane_manager = plane_manager
         self.filename = "flights.json"
+        self.store = store or JsonStore(self.filename, "flight_id", journal=journal, snapshot=snapshot, cache=cache,
+                                        shared=shared)
+        # With a BackgroundWriter, changes are marked dirty and written later
+        self.writer = writer
         #self.load_flights()
         
     def save_flights(self):
-        with open(self.filename, "w") as file:
-            json.dump([flight.to_dict() for flight in self.flights], file, indent=4)
+        if self.partial_load:
+            print("Erro: Os voos foram carregados parcialmente; o ficheiro não foi reescrito.")
+            return
+        self.store.save_all([flight.to_dict() for flight in self.flights])
         print("Voos salvos com sucesso!")
 
-    def load_flights(self):
+    def record_flight(self, flight):
+        self.record_changes({flight.flight_id: flight.to_dict()})
+
+    def record_flights(self, flights):
+        self.record_changes({flight.flight_id: flight.to_dict() for flight in flights})
+
+    def record_flight_removal(self, flight_id):
+        self.record_changes({flight_id: None})
+
+    def record_changes(self, changes):
+        # changes: {id: record, or None when deleted}
+        if self.writer:
+            for flight_id in changes:
+                self.writer.mark_dirty(self.flush_flights, flight_id)
+        else:
+            self.store.write_changes(changes, None if self.partial_load else self.flight_records)
+
+    def flight_records(self):
+        return [flight.to_dict() for flight in list(self.flights)]
+
+    def flush_flights(self, flight_ids):
+        # Called by the background writer with the ids changed since its last flush
+        changes = {}
+        for flight_id in flight_ids:
+            flight = self.flights_by_id.get(flight_id)
+            changes[flight_id] = flight.to_dict() if flight else None
+        self.store.write_changes(changes, None if self.partial_load else self.flight_records)
+
+    def apply_changes(self, changes):
+        # Takes in flights another terminal wrote ({flight id: record, or None
+        # when deleted}). A known flight is updated in place, so self.flights
+        # stays in ID order for paging; new flights are inserted in order.
+        # Returns the flights whose seat map was rebuilt (new or moved to
+        # another plane), for the caller to re-occupy.
+        rebuilt = []
+        for flight_id, data in changes.items():
+            flight = self.flights_by_id.get(flight_id)
+            if data is None:
+                if flight:
+                    self.flights.remove(flight)
+                    self.unindex_flight(flight)
+                continue
+            updated = Flight.from_dict(data, self.plane_manager)
+            if not updated:
+                continue
+            if flight:
+                self.unindex_flight(flight)
+                if flight.plane is not updated.plane:
+                    flight.plane = updated.plane
+                    flight.seat_map = None
+                    rebuilt.append(flight)
+                flight.destination = updated.destination
+                flight.departure_time, flight.departure_ts = updated.departure_time, updated.departure_ts
+                flight.arrival_time, flight.arrival_ts = updated.arrival_time, updated.arrival_ts
+                flight.status = updated.status
+                with flight.seats.lock:
+                    flight.seats.available = updated.available_seats
+            else:
+                flight = updated
+                bisect.insort(self.flights, flight, key=lambda flight: flight.flight_id)
+                rebuilt.append(flight)
+            self.index_flight(flight)
+            self.id_counter = max(self.id_counter, flight_id + 1)
+        return rebuilt
+
+    def load_flights(self, where=None, limit=None, progress=None):
         try:
-            with open(self.filename, "r") as file:
-                flights_data = json.load(file)
-                self.flights = [Flight.from_dict(data, self.plane_manager) for data in flights_data if Flight.from_dict(data, self.plane_manager)]
-                
-                if self.flights:
-                    self.id_counter = max(flight.flight_id for flight in self.flights) + 1
-                else:
-                    self.id_counter = 1
+            self.flights = list(self.stream_flights(where, limit, progress))
+            self.flights_by_id = {flight.flight_id: flight for flight in self.flights}
+            self.flights_by_plane = {}
+            for flight in self.flights:
+                self.flights_by_plane.setdefault(flight.plane.plane_id, {})[flight.flight_id] = flight
+            self.schedule.rebuild(self.flights)
+            self.plane_schedule.rebuild(self.flights)
             print(f"{len(self.flights)} voos carregados com sucesso.")
         except (FileNotFoundError, json.JSONDecodeError):
             print("Arquivo de voos não encontrado ou erro de decodificação. Nenhum voo carregado.")
             self.flights = []
+            self.flights_by_id = {}
+            self.flights_by_plane = {}
+            self.schedule = FlightSchedule()
+            self.plane_schedule = PlaneSchedule()
+
+    def stream_flights(self, where=None, limit=None, progress=None, progress_every=10000):
+        # Builds flights one record at a time. where(record) filters on the raw
+        # dict before a Flight is created; progress(loaded, chars_read, total_size).
+        self.id_counter = 1
+        self.partial_load = False
+        position = [0, 0]
+        loaded = 0
+
+        def track(chars_read, total_size):
+            position[:] = [chars_read, total_size]
+
+        for data in self.store.iter_records(progress=track):
+            self.id_counter = max(self.id_counter, data["flight_id"] + 1)
+            if where and not where(data):
+                self.partial_load = True
+                continue
+            flight = Flight.from_dict(data, self.plane_manager)
+            if not flight:
+                continue
+            yield flight
+            loaded += 1
+            if progress and loaded % progress_every == 0:
+                progress(loaded, *position)
+            if limit is not None and loaded >= limit:
+                self.partial_load = True
+                break
+        if progress:
+            progress(loaded, *position)
 
             
+    def index_flight(self, flight):
+        self.flights_by_id[flight.flight_id] = flight
+        self.flights_by_plane.setdefault(flight.plane.plane_id, {})[flight.flight_id] = flight
+        self.schedule.add(flight)
+        self.plane_schedule.add(flight)
+
+    def unindex_flight(self, flight):
+        self.flights_by_id.pop(flight.flight_id, None)
+        on_plane = self.flights_by_plane.get(flight.plane.plane_id)
+        if on_plane is not None:
+            on_plane.pop(flight.flight_id, None)
+            if not on_plane:
+                del self.flights_by_plane[flight.plane.plane_id]
+        self.schedule.remove(flight)
+        self.plane_schedule.remove(flight)
+
+    def flights_on_plane(self, plane_id):
+        return list(self.flights_by_plane.get(plane_id, {}).values())
+
+    def check_capacity(self, plane, capacity):
+        # Refuses cabin sizes ({seat class: seats}) smaller than the seats a
+        # flight on the plane already has taken in that class
+        old_capacity = plane.get_seat_distribution()
+        for flight in self.flights_on_plane(plane.plane_id):
+            for seat_class, seats in capacity.items():
+                taken = old_capacity[seat_class] - flight.available_seats.get(seat_class, 0)
+                if taken > seats:
+                    raise ValueError(f"O voo {flight.flight_id} já tem {taken} lugares ocupados em {seat_class}; "
+                                     f"o avião não pode ficar com {seats}.")
+
+    def resize_flights(self, plane, old_capacity, passenger_manager=None):
+        # After the plane's cabins changed: shifts each of its flights' free
+        # seats by the difference and, given the (loaded) passengers, lays out
+        # the seat maps again and offers new seats to the waitlist. Returns
+        # the passengers promoted from the waitlist.
+        capacity = plane.get_seat_distribution()
+        changes = {seat_class: capacity[seat_class] - old_capacity[seat_class] for seat_class in SEAT_LAYOUT}
+        flights = self.flights_on_plane(plane.plane_id)
+        if not flights or not any(changes.values()):
+            return []
+        moved = []
+        for flight in flights:
+            flight.seats.resize(changes)
+            if passenger_manager is not None:
+                moved.extend(self.relayout_seats(flight, passenger_manager.passengers_on_flight(flight.flight_id)))
+        self.record_flights(flights)
+        if passenger_manager is None:
+            return []
+        if moved:
+            passenger_manager.record_passengers(moved)
+        promoted = []
+        for flight in flights:
+            for seat_class, change in changes.items():
+                if change > 0:
+                    promoted.extend(passenger_manager.promote_waitlist(flight, seat_class, self))
+        return promoted
+
+    def relayout_seats(self, flight, passengers):
+        # New seat map for the plane's current cabins. Passengers keep their
+        # seat when it still exists in their class; the others get a new one.
+        # Returns the passengers whose seat changed.
+        with flight.seats.lock:
+            seat_map = flight.seat_map = SeatMap(flight.plane.get_seat_distribution())
+            moved = [passenger for passenger in passengers
+                     if passenger.seat_number is not None
+                     and not (seat_map.seat_class_of(passenger.seat_number) == passenger.seat_class
+                              and seat_map.occupy(passenger.seat_number))]
+        for passenger in moved:
+            passenger.assign_seat(flight.assign_seat(passenger.seat_class))
+        return moved
+
     def add_flight(self):
         destination = input("Destino do voo: ")
         departure_time = input("Horário de partida (YYYY-MM-DD HH:MM): ")
@@ -125,30 +382,151 @@ class FlightManager:
             except ValueError:
                 print("Erro: Insira um número válido.")
         
+        try:
+            flight = self.register_flight(destination, departure_time, arrival_time, plane.plane_id)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
+        print(f"Voo {flight.flight_id} adicionado com sucesso!\n")
+
+    def register_flight(self, destination, departure_time, arrival_time, plane_id):
+        plane = self.plane_manager.find_plane_by_id(plane_id)
+        if not plane:
+            raise ValueError("Avião não encontrado.")
+        departure_ts, arrival_ts = parse_time(departure_time), parse_time(arrival_time)
+        if departure_ts is None or arrival_ts is None:
+            raise ValueError("Horário inválido! Use o formato YYYY-MM-DD HH:MM.")
+        if arrival_ts < departure_ts:
+            raise ValueError("Horário inválido! A chegada não pode ser antes da partida.")
+        busy_with = self.plane_schedule.conflict(plane.plane_id, departure_ts, arrival_ts)
+        if busy_with is not None:
+            raise ValueError(f"O avião {plane.plane_id} já está atribuído ao voo {busy_with} nesse horário.")
         flight = Flight(self.id_counter, destination, departure_time, arrival_time, plane)
         self.flights.append(flight)
+        self.index_flight(flight)
         self.id_counter += 1
-        self.save_flights()
-        print(f"Voo {flight.flight_id} adicionado com sucesso!\n")
-
-    def list_flights(self):
-        if not self.flights:
-            print("Nenhum voo cadastrado.\n")
-            return
+        self.record_flight(flight)
+        return flight
+
+    def page_flights(self, status=None, destination=None, start=None, end=None, sort="flight_id", cursor=None, limit=PAGE_SIZE):
+        # Destination and departure window go through the schedule index;
+        # status is filtered while paging.
+        field, descending = parse_sort(sort, FLIGHT_SORTS)
+        if destination or start or end:
+            flights = self.find_flights(destination, start, end)
         else:
-            print("\nLista de Voos:")
-            for flight in self.flights:
-                print(f"ID: {flight.flight_id} | Destino: {flight.destination} | "
-                      f"Partida: {flight.departure_time} | Chegada: {flight.arrival_time} | "
-                      f": {flight.status}")
-                print("\n")
-            print()
+            flights = self.flights
+        where = None
+        if status:
+            status = status.casefold()
+            where = lambda flight: str(flight.status).casefold() == status
+        page, next_cursor = paginate(flights, sort_key(field, "flight_id"), cursor, limit, where, descending,
+                                     presorted=field == "flight_id" and flights is self.flights)
+        return {"items": page, "next_cursor": next_cursor}
+
+    def list_flights(self, destination=None, start=None, end=None, limit=PAGE_SIZE, status=None, sort=None):
+        # Without filters flights are listed by ID; with a destination or a
+        # window, earliest departure first.
+        filtered = bool(destination or start or end or status)
+        if sort is None:
+            sort = "departure_time" if destination or start or end else "flight_id"
+        try:
+            first_page = self.page_flights(status, destination, start, end, sort, None, limit)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
+
+        def fetch(cursor):
+            result = first_page if cursor is None else self.page_flights(status, destination, start, end, sort, cursor, limit)
+            return result["items"], result["next_cursor"]
+
+        browse(fetch, lambda flight: (f"ID: {flight.flight_id} | Destino: {flight.destination} | "
+                                      f"Partida: {flight.departure_time} | Chegada: {flight.arrival_time} | "
+                                      f"Estado: {flight.status}"),
+               "Nenhum voo encontrado." if filtered else "Nenhum voo cadastrado.", "\nLista de Voos:")
 
     def find_flight_by_id(self, flight_id):
-        for flight in self.flights:
-            if flight.flight_id == flight_id:
-                return flight
-        return None
+        return self.flights_by_id.get(flight_id)
+
+    def find_flights(self, destination=None, start=None, end=None, limit=None):
+        # Flights to destination (any if None) departing between start and end
+        # ("YYYY-MM-DD HH:MM", both inclusive and optional), earliest first.
+        window = []
+        for moment in (start, end):
+            if moment is None or moment == "":
+                window.append(None)
+                continue
+            timestamp = parse_time(moment)
+            if timestamp is None:
+                raise ValueError("Horário inválido! Use o formato YYYY-MM-DD HH:MM.")
+            window.append(timestamp)
+        flight_ids = self.schedule.between(destination or None, window[0], window[1], limit)
+        return [self.flights_by_id[flight_id] for flight_id in flight_ids]
+
+    def next_departures(self, after, count=10, destination=None):
+        return self.find_flights(destination, start=after, limit=count)
+
+    def parse_window(self, start, end):
+        start_ts, end_ts = parse_time(start), parse_time(end)
+        if start_ts is None or end_ts is None:
+            raise ValueError("Horário inválido! Use o formato YYYY-MM-DD HH:MM.")
+        if end_ts <= start_ts:
+            raise ValueError("Horário inválido! O fim do período deve ser depois do início.")
+        return start_ts, end_ts
+
+    def free_planes(self, start, end):
+        # Planes with no (non-cancelled) flight between start and end
+        start_ts, end_ts = self.parse_window(start, end)
+        return [plane for plane in self.plane_manager.planes
+                if self.plane_schedule.conflict(plane.plane_id, start_ts, end_ts) is None]
+
+    def plane_utilization(self, start, end):
+        # Share of the period each plane spends flying
+        start_ts, end_ts = self.parse_window(start, end)
+        report = []
+        for plane in self.plane_manager.planes:
+            flights, busy_seconds = self.plane_schedule.utilization(plane.plane_id, start_ts, end_ts)
+            report.append({
+                "plane_id": plane.plane_id,
+                "model_name": plane.model_name,
+                "flights": flights,
+                "busy_hours": round(busy_seconds / 3600, 2),
+                "utilization": round(busy_seconds / (end_ts - start_ts), 4)
+            })
+        return report
+
+    def show_plane_availability(self):
+        start = input("Início do período (YYYY-MM-DD HH:MM): ").strip()
+        end = input("Fim do período (YYYY-MM-DD HH:MM): ").strip()
+        try:
+            free = self.free_planes(start, end)
+            report = self.plane_utilization(start, end)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
+        print(f"\nAviões livres no período: {', '.join(str(plane.plane_id) for plane in free) if free else 'nenhum'}")
+        print("\nUtilização por avião:")
+        for row in report:
+            print(f"ID: {row['plane_id']} | Modelo: {row['model_name']} | Voos: {row['flights']} | "
+                  f"Horas de voo: {row['busy_hours']} | Utilização: {row['utilization'] * 100:.1f}%")
+
+    def search_flights(self):
+        destination = input("Destino (vazio para todos): ").strip()
+        start = input("Partida a partir de (YYYY-MM-DD HH:MM, vazio para sem limite): ").strip()
+        end = input("Partida até (YYYY-MM-DD HH:MM, vazio para sem limite): ").strip()
+        status = input("Estado (vazio para todos): ").strip()
+        limit = input(f"Voos por página (vazio para {PAGE_SIZE}): ").strip()
+        if limit and (not limit.isdigit() or int(limit) == 0):
+            print("Entrada inválida! Insira um número inteiro positivo.\n")
+            return
+        self.list_flights(destination or None, start or None, end or None, int(limit) if limit else PAGE_SIZE, status or None)
+
+    def restore_seat_assignments(self, passengers):
+        for passenger in passengers:
+            if passenger.seat_number is not None:
+                flight = self.find_flight_by_id(passenger.flight_id)
+                if flight:
+                    flight.occupy_seat(passenger.seat_number)
 
     def update_flight_status(self):
         flight_id = self.get_valid_integer("ID do voo para atualizar o status: ")
@@ -156,21 +534,88 @@ class FlightManager:
 
         if flight:
             new_status = input("Novo status do voo (On Time, Delayed, Canceled): ").strip()
-            self.save_flights()
-            flight.update_status(new_status)
+            try:
+                self.set_flight_status(flight_id, new_status)
+            except ValueError as e:
+                print(f"{e}\n")
+                return
             print(f"Status do voo {flight_id} atualizado para {new_status}.\n")
         else:
             print("Voo não encontrado.\n")
 
-    def remove_flight(self):
+    def set_flight_status(self, flight_id, status):
+        flight = self.find_flight_by_id(flight_id)
+        if not flight:
+            raise ValueError("Voo não encontrado.")
+        was_occupying = occupies_plane(flight)
+        previous_status, flight.status = flight.status, status
+        if not was_occupying and occupies_plane(flight):
+            # A flight coming back from cancellation needs its plane again
+            busy_with = self.plane_schedule.conflict(flight.plane.plane_id, flight.departure_ts, flight.arrival_ts)
+            if busy_with is not None:
+                flight.status = previous_status
+                raise ValueError(f"O avião {flight.plane.plane_id} já está atribuído ao voo {busy_with} nesse horário.")
+            self.plane_schedule.add(flight)
+        elif was_occupying and not occupies_plane(flight):
+            self.plane_schedule.remove(flight)
+        flight.update_status(status)
+        self.record_flight(flight)
+        return flight
+
+    def remove_flight(self, passenger_manager=None):
         flight_id = self.get_valid_integer("ID do voo a remover: ")
-        for flight in self.flights:
-            if flight.flight_id == flight_id:
-                self.flights.remove(flight)
-                self.save_flights()
-                print(f"Voo {flight_id} removido com sucesso!\n")
-                return
-        print("Voo não encontrado.\n")
+        booked = len(passenger_manager.passengers_on_flight(flight_id)) if passenger_manager else 0
+        try:
+            self.delete_flight(flight_id, passenger_manager)
+            print(f"Voo {flight_id} removido com sucesso!")
+            if booked:
+                print(f"{booked} reservas deste voo foram canceladas.")
+            print()
+        except ValueError as e:
+            print(f"{e}\n")
+
+    def delete_flight(self, flight_id, passenger_manager=None):
+        # With passenger_manager, the flight's bookings and waitlist go with it
+        flight = self.flights_by_id.get(flight_id)
+        if not flight:
+            raise ValueError("Voo não encontrado.")
+        self.flights.remove(flight)
+        self.unindex_flight(flight)
+        if passenger_manager is None:
+            self.record_flight_removal(flight_id)
+            return flight
+        with joint_transaction(self.store, passenger_manager.store, passenger_manager.waitlist_store):
+            self.record_flight_removal(flight_id)
+            passenger_manager.release_flight_bookings(flight_id)
+        return flight
+
+    def show_load_factors(self):
+        report = load_factor_report(self.flights)
+        if not report["flights"]:
+            print("Nenhum voo cadastrado.\n")
+            return
+        print(f"\nTaxa de ocupação global: {self.format_load_factor(report['load_factor'])} "
+              f"({report['booked']}/{report['capacity']} assentos, {report['flights']} voos)")
+        print("\nPor classe:")
+        for row in report["by_class"]:
+            print(f"{row['seat_class']}: {self.format_load_factor(row['load_factor'])} ({row['booked']}/{row['capacity']})")
+        print("\nPor destino:")
+        for row in report["by_destination"]:
+            print(f"{row['destination']}: {self.format_load_factor(row['load_factor'])} | Voos: {row['flights']} | "
+                  f"Assentos-hora: {row['seat_hours']}")
+        print("\nPor tipo de avião:")
+        for row in report["by_plane_type"]:
+            print(f"{row['plane_type']}: {self.format_load_factor(row['load_factor'])} | Voos: {row['flights']}")
+        filename = input("\nExportar relatório para ficheiro (.json ou .csv, vazio para não exportar): ").strip()
+        if filename:
+            try:
+                export_report(report, filename)
+                print(f"Relatório exportado para {filename}.")
+            except OSError as e:
+                print(f"Erro ao exportar o relatório: {e}")
+
+    def format_load_factor(self, load_factor):
+        return "N/A" if load_factor is None else f"{load_factor * 100:.1f}%"
 
     def get_valid_integer(self, prompt):
         while True:
@@ -217,7 +662,7 @@ class Plane:
     def from_dict(cls, data):
         required_keys = ['Modelo', 'ID', 'Primeira Classe', 'Classe Executiva', 'Classe Econômica', 'Total']
         if all(key in data for key in required_keys):
-            return cls(data['Modelo'], data['ID'], data['Primeira Classe'], data['Classe Executiva'], data['Classe Econômica', data['Total']])
+            return cls(data['Modelo'], data['ID'], data['Primeira Classe'], data['Classe Executiva'], data['Classe Econômica'])
         else:
             print(f"Missing keys in plane data: {data}")  # Debugging line
             raise KeyError("Missing required keys in data dictionary")
@@ -227,44 +672,102 @@ class Plane:
         return (self.model_name, self.executive_seats, self.business_seats, self.economy_seats)
 
 class PlaneManager:
-    def __init__(self):
+    def __init__(self, journal=False, store=None, snapshot=False, writer=None, cache=False, shared=False):
         self.planes = []
+        self.planes_by_id = {}
         self.id_counter = 1
         self.plane_type_count = {}
         self.filename = "planes.json"
+        self.store = store or JsonStore(self.filename, "ID", journal=journal, snapshot=snapshot, cache=cache, shared=shared)
+        self.writer = writer
         #self.load_planes()
 
     def save_planes(self):
         try:
-            with open(self.filename, "w") as file:
-                planes_data = [plane.to_dict() for plane in self.planes]
-                json.dump(planes_data, file, indent=4)
-                print(f"Dados dos aviões salvos com sucesso no arquivo {self.filename}.")
+            planes_data = [plane.to_dict() for plane in self.planes]
+            self.store.save_all(planes_data)
+            print(f"Dados dos aviões salvos com sucesso no arquivo {self.filename}.")
         except Exception as e:
             print(f"Erro ao salvar os dados: {e}")
+
+    def record_plane(self, plane):
+        self.record_changes({plane.plane_id: plane.to_dict()})
+
+    def record_planes(self, planes):
+        self.record_changes({plane.plane_id: plane.to_dict() for plane in planes})
+
+    def record_plane_removal(self, plane_id):
+        self.record_changes({plane_id: None})
+
+    def record_changes(self, changes):
+        # changes: {id: record, or None when deleted}
+        if self.writer:
+            for plane_id in changes:
+                self.writer.mark_dirty(self.flush_planes, plane_id)
+        else:
+            self.store.write_changes(changes, self.plane_records)
+
+    def plane_records(self):
+        return [plane.to_dict() for plane in list(self.planes)]
+
+    def flush_planes(self, plane_ids):
+        # Called by the background writer with the ids changed since its last flush
+        changes = {}
+        for plane_id in plane_ids:
+            plane = self.planes_by_id.get(plane_id)
+            changes[plane_id] = plane.to_dict() if plane else None
+        self.store.write_changes(changes, self.plane_records)
+
+    def apply_changes(self, changes):
+        # Takes in planes another terminal wrote ({plane id: record, or None
+        # when deleted}). Planes are updated in place so flights keep theirs.
+        for plane_id, data in changes.items():
+            plane = self.planes_by_id.get(plane_id)
+            if data is None:
+                if plane:
+                    self.planes.remove(plane)
+                    del self.planes_by_id[plane_id]
+                    self.count_plane_type(plane, -1)
+                continue
+            updated = Plane.from_dict(data)
+            if plane:
+                self.count_plane_type(plane, -1)
+                plane.model_name = updated.model_name
+                plane.executive_seats = updated.executive_seats
+                plane.business_seats = updated.business_seats
+                plane.economy_seats = updated.economy_seats
+                plane.total_seats = updated.total_seats
+            else:
+                plane = updated
+                self.planes.append(plane)
+                self.planes_by_id[plane_id] = plane
+            self.count_plane_type(plane, 1)
+            self.id_counter = max(self.id_counter, plane_id + 1)
             
     def load_planes(self):
         try:
-            with open(self.filename, "r") as file:
-                planes_data = json.load(file)
-                self.planes = [Plane.from_dict(data) for data in planes_data]
-                print(f"Planes loaded successfully: {self.planes}")
-                if self.planes:
-                    self.id_counter = max(plane.plane_id for plane in self.planes) + 1
+            planes_data = self.store.load()
+            self.planes = [Plane.from_dict(data) for data in planes_data]
+            self.planes_by_id = {plane.plane_id: plane for plane in self.planes}
+            self.plane_type_count = {}
+            print(f"Planes loaded successfully: {len(self.planes)}")
+            if self.planes:
+                self.id_counter = max(plane.plane_id for plane in self.planes) + 1
+            else:
+                self.id_counter = 1
+            for plane in self.planes:
+                plane_key = plane.get_plane_key()
+                if plane_key in self.plane_type_count:
+                    self.plane_type_count[plane_key] += 1
                 else:
-                    self.id_counter = 1
-                for plane in self.planes:
-                    plane_key = plane.get_plane_key()
-                    if plane_key in self.plane_type_count:
-                        self.plane_type_count[plane_key] += 1
-                    else:
-                        self.plane_type_count[plane_key] = 1
+                    self.plane_type_count[plane_key] = 1
         except (FileNotFoundError, json.JSONDecodeError):
             print("Arquivo de dados dos aviões não encontrado.\n")
             self.id_counter = 1
         except KeyError as e:
             print(f"Erro ao carregar dados dos aviões: {e}")
             self.planes = []
+            self.planes_by_id = {}
             self.id_counter = 1
 
     def create_plane(self):
@@ -277,40 +780,64 @@ class PlaneManager:
             print("ERRO! Por favor introduza números válidos.\n")
             return
         
-        plane = Plane(model_name, self.id_counter, executive_seats, business_seats, economy_seats)
-        plane_key = plane.get_plane_key()
-        if plane_key in self.plane_type_count:
-            self.plane_type_count[plane_key] += 1
+        existing_type = (model_name, executive_seats, business_seats, economy_seats) in self.plane_type_count
+        plane = self.register_plane(model_name, executive_seats, business_seats, economy_seats)
+        if existing_type:
             print(f"Avião já existente com as mesmas características. Foi adicionado mais um avião deste tipo à frota.\n")
         else:
-            self.plane_type_count[plane_key] = 1
-            self.save_planes()
             print(f"Avião {model_name} (ID:{plane.plane_id}) adicionado à frota com sucesso.\n")
-        
+
+    def register_plane(self, model_name, executive_seats, business_seats, economy_seats):
+        plane = self.new_plane(model_name, executive_seats, business_seats, economy_seats)
+        self.record_plane(plane)
+        return plane
+
+    def new_plane(self, model_name, executive_seats, business_seats, economy_seats):
+        # Adds the plane in memory only; callers record it
+        if min(executive_seats, business_seats, economy_seats) < 0:
+            raise ValueError("O número de assentos não pode ser negativo.")
+        plane = Plane(model_name, self.id_counter, executive_seats, business_seats, economy_seats)
+        self.count_plane_type(plane, 1)
         self.planes.append(plane)
+        self.planes_by_id[plane.plane_id] = plane
         self.id_counter += 1
+        return plane
+
+    def count_plane_type(self, plane, delta):
+        plane_key = plane.get_plane_key()
+        self.plane_type_count[plane_key] = self.plane_type_count.get(plane_key, 0) + delta
+        if self.plane_type_count[plane_key] <= 0:
+            del self.plane_type_count[plane_key]
 
-    def remove_plane(self):
+    def remove_plane(self, flight_manager=None):
         try:
             plane_id = int(input("Insira o ID do avião que deseja remover da frota: "))
         except ValueError:
             print("O ID tem de ser um valor inteiro.\n")
             return
         
-        plane = self.find_plane_by_id(plane_id)
-        if plane:
-            self.planes.remove(plane)
-            plane_key = plane.get_plane_key()
-            if plane_key in self.plane_type_count:
-                self.plane_type_count[plane_key] -= 1
-                if self.plane_type_count[plane_key] == 0:
-                    del self.plane_type_count[plane_key]
-            self.save_planes()
+        try:
+            plane = self.delete_plane(plane_id, flight_manager)
             print(f"Avião {plane.model_name} (ID: {plane.plane_id}) removido com sucesso.\n")
-        else:
-            print("Avião não encontrado.\n")
+        except ValueError as e:
+            print(f"{e}\n")
+
+    def delete_plane(self, plane_id, flight_manager=None):
+        # With flight_manager, a plane that flights still use is not removed
+        plane = self.find_plane_by_id(plane_id)
+        if not plane:
+            raise ValueError("Avião não encontrado.")
+        flights = sorted(flight.flight_id for flight in flight_manager.flights_on_plane(plane_id)) if flight_manager else []
+        if flights:
+            shown = ", ".join(map(str, flights[:5])) + (", ..." if len(flights) > 5 else "")
+            raise ValueError(f"O avião {plane_id} está atribuído a {len(flights)} voo(s) ({shown}); remova esses voos primeiro.")
+        self.planes.remove(plane)
+        del self.planes_by_id[plane.plane_id]
+        self.count_plane_type(plane, -1)
+        self.record_plane_removal(plane.plane_id)
+        return plane
     
-    def update_plane(self):
+    def update_plane(self, flight_manager=None, passenger_manager=None):
         try:
             plane_id = int(input("Insira o ID do avião que deseja atualizar: "))
         except ValueError:
@@ -327,25 +854,26 @@ class PlaneManager:
             print("5. Cancelar atualização")
             choice = input("Escolha uma opção: ")
             
+            changes = {}
             if choice == "1":
                 new_model_name = input(f"Nome atual do modelo do avião: {plane.model_name}\nNovo nome do modelo do avião: ")
-                plane.model_name = new_model_name
+                changes["model_name"] = new_model_name
             elif choice == "2":
                 try:
                     new_executive_seats = int(input(f"Número atual de assentos de primeira classe: {plane.executive_seats}\nNúmero atualizado de assentos de primeira classe: "))
-                    plane.executive_seats = new_executive_seats
+                    changes["executive_seats"] = new_executive_seats
                 except ValueError:
                     print("Introduza um número de assentos válido.\n")
             elif choice == "3":
                 try:
                     new_business_seats = int(input(f"Número atual de assentos de classe executiva: {plane.business_seats}\nNúmero atualizado de assentos de classe executiva: "))
-                    plane.business_seats = new_business_seats
+                    changes["business_seats"] = new_business_seats
                 except ValueError:
                     print("Introduza um número de assentos válido.\n")
             elif choice == "4":
                 try:
                     new_economy_seats = int(input(f"Número atual de assentos de classe econômica: {plane.economy_seats}\nNúmero atualizado de assentos de classe econômica: "))
-                    plane.economy_seats = new_economy_seats
+                    changes["economy_seats"] = new_economy_seats
                 except ValueError:
                     print("Introduza um número de assentos válido.\n")
             elif choice == "5":
@@ -353,27 +881,78 @@ class PlaneManager:
             else:
                 print("Opção inválida.\n")
             
-            plane.total_seats = plane.executive_seats + plane.business_seats + plane.economy_seats
-            self.save_planes()
-            print(f"Avião atualizado: {plane}\n")
+            try:
+                self.edit_plane(plane_id, **changes, flight_manager=flight_manager, passenger_manager=passenger_manager)
+                print(f"Avião atualizado: {plane}\n")
+            except ValueError as e:
+                print(f"{e}\n")
         else:
             print("Avião não encontrado.\n")
+
+    def edit_plane(self, plane_id, model_name=None, executive_seats=None, business_seats=None, economy_seats=None,
+                   flight_manager=None, passenger_manager=None):
+        # With flight_manager, the plane's flights follow new seat counts (and
+        # cannot lose seats already taken); see FlightManager.resize_flights
+        plane = self.find_plane_by_id(plane_id)
+        if not plane:
+            raise ValueError("Avião não encontrado.")
+        if min(seats for seats in (executive_seats, business_seats, economy_seats, 0) if seats is not None) < 0:
+            raise ValueError("O número de assentos não pode ser negativo.")
+        old_capacity = plane.get_seat_distribution()
+        if flight_manager:
+            flight_manager.check_capacity(plane, {
+                "Primeira Classe": plane.executive_seats if executive_seats is None else executive_seats,
+                "Classe Executiva": plane.business_seats if business_seats is None else business_seats,
+                "Classe Econômica": plane.economy_seats if economy_seats is None else economy_seats,
+            })
+        self.count_plane_type(plane, -1)
+        if model_name is not None:
+            plane.model_name = model_name
+        if executive_seats is not None:
+            plane.executive_seats = executive_seats
+        if business_seats is not None:
+            plane.business_seats = business_seats
+        if economy_seats is not None:
+            plane.economy_seats = economy_seats
+        plane.total_seats = plane.executive_seats + plane.business_seats + plane.economy_seats
+        self.count_plane_type(plane, 1)
+        stores = [self.store]
+        if flight_manager:
+            stores.append(flight_manager.store)
+        if flight_manager and passenger_manager:
+            stores += [passenger_manager.store, passenger_manager.waitlist_store]
+        with joint_transaction(*stores):
+            self.record_plane(plane)
+            if flight_manager:
+                flight_manager.resize_flights(plane, old_capacity, passenger_manager)
+        return plane
     
-    def list_planes(self):
-        if not self.planes:
-            print("Não existem aviões.\n")
+    def page_planes(self, model_name=None, sort="plane_id", cursor=None, limit=PAGE_SIZE):
+        field, descending = parse_sort(sort, PLANE_SORTS)
+        where = None
+        if model_name:
+            model_name = model_name.casefold()
+            where = lambda plane: model_name in plane.model_name.casefold()
+        page, next_cursor = paginate(self.planes, sort_key(field, "plane_id"), cursor, limit, where, descending,
+                                     presorted=field == "plane_id")
+        return {"items": page, "next_cursor": next_cursor}
+
+    def list_planes(self, model_name=None, sort="plane_id", limit=PAGE_SIZE):
+        try:
+            first_page = self.page_planes(model_name, sort, None, limit)
+        except ValueError as e:
+            print(f"{e}\n")
             return
-        else:
-            print("\nListagem de todos os aviões")
-            for plane in self.planes:
-                print(f"ID: {plane.plane_id} | Modelo: {plane.model_name} | Total de assentos: {plane.total_seats}")
-            print()
+
+        def fetch(cursor):
+            result = first_page if cursor is None else self.page_planes(model_name, sort, cursor, limit)
+            return result["items"], result["next_cursor"]
+
+        browse(fetch, lambda plane: f"ID: {plane.plane_id} | Modelo: {plane.model_name} | Total de assentos: {plane.total_seats}",
+               "Não existem aviões.", "\nListagem de todos os aviões")
     
     def find_plane_by_id(self, plane_id):
-        for plane in self.planes:
-            if plane.plane_id == plane_id:
-                return plane
-        return None
+        return self.planes_by_id.get(plane_id)
 
     def count_planes_by_type(self):
         print("\nContagem de aviões por tipo (modelo + distribuição de assentos):")
@@ -387,28 +966,21 @@ class PlaneManager:
             ("Embraer E3", 2, 2, 3),  # 7 seats
         ]
 
-        for model, executive, business, economy in test_planes:
-            plane = Plane(model, self.id_counter, executive, business, economy)
-            self.planes.append(plane)
-            self.id_counter += 1
-            self.save_planes()
+        planes = [self.new_plane(model, executive, business, economy) for model, executive, business, economy in test_planes]
+        self.record_planes(planes)
 
         print("3 test planes have been created successfully.")
 
-class Passenger:
-    def __init__(self, passenger_id, name, age, gender, nationality, passport_number, ticket_status="Aguardando", checked_in=False, baggage_weight=0, flight_id=None, seat_class=None, seat_number=None):
-        self.passenger_id = passenger_id
-        self.name = name
-        self.age = age
-        self.gender = gender
-        self.nationality = nationality
-        self.passport_number = passport_number
-        self.checked_in = checked_in
-        self.baggage_weight = baggage_weight
-        self.ticket_status = ticket_status
-        self.flight_id = flight_id
-        self.seat_class = seat_class
-        self.seat_number = seat_number
+PASSENGER_FIELDS = ("passenger_id", "name", "age", "gender", "nationality", "passport_number",
+                    "checked_in", "baggage_weight", "ticket_status", "flight_id", "seat_class", "seat_number")
+
+
+class PassengerBase:
+    # Behaviour shared by Passenger objects and PassengerTable row views
+    __slots__ = ()
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in PASSENGER_FIELDS}
 
     def assign_flight(self, flight_id, seat_class):
         self.flight_id = flight_id
@@ -435,26 +1007,323 @@ class Passenger:
                 f"Peso da Bagagem: {self.baggage_weight}kg")
 
 
-class PassengerManager:
+class Passenger(PassengerBase):
+    __slots__ = PASSENGER_FIELDS
+
+    def __init__(self, passenger_id, name, age, gender, nationality, passport_number, ticket_status="Aguardando", checked_in=False, baggage_weight=0, flight_id=None, seat_class=None, seat_number=None):
+        self.passenger_id = passenger_id
+        self.name = name
+        self.age = age
+        self.gender = gender
+        self.nationality = nationality
+        self.passport_number = passport_number
+        self.checked_in = checked_in
+        self.baggage_weight = baggage_weight
+        self.ticket_status = ticket_status
+        self.flight_id = flight_id
+        self.seat_class = seat_class
+        self.seat_number = seat_number
+
+
+class StringPool:
+    # Interned strings addressed by small integer codes; code 0 is None
+    def __init__(self):
+        self.values = [None]
+        self.codes = {None: 0}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class PassengerTable:
+    # Column-oriented passenger storage: numbers in typed arrays, repetitive
+    # strings (gender, nationality, status, class, seat) as pooled codes.
+    # Removed rows are tombstoned so row numbers held by views stay valid.
+    NULL_ID = -2 ** 63
+    POOLED = ("gender", "nationality", "ticket_status", "seat_class", "seat_number")
+
     def __init__(self):
-        self.passengers = []
+        self.passenger_id = array.array("q")
+        self.name = []
+        self.age = array.array("q")
+        self.passport_number = []
+        self.checked_in = bytearray()
+        self.baggage_weight = array.array("d")
+        self.flight_id = array.array("q")
+        self.pools = {field: StringPool() for field in self.POOLED}
+        self.codes = {field: array.array("I") for field in self.POOLED}
+        self.alive = bytearray()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        alive = self.alive
+        for row in range(len(alive)):
+            if alive[row]:
+                yield PassengerRow(self, row)
+
+    def add(self, passenger_id, name, age, gender, nationality, passport_number, ticket_status="Aguardando", checked_in=False, baggage_weight=0, flight_id=None, seat_class=None, seat_number=None):
+        row = len(self.alive)
+        self.passenger_id.append(passenger_id)
+        self.name.append(name)
+        self.age.append(age)
+        self.passport_number.append(passport_number)
+        self.checked_in.append(bool(checked_in))
+        self.baggage_weight.append(baggage_weight)
+        self.flight_id.append(self.NULL_ID)
+        for field in self.POOLED:
+            self.codes[field].append(0)
+        self.alive.append(1)
+        self.count += 1
+        view = PassengerRow(self, row)
+        view.gender = gender
+        view.nationality = nationality
+        view.ticket_status = ticket_status
+        view.flight_id = flight_id
+        view.seat_class = seat_class
+        view.seat_number = seat_number
+        return view
+
+    def append(self, passenger):
+        return self.add(**passenger.to_dict())
+
+    def remove(self, passenger):
+        if not self.alive[passenger.row]:
+            raise ValueError("PassengerTable.remove(x): x not in table")
+        self.alive[passenger.row] = 0
+        self.count -= 1
+
+    def get(self, field, row):
+        if field in self.pools:
+            return self.pools[field].values[self.codes[field][row]]
+        if field == "flight_id":
+            value = self.flight_id[row]
+            return None if value == self.NULL_ID else value
+        if field == "checked_in":
+            return bool(self.checked_in[row])
+        if field == "baggage_weight":
+            # Whole weights come back as int, as entered at check-in
+            value = self.baggage_weight[row]
+            return int(value) if value.is_integer() else value
+        return getattr(self, field)[row]
+
+    def set(self, field, row, value):
+        if field in self.pools:
+            self.codes[field][row] = self.pools[field].code(value)
+        elif field == "flight_id":
+            self.flight_id[row] = self.NULL_ID if value is None else int(value)
+        elif field == "checked_in":
+            self.checked_in[row] = bool(value)
+        else:
+            getattr(self, field)[row] = value
+
+    def memory_usage(self):
+        # Approximate bytes held by the columns themselves (not the views)
+        size = sum(sys.getsizeof(column) for column in (self.passenger_id, self.age, self.checked_in, self.baggage_weight, self.flight_id, self.alive))
+        size += sum(sys.getsizeof(column) for column in self.codes.values())
+        for strings in (self.name, self.passport_number):
+            size += sys.getsizeof(strings) + sum(sys.getsizeof(value) for value in strings)
+        for pool in self.pools.values():
+            size += sys.getsizeof(pool.values) + sys.getsizeof(pool.codes) + sum(sys.getsizeof(value) for value in pool.values)
+        return size
+
+
+def table_column(field):
+    return property(lambda view: view.table.get(field, view.row),
+                    lambda view, value: view.table.set(field, view.row, value))
+
+
+class PassengerRow(PassengerBase):
+    # Lightweight view of one PassengerTable row with Passenger's attributes
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __eq__(self, other):
+        return isinstance(other, PassengerRow) and other.table is self.table and other.row == self.row
+
+    def __hash__(self):
+        return hash((id(self.table), self.row))
+
+
+for passenger_field in PASSENGER_FIELDS:
+    setattr(PassengerRow, passenger_field, table_column(passenger_field))
+
+
+class PassengerManager:
+    def __init__(self, journal=False, store=None, snapshot=False, columnar=False, writer=None,
+                 waitlist_store=None, waitlist_priority="request_time", baggage_limits=None, cache=False, shared=False):
+        # columnar keeps passengers in a PassengerTable instead of one object each
+        self.columnar = columnar
+        self.passengers = PassengerTable() if columnar else []
+        self.passengers_by_id = {}
+        self.passengers_by_passport = {}
+        self.passengers_by_flight = {}
+        self.name_index = NameIndex()
         self.id_counter = 1
+        self.partial_load = False
         self.filepath = "passengers.json"
+        self.store = store or JsonStore(self.filepath, "passenger_id", journal=journal, snapshot=snapshot, cache=cache,
+                                        shared=shared)
+        self.writer = writer
+        self.waitlist = Waitlist(waitlist_priority)
+        self.waitlist_store = waitlist_store or JsonStore("waitlist.json", "passenger_id", journal=journal, shared=shared)
+        self.baggage_limits = baggage_limits or BaggageLimits()
         #self.load_passengers()
         
     def save_passengers(self):
-        with open(self.filepath, "w") as file:
-            json.dump([vars(p) for p in self.passengers], file, indent=4)
+        if self.partial_load:
+            print("Erro: Os passageiros foram carregados parcialmente; o ficheiro não foi reescrito.")
+            return
+        self.store.save_all([p.to_dict() for p in self.passengers])
+
+    def record_passenger(self, passenger):
+        self.record_changes({passenger.passenger_id: passenger.to_dict()})
+
+    def record_passengers(self, passengers):
+        self.record_changes({passenger.passenger_id: passenger.to_dict() for passenger in passengers})
+
+    def record_passenger_removal(self, passenger_id):
+        self.record_changes({passenger_id: None})
+
+    def record_changes(self, changes):
+        # changes: {id: record, or None when deleted}
+        if self.writer:
+            for passenger_id in changes:
+                self.writer.mark_dirty(self.flush_passengers, passenger_id)
+        else:
+            self.store.write_changes(changes, None if self.partial_load else self.passenger_records)
+
+    def passenger_records(self):
+        return [passenger.to_dict() for passenger in list(self.passengers)]
+
+    def flush_passengers(self, passenger_ids):
+        # Called by the background writer with the ids changed since its last flush
+        changes = {}
+        for passenger_id in passenger_ids:
+            passenger = self.passengers_by_id.get(passenger_id)
+            changes[passenger_id] = passenger.to_dict() if passenger else None
+        self.store.write_changes(changes, None if self.partial_load else self.passenger_records)
+
+    def apply_changes(self, changes, flight_manager):
+        # Takes in passengers another terminal wrote ({passenger id: record,
+        # or None when deleted}), moving their seats on the loaded flights.
+        # Every old seat and index entry goes first, so a seat (or passport)
+        # that moves from one changed passenger to another is not freed again
+        # after its new holder took it.
+        changed = []
+        for passenger_id, data in changes.items():
+            passenger = self.passengers_by_id.get(passenger_id)
+            if passenger is not None:
+                self.unindex_passenger(passenger)
+                flight = flight_manager.find_flight_by_id(passenger.flight_id)
+                if flight and passenger.seat_number is not None:
+                    flight.release_seat_number(passenger.seat_number)
+                if data is None:
+                    self.passengers.remove(passenger)
+                    continue
+            if data is not None:
+                changed.append((passenger, data))
+        for passenger, data in changed:
+            if isinstance(data.get("flight_id"), str) and data["flight_id"].isdigit():
+                data["flight_id"] = int(data["flight_id"])
+            if passenger is None:
+                passenger = self.new_passenger(**data)
+            else:
+                for field, value in data.items():
+                    setattr(passenger, field, value)
+            self.index_passenger(passenger)
+            flight = flight_manager.find_flight_by_id(passenger.flight_id)
+            if flight and passenger.seat_number is not None:
+                flight.occupy_seat(passenger.seat_number)
+            self.id_counter = max(self.id_counter, passenger.passenger_id + 1)
             
-    def load_passengers(self):
+    def load_passengers(self, where=None, limit=None, progress=None):
         try:
-            with open(self.filepath, "r") as file:
-                data = json.load(file)
-                self.passengers = [Passenger(**p) for p in data]
-                if self.passengers:
-                    self.id_counter = max(p.passenger_id for p in self.passengers) + 1
+            if self.columnar:
+                self.passengers = PassengerTable()
+                for _ in self.stream_passengers(where, limit, progress, factory=self.passengers.add):
+                    pass
+            else:
+                self.passengers = list(self.stream_passengers(where, limit, progress))
+            self.rebuild_indexes()
         except (FileNotFoundError, json.JSONDecodeError):
-            self.passengers = []
+            self.passengers = PassengerTable() if self.columnar else []
+            self.rebuild_indexes()
+
+    def stream_passengers(self, where=None, limit=None, progress=None, progress_every=10000, factory=Passenger):
+        # Builds passengers one record at a time. where(record) filters on the
+        # raw dict before a Passenger is created; progress(loaded, chars_read, total_size).
+        self.id_counter = 1
+        self.partial_load = False
+        position = [0, 0]
+        loaded = 0
+
+        def track(chars_read, total_size):
+            position[:] = [chars_read, total_size]
+
+        for data in self.store.iter_records(progress=track):
+            self.id_counter = max(self.id_counter, data["passenger_id"] + 1)
+            # Older versions of book_flight stored the flight ID as typed
+            if isinstance(data.get("flight_id"), str) and data["flight_id"].isdigit():
+                data["flight_id"] = int(data["flight_id"])
+            if where and not where(data):
+                self.partial_load = True
+                continue
+            yield factory(**data)
+            loaded += 1
+            if progress and loaded % progress_every == 0:
+                progress(loaded, *position)
+            if limit is not None and loaded >= limit:
+                self.partial_load = True
+                break
+        if progress:
+            progress(loaded, *position)
+
+    def rebuild_indexes(self):
+        self.passengers_by_id = {}
+        self.passengers_by_passport = {}
+        self.passengers_by_flight = {}
+        self.name_index = NameIndex()
+        for passenger in self.passengers:
+            self.index_passenger(passenger)
+
+    def index_passenger(self, passenger):
+        self.passengers_by_id[passenger.passenger_id] = passenger
+        self.passengers_by_passport[passenger.passport_number] = passenger
+        self.name_index.add(passenger.passenger_id, passenger.name)
+        self.index_booking(passenger)
+
+    def unindex_passenger(self, passenger):
+        self.passengers_by_id.pop(passenger.passenger_id, None)
+        self.name_index.remove(passenger.passenger_id)
+        if self.passengers_by_passport.get(passenger.passport_number) == passenger:
+            del self.passengers_by_passport[passenger.passport_number]
+        self.unindex_booking(passenger)
+
+    def index_booking(self, passenger):
+        # flight id -> {passenger id: passenger}; call after assign_flight
+        if passenger.flight_id is not None:
+            self.passengers_by_flight.setdefault(passenger.flight_id, {})[passenger.passenger_id] = passenger
+
+    def unindex_booking(self, passenger):
+        # Call before the passenger's flight_id is cleared
+        booked = self.passengers_by_flight.get(passenger.flight_id)
+        if booked is not None:
+            booked.pop(passenger.passenger_id, None)
+            if not booked:
+                del self.passengers_by_flight[passenger.flight_id]
+
+    def passengers_on_flight(self, flight_id):
+        return list(self.passengers_by_flight.get(flight_id, {}).values())
 
     def add_passenger(self):
         name = input("Nome do passageiro: ")
@@ -464,19 +1333,14 @@ class PassengerManager:
             print("Idade inválida! Deve ser um número inteiro.\n")
             return
         gender_choice = input("Gênero do passageiro (M/F/O): ").lower()
-        gender_map = {
-            "m": "Masculino",
-            "f": "Feminino",
-            "o": "Outro"
-        }
-        gender = gender_map.get(gender_choice)
+        gender = GENDER_CODES.get(gender_choice)
         if not gender:
             print("Gênero inválido! Deve ser 'M', 'F' ou 'O'.\n")
             return
         nationality = input("Nacionalidade do passageiro: ")
         while True:
             passport_number = input("Número do passaporte (8 ou 9 dígitos): ")
-            if passport_number.isdigit() and len(passport_number) in [8, 9]:
+            if self.is_valid_passport(passport_number):
                 if self.check_duplicate_passport(passport_number):
                     print(f"Erro: Já existe um passageiro com o número de passaporte {passport_number}.\n")
                 else:
@@ -484,20 +1348,148 @@ class PassengerManager:
             else:
                 print("Número de passaporte inválido! Deve ter 8 ou 9 dígitos.")
             
-        passenger = Passenger(self.id_counter, name, age, gender, nationality, passport_number)
-        self.passengers.append(passenger)
-        self.id_counter += 1
-        self.save_passengers()
+        try:
+            passenger = self.register_passenger(name, age, gender, nationality, passport_number)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
         print(f"Passageiro {passenger.name} (ID: {passenger.passenger_id}) adicionado com sucesso!\n")
 
-    def list_passengers(self):
-        if not self.passengers:
-            print("Nenhum passageiro cadastrado.\n")
-        else:
-            print("\nLista de Passageiros:")
-            for passenger in self.passengers:
-                print(f"ID: {passenger.passenger_id} | Nome: {passenger.name} | Status: {passenger.ticket_status}")
-            print()
+    def register_passenger(self, name, age, gender, nationality, passport_number):
+        if not isinstance(age, int) or age < 0:
+            raise ValueError("Idade inválida! Deve ser um número inteiro.")
+        gender = GENDER_CODES.get(str(gender).lower(), gender)
+        if gender not in GENDER_CODES.values():
+            raise ValueError("Gênero inválido! Deve ser 'M', 'F' ou 'O'.")
+        passport_number = str(passport_number)
+        if not self.is_valid_passport(passport_number):
+            raise ValueError("Número de passaporte inválido! Deve ter 8 ou 9 dígitos.")
+        if self.check_duplicate_passport(passport_number):
+            raise ValueError(f"Já existe um passageiro com o número de passaporte {passport_number}.")
+
+        passenger = self.new_passenger(self.id_counter, name, age, gender, nationality, passport_number)
+        self.index_passenger(passenger)
+        self.id_counter += 1
+        self.record_passenger(passenger)
+        return passenger
+
+    def new_passenger(self, *args, **kwargs):
+        if self.columnar:
+            return self.passengers.add(*args, **kwargs)
+        passenger = Passenger(*args, **kwargs)
+        self.passengers.append(passenger)
+        return passenger
+
+    def is_valid_passport(self, passport_number):
+        return is_valid_passport(passport_number)
+
+    def import_passengers(self, filename, rejects_filename=None, workers=None, chunk_size=10000):
+        # Bulk import from CSV (with a header row) or JSON Lines. Records are
+        # validated in worker processes; duplicates are checked here against
+        # the passport index and the passports already seen in the file (the
+        # first occurrence wins). Everything accepted is persisted at once.
+        if self.partial_load:
+            raise ValueError("Os passageiros foram carregados parcialmente; não é possível importar.")
+        rejects = RejectReport(rejects_filename or rejects_filename_for(filename))
+        seen = {}
+        imported = []
+        read = 0
+        try:
+            for accepted, rejected in validated_chunks(filename, GENDER_CODES, workers, chunk_size):
+                read += len(accepted) + len(rejected)
+                for line_number, reason, raw in rejected:
+                    rejects.write(line_number, reason, raw)
+                for line_number, fields in accepted:
+                    passport_number = fields[4]
+                    if passport_number in seen:
+                        rejects.write(line_number, f"Passaporte repetido no ficheiro (linha {seen[passport_number]}).", dict(zip(IMPORT_FIELDS, fields)))
+                    elif self.check_duplicate_passport(passport_number):
+                        rejects.write(line_number, f"Já existe um passageiro com o número de passaporte {passport_number}.", dict(zip(IMPORT_FIELDS, fields)))
+                    else:
+                        seen[passport_number] = line_number
+                        passenger = self.new_passenger(self.id_counter, *fields)
+                        self.index_passenger(passenger)
+                        self.id_counter += 1
+                        imported.append(passenger)
+        except BaseException:
+            # Nothing was persisted yet; take the new passengers back out
+            for passenger in imported:
+                self.unindex_passenger(passenger)
+                if self.columnar:
+                    self.passengers.remove(passenger)
+            if not self.columnar and imported:
+                del self.passengers[-len(imported):]
+            raise
+        finally:
+            rejects.close()
+        if imported:
+            self.record_passengers(imported)
+        return {
+            "read": read,
+            "imported": len(imported),
+            "rejected": rejects.count,
+            "rejects_file": rejects.filename if rejects.count else None,
+        }
+
+    def import_passengers_menu(self):
+        filename = input("Ficheiro a importar (.csv ou .jsonl): ").strip()
+        try:
+            summary = self.import_passengers(filename)
+        except (OSError, ValueError) as e:
+            print(f"Erro: {e}\n")
+            return
+        print(f"{summary['imported']} de {summary['read']} passageiros importados.")
+        if summary["rejected"]:
+            print(f"{summary['rejected']} registos rejeitados; ver {summary['rejects_file']}.")
+
+    def page_passengers(self, status=None, nationality=None, checked_in=None, flight_id=None, sort="passenger_id", cursor=None, limit=PAGE_SIZE):
+        # A flight filter starts from the flight's bookings; the other filters
+        # are checked while paging.
+        field, descending = parse_sort(sort, PASSENGER_SORTS)
+        conditions = []
+        if status:
+            status = status.casefold()
+            conditions.append(lambda passenger: str(passenger.ticket_status).casefold() == status)
+        if nationality:
+            nationality = nationality.casefold()
+            conditions.append(lambda passenger: str(passenger.nationality).casefold() == nationality)
+        if checked_in is not None:
+            conditions.append(lambda passenger: bool(passenger.checked_in) == bool(checked_in))
+        passengers = self.passengers if flight_id is None else self.passengers_on_flight(flight_id)
+        where = (lambda passenger: all(condition(passenger) for condition in conditions)) if conditions else None
+        page, next_cursor = paginate(passengers, sort_key(field, "passenger_id"), cursor, limit, where, descending,
+                                     presorted=field == "passenger_id" and flight_id is None)
+        return {"items": page, "next_cursor": next_cursor}
+
+    def list_passengers(self, status=None, nationality=None, checked_in=None, flight_id=None, sort="passenger_id", limit=PAGE_SIZE):
+        filtered = status or nationality or checked_in is not None or flight_id is not None
+        try:
+            first_page = self.page_passengers(status, nationality, checked_in, flight_id, sort, None, limit)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
+
+        def fetch(cursor):
+            result = first_page if cursor is None else self.page_passengers(status, nationality, checked_in, flight_id, sort, cursor, limit)
+            return result["items"], result["next_cursor"]
+
+        browse(fetch, lambda passenger: f"ID: {passenger.passenger_id} | Nome: {passenger.name} | Status: {passenger.ticket_status}",
+               "Nenhum passageiro encontrado." if filtered else "Nenhum passageiro cadastrado.", "\nLista de Passageiros:")
+
+    def list_passengers_menu(self):
+        if input("Filtrar ou ordenar a lista? (s/N): ").strip().lower() != "s":
+            self.list_passengers()
+            return
+        status = input("Status do bilhete (vazio para todos): ").strip()
+        nationality = input("Nacionalidade (vazio para todas): ").strip()
+        checked_in = input("Check-in feito? (s/n, vazio para todos): ").strip().lower()
+        flight_id = input("ID do voo (vazio para todos): ").strip()
+        sort = input(f"Ordenar por ({', '.join(PASSENGER_SORTS)}; '-' antes para descendente): ").strip()
+        if checked_in not in ("", "s", "n") or (flight_id and not flight_id.isdigit()):
+            print("Entrada inválida!\n")
+            return
+        self.list_passengers(status or None, nationality or None, {"s": True, "n": False}.get(checked_in),
+                             int(flight_id) if flight_id else None, sort or "passenger_id")
 
     def update_passenger(self):
         try:
@@ -529,7 +1521,7 @@ class PassengerManager:
                 elif choice == "5":
                     self.update_passport_number(passenger)
                 elif choice == "6":
-                    self.save_passengers(passenger)
+                    self.record_passenger(passenger)
                     print(f"Passageiro {passenger.name} atualizado com sucesso!\n")
                     return
                 else:
@@ -537,15 +1529,49 @@ class PassengerManager:
         else:
             print("Passageiro não encontrado.\n")
 
+    def edit_passenger(self, passenger_id, name=None, age=None, gender=None, nationality=None, passport_number=None):
+        passenger = self.find_passenger_by_id(passenger_id)
+        if not passenger:
+            raise ValueError("Passageiro não encontrado.")
+        if age is not None and (not isinstance(age, int) or age < 0):
+            raise ValueError("Idade inválida! Deve ser um número inteiro.")
+        if gender is not None:
+            gender = GENDER_CODES.get(str(gender).lower(), gender)
+            if gender not in GENDER_CODES.values():
+                raise ValueError("Gênero inválido! Deve ser 'M', 'F' ou 'O'.")
+        if passport_number is not None:
+            passport_number = str(passport_number)
+            if not self.is_valid_passport(passport_number):
+                raise ValueError("Número de passaporte inválido! Deve ter 8 ou 9 dígitos.")
+            owner = self.find_passenger_by_passport(passport_number)
+            if owner is not None and owner != passenger:
+                raise ValueError(f"Já existe um passageiro com o número de passaporte {passport_number}.")
+
+        self.unindex_passenger(passenger)
+        if name is not None:
+            passenger.name = name
+        if age is not None:
+            passenger.age = age
+        if gender is not None:
+            passenger.gender = gender
+        if nationality is not None:
+            passenger.nationality = nationality
+        if passport_number is not None:
+            passenger.passport_number = passport_number
+        self.index_passenger(passenger)
+        self.record_passenger(passenger)
+        return passenger
+
     def find_passenger_by_id(self, passenger_id):
-        for passenger in self.passengers:
-            if passenger.passenger_id == passenger_id:
-                return passenger
-        return None
+        return self.passengers_by_id.get(passenger_id)
+
+    def find_passenger_by_passport(self, passport_number):
+        return self.passengers_by_passport.get(passport_number)
 
     def update_name(self, passenger):
         new_name = input(f"Nome atual: {passenger.name}\nNovo nome: ")
         passenger.name = new_name
+        self.name_index.add(passenger.passenger_id, new_name)
 
     def update_age(self, passenger):
         while True:
@@ -561,8 +1587,7 @@ class PassengerManager:
 
     def update_gender(self, passenger):
         gender_choice = input(f"Gênero atual: {passenger.gender}\nNovo gênero (M/F/O): ").lower()
-        gender_map = {'m': 'Masculino', 'f': 'Feminino', 'o': 'Outro'}
-        gender = gender_map.get(gender_choice)
+        gender = GENDER_CODES.get(gender_choice)
 
         if gender:
             passenger.gender = gender
@@ -576,29 +1601,52 @@ class PassengerManager:
     def update_passport_number(self, passenger):
         while True:
             new_passport_number = input(f"Número de passaporte atual: {passenger.passport_number}\nNovo número do passaporte (8 ou 9 dígitos): ")
-            if new_passport_number.isdigit() and len(new_passport_number) in [8, 9]:
+            if self.is_valid_passport(new_passport_number):
+                owner = self.find_passenger_by_passport(new_passport_number)
+                if owner is not None and owner != passenger:
+                    print(f"Erro: Já existe um passageiro com o número de passaporte {new_passport_number}.")
+                    continue
+                self.unindex_passenger(passenger)
                 passenger.passport_number = new_passport_number
+                self.index_passenger(passenger)
                 break
             print("Número de passaporte inválido! Deve ter 8 ou 9 dígitos.")
 
-    def remove_passenger(self):
+    def remove_passenger(self, flight_manager):
         try:
             passenger_id = int(input("ID do passageiro a remover: "))
         except ValueError:
             print("ID inválido! Deve ser um número inteiro.\n")
             return
-        for passenger in self.passengers:
-            if passenger.passenger_id == passenger_id:
-                self.passengers.remove(passenger)
-                self.save_passengers()
-                print(f"Passageiro {passenger.name}(ID:{passenger_id}), removido com sucesso!\n")
-                return
-        print("Passageiro não encontrado.\n")
+        try:
+            passenger = self.delete_passenger(passenger_id, flight_manager)
+            print(f"Passageiro {passenger.name}(ID:{passenger_id}), removido com sucesso!\n")
+        except ValueError as e:
+            print(f"{e}\n")
+
+    def delete_passenger(self, passenger_id, flight_manager):
+        # A booked passenger's seat is freed and handed to the waitlist, as in cancel_booking
+        passenger = self.find_passenger_by_id(passenger_id)
+        if not passenger:
+            raise ValueError("Passageiro não encontrado.")
+        flight = flight_manager.find_flight_by_id(passenger.flight_id)
+        seat_class = passenger.seat_class
+        self.release_booking(passenger, flight)
+        self.passengers.remove(passenger)
+        self.unindex_passenger(passenger)
+        with joint_transaction(self.store, flight_manager.store, self.waitlist_store):
+            self.record_passenger_removal(passenger_id)
+            if self.waitlist.remove(passenger_id):
+                self.record_waitlist_removal(passenger_id)
+            if flight:
+                flight_manager.record_flight(flight)
+                self.promote_waitlist(flight, seat_class, flight_manager)
+        return passenger
         
     def search_passenger(self):
         print("\nPesquisar Passageiro")
         print("1. Pesquisar por ID")
-        print("2. Pesquisar por Nome")
+        print("2. Pesquisar por Nome (ou início do nome, sem acentos)")
         print("3. Pesquisar por Número de Passaporte")
 
         choice = input("Escolha uma opção: ")
@@ -606,18 +1654,18 @@ class PassengerManager:
         if choice == "1":
             try:
                 passenger_id = int(input("Digite o ID do passageiro: "))
-                found = [p for p in self.passengers if p.passenger_id == passenger_id]
+                found = self.find_passengers(passenger_id=passenger_id)
             except ValueError:
                 print("ID inválido! Deve ser um número inteiro.\n")
                 return
 
         elif choice == "2":
-            name = input("Digite o nome do passageiro: ").strip().lower()
-            found = [p for p in self.passengers if p.name.lower() == name]
+            name = input("Digite o nome do passageiro: ")
+            found = self.find_passengers(name=name)
 
         elif choice == "3":
             passport_number = input("Digite o número do passaporte: ").strip()
-            found = [p for p in self.passengers if p.passport_number == passport_number]
+            found = self.find_passengers(passport_number=passport_number)
 
         else:
             print("Opção inválida!")
@@ -629,60 +1677,20 @@ class PassengerManager:
                 print(passenger)
         else:
             print("Nenhum passageiro encontrado com esses dados.\n")
-            
-    def book_flight(self):
-        passenger_id = input("Digite o ID do passageiro: ")
 
-        if not passenger_id.isdigit():
-            print("Erro: O ID do passageiro deve ser um número.\n")
-            return
-
-        passenger_id = int(passenger_id)
-        passenger = self.passenger_manager.find_passenger_by_id(passenger_id)
-
-        if not passenger:
-            print("Erro: Passageiro não encontrado.\n")
-            return
-
-        if passenger.flight_id:
-            print(f"Erro: O passageiro {passenger.name} já está reservado no voo {passenger.flight_id}.\n")
-            return
-
-        flight_id = input("Digite o ID do voo que deseja reservar: ")
-        flight = self.flight_manager.find_flight_by_id(flight_id)
-
-        if not flight:
-            print("Erro: Voo não encontrado.\n")
-            return
-
-        print("\nAssentos disponíveis por classe:")
-        for class_name, seats in flight.available_seats.items():
-            print(f"{class_name.capitalize()}: {seats} assentos")
-
-        class_map = {
-            "1": "first_class",
-            "2": "business",
-            "3": "economy"
-        }
-
-        class_choice = input("Escolha a classe (1 - Primeira Classe, 2 - Executiva, 3 - Econômica): ")
-        chosen_class = class_map.get(class_choice)
-
-        if not chosen_class:
-            print("Erro: Classe inválida.\n")
-            return
-
-        if flight.available_seats[chosen_class] <= 0:
-            print(f"Erro: Não há assentos disponíveis na classe {chosen_class.capitalize()}.\n")
-            return
-
-        passenger.assign_flight(flight_id)
-        passenger.update_ticket_status("Confirmado")
-        flight.available_seats[chosen_class] -= 1
-
-        print(f"Reserva confirmada para {passenger.name} no voo {flight_id} (Classe: {chosen_class.capitalize()}).\n")
-        
-    def check_in_passenger(self):
+    def find_passengers(self, passenger_id=None, name=None, passport_number=None, limit=20):
+        if passenger_id is not None:
+            passenger = self.find_passenger_by_id(passenger_id)
+            return [passenger] if passenger else []
+        if passport_number is not None:
+            passenger = self.find_passenger_by_passport(str(passport_number))
+            return [passenger] if passenger else []
+        if name is not None:
+            # Prefix search that ignores case and accents ("goncalo", "Ana S")
+            return [self.passengers_by_id[key] for key in self.name_index.search(name, limit)]
+        return []
+            
+    def check_in_passenger(self, flight_manager=None):
         try:
             passenger_id = int(input("ID do Passageiro para check-in: "))
         except ValueError:
@@ -720,26 +1728,91 @@ class PassengerManager:
             except ValueError:
                 print("Entrada inválida! Certifique-se de inserir números válidos para as dimensões.")
         
-        if self.check_luggage_size(weight, length, width, height):
+        if self.check_luggage_size(weight, length, width, height, *self.baggage_route(passenger, flight_manager)):
             passenger.check_in(weight)
-            self.save_passengers()
+            self.record_passenger(passenger)
             print(f"Check-in realizado com sucesso para {passenger.name} (ID: {passenger.passenger_id}).\n")
 
-    def check_luggage_size(self, weight, length, width, height):
-        MAX_WEIGHT = 23
-        MAX_TOTAL_SIZE = 158
-        
-        total_size = length + width + height
-        if weight > MAX_WEIGHT:
-            print(f"Erro: Peso da bagagem ultrapassa o limite máximo de {MAX_WEIGHT} kg.\nCheck-in negado!")
-            return False
-        if total_size > MAX_TOTAL_SIZE:
-            print(f"Erro: Tamanho total da bagagem ultrapassa o limite máximo de {MAX_TOTAL_SIZE} cm.\nCheck-in negado!")
+    def check_in_by_id(self, passenger_id, weight, length, width, height, flight_manager=None):
+        passenger = self.find_passenger_by_id(passenger_id)
+        if not passenger:
+            raise ValueError("Passageiro não encontrado.")
+        if passenger.checked_in:
+            raise ValueError("Passageiro já realizou o check-in.")
+        if weight <= 0:
+            raise ValueError("O peso deve ser um valor positivo.")
+        if length <= 0 or width <= 0 or height <= 0:
+            raise ValueError("As dimensões devem ser valores positivos.")
+        error = self.luggage_error(weight, length, width, height, *self.baggage_route(passenger, flight_manager))
+        if error:
+            raise ValueError(f"{error} Check-in negado!")
+        passenger.check_in(weight)
+        self.record_passenger(passenger)
+        return passenger
+
+    def check_in_batch(self, checkins, flight_manager=None):
+        # checkins: list of (passenger_id, weight, length, width, height).
+        # Each passenger is accepted or rejected on its own; the bags are
+        # checked column-wise against the limits for the passenger's class and
+        # route, and the accepted check-ins are persisted in one go.
+        results = []
+        candidates = []
+        columns = ([], [], [], [], [], [])
+        limits_cache = {}
+        seen = set()
+        for passenger_id, *measures in checkins:
+            result = {"passenger_id": passenger_id, "ok": False, "error": None}
+            results.append(result)
+            passenger = self.find_passenger_by_id(passenger_id)
+            measures = [parse_measure(value) for value in measures]
+            if not passenger:
+                result["error"] = "Passageiro não encontrado."
+            elif passenger.checked_in:
+                result["error"] = "Passageiro já realizou o check-in."
+            elif passenger_id in seen:
+                result["error"] = "O passageiro aparece mais de uma vez no lote."
+            elif len(measures) != 4 or None in measures:
+                result["error"] = "Entrada inválida! Peso e dimensões devem ser números."
+            else:
+                seen.add(passenger_id)
+                route = self.baggage_route(passenger, flight_manager)
+                if route not in limits_cache:
+                    limits_cache[route] = self.baggage_limits.limits_for(*route)
+                candidates.append((result, passenger))
+                for column, value in zip(columns, [*measures, *limits_cache[route]]):
+                    column.append(value)
+
+        accepted = []
+        for (result, passenger), code, weight, max_weight, max_total_size in zip(
+                candidates, baggage_errors(*columns), columns[0], columns[4], columns[5]):
+            if code:
+                result["error"] = f"{baggage_message(code, max_weight, max_total_size)} Check-in negado!"
+            else:
+                passenger.check_in(weight)
+                accepted.append(passenger)
+                result["ok"] = True
+        if accepted:
+            self.record_passengers(accepted)
+        return results
+
+    def baggage_route(self, passenger, flight_manager=None):
+        # (seat class, destination) used to pick the passenger's baggage limits
+        flight = flight_manager.find_flight_by_id(passenger.flight_id) if flight_manager and passenger.flight_id else None
+        return passenger.seat_class, flight.destination if flight else None
+
+    def check_luggage_size(self, weight, length, width, height, seat_class=None, destination=None):
+        error = self.luggage_error(weight, length, width, height, seat_class, destination)
+        if error:
+            print(f"Erro: {error}\nCheck-in negado!")
             return False
         return True
 
+    def luggage_error(self, weight, length, width, height, seat_class=None, destination=None):
+        max_weight, max_total_size = self.baggage_limits.limits_for(seat_class, destination)
+        return baggage_message(baggage_error(weight, length, width, height, max_weight, max_total_size), max_weight, max_total_size)
+
     def check_duplicate_passport(self, passport_number):
-        return any(p.passport_number == passport_number for p in self.passengers)
+        return passport_number in self.passengers_by_passport
     
     def book_flight(self, flight_manager):
         passenger_id = input("Digite o ID do passageiro: ")
@@ -759,6 +1832,11 @@ class PassengerManager:
         flight_manager.list_flights()
         flight_id = input("Introduza o ID do voo que deseja reservar: ")
 
+        if not flight_id.isdigit():
+            print("Erro: O ID do voo deve ser um número.\n")
+            return
+
+        flight_id = int(flight_id)
         flight = flight_manager.find_flight_by_id(flight_id)
         if not flight:
             print("Erro: Voo não encontrado.\n")
@@ -768,67 +1846,414 @@ class PassengerManager:
         for class_name, seats in flight.available_seats.items():
             print(f"{class_name.capitalize()}: {seats} assentos")
 
-        class_map = {
-            "1": "Primeira Classe",
-            "2": "Classe Executiva",
-            "3": "Classe Econômica"
-        }
-
         class_choice = input("Escolha a classe (1 - Primeira Classe, 2 - Executiva, 3 - Econômica): ")
-        chosen_class = class_map.get(class_choice)
+        chosen_class = SEAT_CLASS_CODES.get(class_choice)
 
         if not chosen_class:
             print("Erro: Classe inválida.\n")
             return
 
-        if flight.available_seats[chosen_class] <= 0:
+        if not flight.seats.reserve(chosen_class):
             print(f"Erro: Não há assentos disponíveis na classe {chosen_class.capitalize()}.\n")
+            if input("Deseja entrar na lista de espera? (s/n): ").strip().lower() == "s":
+                try:
+                    entry = self.join_waitlist(passenger_id, flight.flight_id, chosen_class, flight_manager)
+                    print(f"{passenger.name} está na posição {entry['position']} da lista de espera.\n")
+                except ValueError as e:
+                    print(f"{e}\n")
             return
 
         passenger.assign_flight(flight_id, chosen_class)
+        passenger.assign_seat(flight.assign_seat(chosen_class))
+        passenger.update_ticket_status("Confirmado")
+        self.index_booking(passenger)
+        with joint_transaction(self.store, flight_manager.store):
+            self.record_passenger(passenger)
+            flight_manager.record_flight(flight)
+
+        print(f"Reserva confirmada para {passenger.name} no voo {flight_id} (Classe: {chosen_class.capitalize()}, Assento: {passenger.seat_number}).\n")
+
+    def book_flights(self, bookings, flight_manager):
+        # bookings: list of (passenger_id, flight_id, seat_class). Either every
+        # booking is applied or none is; returns one result dict per entry.
+        results = []
+        requested = {}
+        booked_in_batch = set()
+        for passenger_id, flight_id, seat_class in bookings:
+            seat_class = SEAT_CLASS_CODES.get(seat_class, seat_class)
+            result = {"passenger_id": passenger_id, "flight_id": flight_id, "seat_class": seat_class, "ok": False, "error": None}
+            results.append(result)
+
+            passenger = self.find_passenger_by_id(passenger_id)
+            flight = flight_manager.find_flight_by_id(flight_id)
+            if not passenger:
+                result["error"] = "Passageiro não encontrado."
+            elif passenger.flight_id:
+                result["error"] = f"O passageiro já está reservado no voo {passenger.flight_id}."
+            elif passenger_id in booked_in_batch:
+                result["error"] = "O passageiro aparece mais de uma vez no lote."
+            elif not flight:
+                result["error"] = "Voo não encontrado."
+            elif seat_class not in flight.available_seats:
+                result["error"] = "Classe inválida."
+            elif flight.available_seats[seat_class] - requested.get((flight_id, seat_class), 0) <= 0:
+                result["error"] = f"Não há assentos disponíveis na classe {seat_class}."
+            else:
+                requested[(flight_id, seat_class)] = requested.get((flight_id, seat_class), 0) + 1
+                booked_in_batch.add(passenger_id)
+                result["ok"] = True
+
+        # Seats are reserved atomically per flight; if another booking took
+        # them since validation, everything reserved so far is released again.
+        reserved = []
+        if all(result["ok"] for result in results):
+            for (flight_id, seat_class), count in requested.items():
+                flight = flight_manager.find_flight_by_id(flight_id)
+                if not flight.seats.reserve(seat_class, count):
+                    for reserved_flight, reserved_class, reserved_count in reserved:
+                        reserved_flight.seats.release(reserved_class, reserved_count)
+                    for result in results:
+                        if result["flight_id"] == flight_id and result["seat_class"] == seat_class:
+                            result["ok"] = False
+                            result["error"] = f"Não há assentos disponíveis na classe {seat_class}."
+                    break
+                reserved.append((flight, seat_class, count))
+
+        if not all(result["ok"] for result in results):
+            for result in results:
+                if result["ok"]:
+                    result["ok"] = False
+                    result["error"] = "Lote rejeitado: outras reservas do lote são inválidas."
+            return results
+
+        # Passengers booked together on the same flight and class are seated
+        # side by side when a row has room for all of them.
+        groups = {}
+        for passenger_id, flight_id, seat_class in bookings:
+            seat_class = SEAT_CLASS_CODES.get(seat_class, seat_class)
+            groups.setdefault((flight_id, seat_class), []).append(self.find_passenger_by_id(passenger_id))
+        passengers = []
+        for (flight_id, seat_class), group in groups.items():
+            flight = flight_manager.find_flight_by_id(flight_id)
+            seats = flight.assign_adjacent_seats(seat_class, len(group))
+            for passenger, seat_number in zip(group, seats):
+                passenger.assign_flight(flight_id, seat_class)
+                passenger.assign_seat(seat_number)
+                passenger.update_ticket_status("Confirmado")
+                self.index_booking(passenger)
+                passengers.append(passenger)
+        flights = list({flight.flight_id: flight for flight, _, _ in reserved}.values())
+
+        with joint_transaction(self.store, flight_manager.store):
+            self.record_passengers(passengers)
+            flight_manager.record_flights(flights)
+        return results
+    
+    def load_waitlist(self):
+        self.waitlist = Waitlist(self.waitlist.priority)
+        try:
+            entries = self.waitlist_store.load()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for entry in sorted(entries, key=lambda entry: entry["requested_at"]):
+            self.waitlist.add(entry)
 
-        flight.available_seats[chosen_class] -= 1
+    def record_waitlist_entry(self, entry):
+        self.waitlist_store.write_changes({entry["passenger_id"]: entry}, self.waitlist.records)
 
-        passenger.update_ticket_status("Confirmado")
-        self.save_passengers()
+    def record_waitlist_removal(self, passenger_id):
+        self.waitlist_store.write_changes({passenger_id: None}, self.waitlist.records)
 
-        print(f"Reserva confirmada para {passenger.name} no voo {flight_id} (Classe: {chosen_class.capitalize()}).\n")
+    def join_waitlist(self, passenger_id, flight_id, seat_class, flight_manager, loyalty=0, fare=0):
+        seat_class = SEAT_CLASS_CODES.get(seat_class, seat_class)
+        passenger = self.find_passenger_by_id(passenger_id)
+        if not passenger:
+            raise ValueError("Passageiro não encontrado.")
+        if passenger.flight_id is not None:
+            raise ValueError("Passageiro já tem uma reserva.")
+        if passenger_id in self.waitlist:
+            raise ValueError("Passageiro já está numa lista de espera.")
+        flight = flight_manager.find_flight_by_id(flight_id)
+        if not flight:
+            raise ValueError("Voo não encontrado.")
+        if seat_class not in flight.available_seats:
+            raise ValueError("Classe inválida.")
+        if flight.available_seats[seat_class] > 0:
+            raise ValueError(f"Ainda há assentos disponíveis na classe {seat_class}; faça a reserva.")
+        entry = {
+            "passenger_id": passenger_id,
+            "flight_id": flight_id,
+            "seat_class": seat_class,
+            "requested_at": time.time(),
+            "loyalty": int(loyalty),
+            "fare": int(fare)
+        }
+        self.waitlist.add(entry)
+        self.record_waitlist_entry(entry)
+        return {**entry, "position": self.waitlist.position(passenger_id)}
+
+    def leave_waitlist(self, passenger_id):
+        entry = self.waitlist.remove(passenger_id)
+        if not entry:
+            raise ValueError("Passageiro não está em nenhuma lista de espera.")
+        self.record_waitlist_removal(passenger_id)
+        return entry
+
+    def promote_waitlist(self, flight, seat_class, flight_manager):
+        # Gives freed seats to the first passengers on the flight's waitlist for
+        # that class and persists every promotion; returns the promoted passengers.
+        promoted = []
+        with joint_transaction(self.store, flight_manager.store, self.waitlist_store):
+            while True:
+                entry = self.waitlist.peek(flight.flight_id, seat_class)
+                if entry is None:
+                    break
+                passenger = self.find_passenger_by_id(entry["passenger_id"])
+                if passenger and passenger.flight_id is None:
+                    if not flight.seats.reserve(seat_class):
+                        break
+                    passenger.assign_flight(flight.flight_id, seat_class)
+                    passenger.assign_seat(flight.assign_seat(seat_class))
+                    passenger.update_ticket_status("Confirmado")
+                    self.index_booking(passenger)
+                    self.record_passenger(passenger)
+                    promoted.append(passenger)
+                self.waitlist.pop(flight.flight_id, seat_class)
+                self.record_waitlist_removal(entry["passenger_id"])
+            if promoted:
+                flight_manager.record_flight(flight)
+        return promoted
+
+    def cancel_booking(self, passenger_id, flight_manager):
+        # Frees the passenger's seat and hands it to the waitlist; returns the
+        # passengers promoted as a result.
+        passenger = self.find_passenger_by_id(passenger_id)
+        if not passenger:
+            raise ValueError("Passageiro não encontrado.")
+        if passenger.flight_id is None:
+            raise ValueError("Passageiro não tem nenhuma reserva.")
+        if passenger.checked_in:
+            raise ValueError("Passageiro já realizou o check-in; a reserva não pode ser cancelada.")
+        flight = flight_manager.find_flight_by_id(passenger.flight_id)
+        seat_class = passenger.seat_class
+        self.release_booking(passenger, flight)
+        passenger.update_ticket_status("Cancelado")
+        with joint_transaction(self.store, flight_manager.store, self.waitlist_store):
+            self.record_passenger(passenger)
+            if flight:
+                flight_manager.record_flight(flight)
+            return self.promote_waitlist(flight, seat_class, flight_manager) if flight else []
+
+    def release_booking(self, passenger, flight):
+        # Frees the passenger's seat on flight (counter and seat map; flight
+        # is None when it is not loaded or no longer exists) and clears the
+        # booking in memory. Callers record it and promote the waitlist.
+        if flight and passenger.seat_class is not None:
+            flight.release_seat(passenger.seat_class)
+            if passenger.seat_number is not None:
+                flight.release_seat_number(passenger.seat_number)
+        self.unindex_booking(passenger)
+        passenger.flight_id = None
+        passenger.seat_class = None
+        passenger.seat_number = None
+
+    def release_flight_bookings(self, flight_id):
+        # For a flight that no longer exists: its passengers lose their booking
+        # (and check-in) and its waitlist is dropped. Returns the passengers released.
+        released = self.passengers_on_flight(flight_id)
+        for passenger in released:
+            self.release_booking(passenger, None)
+            passenger.checked_in = False
+            passenger.update_ticket_status("Cancelado")
+        with joint_transaction(self.store, self.waitlist_store):
+            if released:
+                self.record_passengers(released)
+            for entry in self.waitlist.drop_flight(flight_id):
+                self.record_waitlist_removal(entry["passenger_id"])
+        return released
+
+    def cancel_booking_menu(self, flight_manager):
+        try:
+            passenger_id = int(input("ID do passageiro cuja reserva deseja cancelar: "))
+        except ValueError:
+            print("ID inválido! Deve ser um número inteiro.\n")
+            return
+        try:
+            promoted = self.cancel_booking(passenger_id, flight_manager)
+        except ValueError as e:
+            print(f"{e}\n")
+            return
+        print(f"Reserva do passageiro {passenger_id} cancelada.")
+        for passenger in promoted:
+            print(f"Lista de espera: {passenger.name} (ID: {passenger.passenger_id}) recebeu o assento {passenger.seat_number}.")
 
-    
-    def generate_random_passenger(self):
+    def show_waitlist(self, flight_manager):
+        flight_id = flight_manager.get_valid_integer("ID do voo: ")
+        flight = flight_manager.find_flight_by_id(flight_id)
+        if not flight:
+            print("Voo não encontrado.\n")
+            return
+        for seat_class in flight.available_seats:
+            waiting = self.waitlist.waiting(flight_id, seat_class)
+            print(f"\n{seat_class}: {len(waiting)} em espera")
+            for position, entry in enumerate(waiting, 1):
+                passenger = self.find_passenger_by_id(entry["passenger_id"])
+                print(f"{position}. {passenger.name if passenger else '?'} (ID: {entry['passenger_id']})")
+
+    def flight_manifest(self, flight_id, flight_manager):
+        flight = flight_manager.find_flight_by_id(flight_id)
+        if not flight:
+            raise ValueError("Voo não encontrado.")
+        return list(manifest_rows(flight, self.passengers_on_flight(flight_id)))
+
+    def export_manifest(self, filename, flight_manager, flight_ids=None):
+        # Streams the manifest of the given flights (all of them by default,
+        # in departure order) to a .csv or .jsonl file; returns the row count.
+        if flight_ids is None:
+            flights = sorted(flight_manager.flights, key=lambda flight: (flight.departure_ts is None, flight.departure_ts or 0, flight.flight_id))
+        else:
+            flights = [flight_manager.find_flight_by_id(flight_id) for flight_id in flight_ids]
+            if None in flights:
+                raise ValueError(f"Voo não encontrado: {flight_ids[flights.index(None)]}.")
+
+        def rows():
+            for flight in flights:
+                yield from manifest_rows(flight, self.passengers_on_flight(flight.flight_id))
+
+        return write_manifest(rows(), filename)
+
+    def export_manifest_menu(self, flight_manager):
+        flight_id = input("ID do voo (vazio para todos os voos): ").strip()
+        if flight_id and not flight_id.isdigit():
+            print("Erro: O ID do voo deve ser um número.\n")
+            return
+        filename = input("Ficheiro de destino (.csv ou .jsonl): ").strip()
+        try:
+            count = self.export_manifest(filename, flight_manager, [int(flight_id)] if flight_id else None)
+        except (OSError, ValueError) as e:
+            print(f"Erro: {e}\n")
+            return
+        print(f"Manifesto exportado para {filename} ({count} passageiros).\n")
+
+    def generate_random_passenger(self, rng=random):
         nomes = [
             "João", "Maria", "Pedro", "Ana", "Carlos", "Sofia", "Miguel", "Beatriz", "Rui", "Joana", 
             "Tiago", "Marta", "Luís", "Cláudia", "Fernando", "Carla", "Ricardo", "Patrícia", 
             "Fábio", "Sara", "Nuno", "Francisca", "Gonçalo", "Inês"
         ]
-        nome = random.choice(nomes) + " " + random.choice(nomes)
-        idade = random.randint(18, 70)
-        genero = random.choice(["Masculino", "Feminino", "Outro"])
+        nome = rng.choice(nomes) + " " + rng.choice(nomes)
+        idade = rng.randint(18, 70)
+        genero = rng.choice(["Masculino", "Feminino", "Outro"])
         nacionalidade = "Portugal"
-        numero_passaporte = ''.join(random.choices(string.digits, k=random.choice([8, 9])))
+        numero_passaporte = ''.join(rng.choices(string.digits, k=rng.choice([8, 9])))
 
         return nome, idade, genero, nacionalidade, numero_passaporte
 
-    def generate_test_passengers(self, num_passengers=24):
+    def generate_test_passengers(self, num_passengers=24, seed=None):
+        rng = random.Random(seed)
+        novos = []
         for _ in range(num_passengers):
-            nome, idade, genero, nacionalidade, numero_passaporte = self.generate_random_passenger()
-            passageiro = Passenger(self.id_counter, nome, idade, genero, nacionalidade, numero_passaporte)
-            self.passengers.append(passageiro)
+            nome, idade, genero, nacionalidade, numero_passaporte = self.generate_random_passenger(rng)
+            while self.check_duplicate_passport(numero_passaporte):
+                numero_passaporte = ''.join(rng.choices(string.digits, k=len(numero_passaporte)))
+            passageiro = self.new_passenger(self.id_counter, nome, idade, genero, nacionalidade, numero_passaporte)
+            self.index_passenger(passageiro)
             self.id_counter += 1
-        self.save_passengers()
+            novos.append(passageiro)
+        self.record_passengers(novos)
         print(f"{num_passengers} passageiros de teste foram gerados com sucesso!")
         
 class MenuSystem:
-    def __init__(self):
-        self.passenger_manager = PassengerManager()
-        self.plane_manager = PlaneManager()
-        self.flight_manager = FlightManager(self.plane_manager)
-        
-        self.plane_manager.load_planes()
-        self.flight_manager.load_flights()
+    def __init__(self, journal=False, database=None, snapshot=False, columnar=False, metrics=None, writer=None,
+                 waitlist_priority="request_time", baggage_limits=None, parse_cache=False, prefetch=False, shared=False):
+        self.database = database
+        self.writer = writer
+        # Several terminals on the same JSON files; see sync()
+        self.shared = shared and not database
+        self.metrics = metrics
+        if database:
+            self.passenger_manager = PassengerManager(store=database.store("passengers"), columnar=columnar, writer=writer,
+                                                      waitlist_store=database.store("waitlist"), waitlist_priority=waitlist_priority,
+                                                      baggage_limits=baggage_limits)
+            self.plane_manager = PlaneManager(store=database.store("planes"), writer=writer)
+            self.flight_manager = FlightManager(self.plane_manager, store=database.store("flights"), writer=writer)
+        else:
+            self.passenger_manager = PassengerManager(journal=journal, snapshot=snapshot, columnar=columnar, writer=writer,
+                                                      waitlist_priority=waitlist_priority, baggage_limits=baggage_limits,
+                                                      cache=parse_cache, shared=shared)
+            self.plane_manager = PlaneManager(journal=journal, snapshot=snapshot, writer=writer, cache=parse_cache, shared=shared)
+            self.flight_manager = FlightManager(self.plane_manager, journal=journal, snapshot=snapshot, writer=writer,
+                                                cache=parse_cache, shared=shared)
+
+        if metrics:
+            metrics.instrument("passengers", self.passenger_manager)
+            metrics.instrument("planes", self.plane_manager)
+            metrics.instrument("flights", self.flight_manager)
+
+        # Nothing is read here; each menu loads what it needs on first use
+        # (flights need the planes, passengers need the flights' seat maps).
+        self.loader = LazyLoader()
+        self.loader.register("planes", self.plane_manager.load_planes)
+        self.loader.register("flights", self.flight_manager.load_flights, ("planes",))
+        self.loader.register("passengers", self.load_passengers, ("flights",))
+        if prefetch:
+            self.loader.prefetch()
+
+    def load_passengers(self):
         self.passenger_manager.load_passengers()
+        self.passenger_manager.load_waitlist()
+        self.flight_manager.restore_seat_assignments(self.passenger_manager.passengers)
+
+    def ensure_loaded(self, *collections):
+        self.loader.ensure(*collections)
+
+    def sync(self):
+        # Brings the loaded collections up to date with what other terminals
+        # wrote since the last sync, record by record. When a store can only
+        # catch up by being read again (another terminal compacted past
+        # entries we never saw), everything loaded is read again, since
+        # flights point at planes and seat maps come from passengers.
+        if not self.shared:
+            return
+        loaded = self.loader.is_loaded
+        rebuilt = []
+        changed_planes = {}
+        if loaded("planes"):
+            changed_planes = self.plane_manager.store.sync()
+            if changed_planes is None:
+                return self.reload()
+            self.plane_manager.apply_changes(changed_planes)
+        if loaded("flights"):
+            changes = self.flight_manager.store.sync()
+            if changes is None:
+                return self.reload()
+            rebuilt = self.flight_manager.apply_changes(changes)
+            # A resized plane changes the seat layout of all its flights
+            for plane_id in changed_planes:
+                for flight in self.flight_manager.flights_on_plane(plane_id):
+                    flight.seat_map = None
+                    rebuilt.append(flight)
+        if loaded("passengers"):
+            changes = self.passenger_manager.store.sync()
+            waitlist_changes = self.passenger_manager.waitlist_store.sync()
+            if changes is None:
+                return self.reload()
+            self.passenger_manager.apply_changes(changes, self.flight_manager)
+            if waitlist_changes != {}:
+                self.passenger_manager.load_waitlist()
+            for flight in rebuilt:
+                self.flight_manager.restore_seat_assignments(self.passenger_manager.passengers_on_flight(flight.flight_id))
+        if self.writer:
+            # Refused background writes are only reported once their records are back as on disk
+            self.writer.raise_conflicts()
+
+    def reload(self):
+        names = [name for name in ("planes", "flights", "passengers") if self.loader.is_loaded(name)]
+        self.loader.reset(*names)
+        self.ensure_loaded(*names)
 
     def passenger_menu(self):
+        self.ensure_loaded("passengers")
         while True:
             print("\nSistema de Gestão de Passageiros")
             print("1. Adicionar passageiro")
@@ -839,24 +2264,28 @@ class MenuSystem:
             print("6. Check-in de passageiro")
             print("7. Reservar voo")
             print("8. Voltar ao menu principal")
+            print("9. Cancelar reserva")
+            print("10. Ver lista de espera de um voo")
+            print("11. Importar passageiros de ficheiro (CSV/JSONL)")
             print("0. Gerar Passageiros para teste")
 
             choice = input("Escolha uma opção: ")
+            self.sync()
 
             if choice == "1":
                 self.passenger_manager.add_passenger()
             elif choice == "2":
-                self.passenger_manager.list_passengers()
+                self.passenger_manager.list_passengers_menu()
                 self.press_enter_to_continue()
             elif choice == "3":
                 self.passenger_manager.update_passenger()
             elif choice == "4":
-                self.passenger_manager.remove_passenger()
+                self.passenger_manager.remove_passenger(self.flight_manager)
             elif choice == "5":
                 self.passenger_manager.search_passenger()
                 self.press_enter_to_continue()
             elif choice == "6":
-                self.passenger_manager.check_in_passenger()
+                self.passenger_manager.check_in_passenger(self.flight_manager)
                 self.press_enter_to_continue()
             elif choice == "7":
                 self.passenger_manager.book_flight(self.flight_manager)  # Pass flight_manager here
@@ -864,6 +2293,15 @@ class MenuSystem:
             elif choice == "8":
                 print("Saindo do sistema...")
                 break
+            elif choice == "9":
+                self.passenger_manager.cancel_booking_menu(self.flight_manager)
+                self.press_enter_to_continue()
+            elif choice == "10":
+                self.passenger_manager.show_waitlist(self.flight_manager)
+                self.press_enter_to_continue()
+            elif choice == "11":
+                self.passenger_manager.import_passengers_menu()
+                self.press_enter_to_continue()
             elif choice == "0":
                 self.passenger_manager.generate_test_passengers()
                 self.press_enter_to_continue()
@@ -872,6 +2310,7 @@ class MenuSystem:
 
 
     def plane_menu(self):
+        self.ensure_loaded("planes")
         while True:
             print("\nGestão de aviões")
             print("1. Adicionar um avião")
@@ -883,15 +2322,18 @@ class MenuSystem:
             print("0. Criar aviões de teste")
 
             choice = input("Escolha uma opção: ")
+            self.sync()
 
             if choice == "1":
                 self.plane_manager.create_plane()
                 self.press_enter_to_continue()
             elif choice == "2":
-                self.plane_manager.remove_plane()
+                self.ensure_loaded("flights")
+                self.plane_manager.remove_plane(self.flight_manager)
                 self.press_enter_to_continue()
             elif choice == "3":
-                self.plane_manager.update_plane()
+                self.ensure_loaded("passengers")
+                self.plane_manager.update_plane(self.flight_manager, self.passenger_manager)
                 self.press_enter_to_continue()
             elif choice == "4":
                 self.plane_manager.list_planes()
@@ -910,6 +2352,7 @@ class MenuSystem:
 
 
     def flight_menu(self):
+        self.ensure_loaded("flights")
         while True:
             print("\nGestão de voos")
             print("1. Criar voo")
@@ -917,8 +2360,13 @@ class MenuSystem:
             print("3. Atualizar estado do voo")
             print("4. Apagar voo")
             print("5. Regressar ao menu principal")
+            print("6. Pesquisar partidas por destino e horário")
+            print("7. Relatório de taxa de ocupação")
+            print("8. Aviões livres e utilização num período")
+            print("9. Exportar manifesto de passageiros")
 
             choice = input("Escolha uma opção: ")
+            self.sync()
 
             if choice == "1":
                 self.flight_manager.add_flight()
@@ -930,11 +2378,25 @@ class MenuSystem:
                 self.flight_manager.update_flight_status()
                 self.press_enter_to_continue()
             elif choice == "4":
-                self.flight_manager.remove_flight()
+                self.ensure_loaded("passengers")
+                self.flight_manager.remove_flight(self.passenger_manager)
                 self.press_enter_to_continue()
             elif choice == "5":
                 print("Regressando ao menu principal...")
                 break
+            elif choice == "6":
+                self.flight_manager.search_flights()
+                self.press_enter_to_continue()
+            elif choice == "7":
+                self.flight_manager.show_load_factors()
+                self.press_enter_to_continue()
+            elif choice == "8":
+                self.flight_manager.show_plane_availability()
+                self.press_enter_to_continue()
+            elif choice == "9":
+                self.ensure_loaded("passengers")
+                self.passenger_manager.export_manifest_menu(self.flight_manager)
+                self.press_enter_to_continue()
             else:
                 print("Opção inválida. Tente novamente.")
 
@@ -951,23 +2413,108 @@ class MenuSystem:
 
             choice = input("Escolha uma opção: ")
 
-            if choice == "1":
-                self.passenger_menu()
-            elif choice == "2":
-                self.plane_menu()
-            elif choice == "3":
-                self.flight_menu()
-            elif choice == "4":
+            if choice == "4":
                 print("Fechando o programa...")
                 break
-            else:
+            menu = {"1": self.passenger_menu, "2": self.plane_menu, "3": self.flight_menu}.get(choice)
+            if not menu:
                 print("Opção inválida. Tente novamente.")
+                continue
+            try:
+                menu()
+            except ConflictError as e:
+                # Another terminal changed the same record; the next sync brings its version in
+                print(f"{e}\n")
 
 def clear_terminal():
     if os.name == 'nt':
         os.system('cls')
 
 if __name__ == "__main__":
-    clear_terminal()
-    menu_system = MenuSystem()
-    menu_system.main_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sistema de gestão aeroportuária")
+    parser.add_argument("--journal", action="store_true", help="Registar alterações num journal em vez de reescrever os ficheiros JSON")
+    parser.add_argument("--snapshot", action="store_true", help="Gravar também um snapshot binário e usá-lo no arranque quando for mais recente")
+    parser.add_argument("--prefetch", action="store_true", help="Carregar os dados numa thread em segundo plano enquanto o menu é mostrado")
+    parser.add_argument("--parse-cache", action="store_true", help="Guardar cada leitura dos ficheiros JSON numa cache binária, reutilizada enquanto o ficheiro não mudar")
+    parser.add_argument("--shared", action="store_true",
+                        help="Vários terminais sobre os mesmos ficheiros JSON: bloqueio, deteção de alterações concorrentes e atualização registo a registo (implica --journal)")
+    parser.add_argument("--columnar", action="store_true", help="Guardar os passageiros em memória por colunas (menos memória por passageiro)")
+    parser.add_argument("--sqlite", metavar="FICHEIRO", help="Usar uma base de dados SQLite em vez dos ficheiros JSON")
+    parser.add_argument("--import-json", action="store_true", help="Importar os ficheiros JSON para a base de dados SQLite e sair")
+    parser.add_argument("--export-json", action="store_true", help="Exportar a base de dados SQLite para os ficheiros JSON e sair")
+    parser.add_argument("--commands", metavar="FICHEIRO", help="Executar comandos JSON Lines do ficheiro (ou '-' para stdin) sem menu interativo")
+    parser.add_argument("--background-save", type=float, nargs="?", const=1.0, metavar="SEGUNDOS",
+                        help="Gravar as alterações numa thread em segundo plano, agrupando as feitas dentro deste intervalo (por omissão 1s)")
+    parser.add_argument("--waitlist-priority", choices=list(WAITLIST_PRIORITIES), default="request_time",
+                        help="Ordem de promoção das listas de espera")
+    parser.add_argument("--baggage-limits", metavar="FICHEIRO", help="Limites de bagagem por classe e por destino (JSON)")
+    parser.add_argument("--import-passengers", metavar="FICHEIRO", help="Importar passageiros de um ficheiro CSV ou JSON Lines e sair")
+    parser.add_argument("--import-workers", type=int, metavar="N", help="Processos usados para validar a importação (por omissão, um por CPU)")
+    parser.add_argument("--metrics", metavar="FICHEIRO", help="Medir as operações e escrever as métricas neste ficheiro (formato de texto Prometheus)")
+    parser.add_argument("--metrics-interval", type=float, default=15, metavar="SEGUNDOS", help="Intervalo entre escritas do ficheiro de métricas")
+    args = parser.parse_args()
+
+    try:
+        baggage_limits = BaggageLimits.from_file(args.baggage_limits) if args.baggage_limits else None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Erro ao ler os limites de bagagem: {e}")
+        sys.exit(1)
+
+    metrics = Metrics() if args.metrics else None
+    metrics_writer = MetricsWriter(metrics, args.metrics, args.metrics_interval).start() if metrics else None
+
+    # Pending writes and metrics are flushed and the database closed however
+    # the program ends (including an error or Ctrl-C)
+    database = writer = None
+    try:
+        database = SQLiteDatabase(args.sqlite) if args.sqlite else None
+        if database and (args.import_json or args.export_json):
+            for table, filename in [("planes", "planes.json"), ("flights", "flights.json"), ("passengers", "passengers.json"), ("waitlist", "waitlist.json")]:
+                if args.import_json:
+                    try:
+                        count = import_json(database.store(table), filename)
+                        print(f"{count} registos importados de {filename}.")
+                    except (FileNotFoundError, json.JSONDecodeError):
+                        print(f"Arquivo {filename} não encontrado ou erro de decodificação.")
+                    except ValueError as e:
+                        print(f"{filename} não foi importado: {e}")
+                else:
+                    count = export_json(database.store(table), filename)
+                    print(f"{count} registos exportados para {filename}.")
+            sys.exit(0)
+
+        writer = BackgroundWriter(args.background_save).start() if args.background_save is not None else None
+
+        if args.commands:
+            with contextlib.redirect_stdout(sys.stderr):
+                menu_system = MenuSystem(journal=args.journal, database=database, snapshot=args.snapshot, columnar=args.columnar, metrics=metrics, writer=writer,
+                                         waitlist_priority=args.waitlist_priority, baggage_limits=baggage_limits,
+                                         parse_cache=args.parse_cache, prefetch=args.prefetch, shared=args.shared)
+            if args.commands == "-":
+                run_commands(menu_system, sys.stdin, sys.stdout)
+            else:
+                with open(args.commands, "r") as command_file:
+                    run_commands(menu_system, command_file, sys.stdout)
+        elif args.import_passengers:
+            menu_system = MenuSystem(journal=args.journal, database=database, snapshot=args.snapshot, columnar=args.columnar, metrics=metrics, writer=writer,
+                                     waitlist_priority=args.waitlist_priority, baggage_limits=baggage_limits,
+                                     parse_cache=args.parse_cache, prefetch=args.prefetch, shared=args.shared)
+            menu_system.ensure_loaded("passengers")
+            try:
+                summary = menu_system.passenger_manager.import_passengers(args.import_passengers, workers=args.import_workers)
+                print(json.dumps(summary, ensure_ascii=False))
+            except (OSError, ValueError) as e:
+                print(f"Erro: {e}")
+        else:
+            clear_terminal()
+            menu_system = MenuSystem(journal=args.journal, database=database, snapshot=args.snapshot, columnar=args.columnar, metrics=metrics, writer=writer,
+                                     waitlist_priority=args.waitlist_priority, baggage_limits=baggage_limits,
+                                     parse_cache=args.parse_cache, prefetch=args.prefetch, shared=args.shared)
+            menu_system.main_menu()
+    finally:
+        if writer:
+            writer.stop()
+        if metrics_writer:
+            metrics_writer.stop()
+        if database:
+            database.close()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+
+MANIFEST_FIELDS = ("flight_id", "destination", "departure_time", "passenger_id", "name", "passport_number",
+                   "seat_class", "seat_number", "checked_in", "baggage_weight", "ticket_status")
+
+
+def seat_sort_key(passenger):
+    # Rows are numbered across cabins, so (row, letter) is front-to-back order;
+    # passengers without a seat go last, by ID.
+    seat_number = str(passenger.seat_number or "")
+    if len(seat_number) >= 2 and seat_number[:-1].isdigit():
+        return 0, int(seat_number[:-1]), seat_number[-1], passenger.passenger_id
+    return 1, 0, "", passenger.passenger_id
+
+
+def manifest_rows(flight, passengers):
+    for passenger in sorted(passengers, key=seat_sort_key):
+        yield {
+            "flight_id": flight.flight_id,
+            "destination": flight.destination,
+            "departure_time": flight.departure_time,
+            "passenger_id": passenger.passenger_id,
+            "name": passenger.name,
+            "passport_number": passenger.passport_number,
+            "seat_class": passenger.seat_class,
+            "seat_number": passenger.seat_number,
+            "checked_in": passenger.checked_in,
+            "baggage_weight": passenger.baggage_weight,
+            "ticket_status": passenger.ticket_status,
+        }
+
+
+def write_manifest(rows, filename):
+    # Writes rows as they come (.csv with a header, anything else as JSON
+    # Lines) and returns how many were written; nothing is buffered beyond
+    # the file object's own buffer.
+    count = 0
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        if filename.lower().endswith(".csv"):
+            writer = csv.DictWriter(file, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+    return count
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+# Manager methods timed by Metrics.instrument. The interactive ones include
+# the time spent waiting for input; their non-interactive counterparts
+# (book_flights, check_in_by_id, find_passengers) measure the work alone.
+INSTRUMENTED = {
+    "passengers": ("load_passengers", "save_passengers", "find_passenger_by_id", "find_passenger_by_passport",
+                   "find_passengers", "search_passenger", "book_flight", "book_flights",
+                   "check_in_passenger", "check_in_by_id", "check_in_batch",
+                   "import_passengers"),
+    "planes": ("load_planes", "save_planes", "find_plane_by_id"),
+    "flights": ("load_flights", "save_flights", "find_flight_by_id", "find_flights"),
+}
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Metrics:
+    # Call counts, latency histograms and bytes written per collection.
+    # Nothing is measured until instrument() wraps a manager, so code that
+    # never enables metrics runs the original methods untouched.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.bytes_written = {}
+
+    def observe(self, operation, seconds, failed=False):
+        with self.lock:
+            histogram = self.latencies.get(operation)
+            if histogram is None:
+                histogram = self.latencies[operation] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def add_bytes(self, collection, count):
+        if count > 0:
+            with self.lock:
+                self.bytes_written[collection] = self.bytes_written.get(collection, 0) + count
+
+    def timed(self, operation, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.observe(operation, time.perf_counter() - start, failed)
+        return wrapper
+
+    def instrument(self, collection, manager):
+        for name in INSTRUMENTED.get(collection, ()):
+            if hasattr(manager, name):
+                setattr(manager, name, self.timed(f"{collection}.{name}", getattr(manager, name)))
+        self.instrument_store(collection, manager.store)
+
+    def instrument_store(self, collection, store):
+        # Bytes are measured as the growth (journal) or final size (full
+        # rewrite) of the store's files; stores without files count nothing.
+        def file_sizes():
+            total = 0
+            filenames = [store.filename, store.journal_filename]
+            if store.snapshot:
+                filenames.append(store.snapshot_filename)
+            for filename in filenames:
+                if os.path.exists(filename):
+                    total += os.path.getsize(filename)
+            return total
+
+        def rewrite(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                result = function(*args, **kwargs)
+                self.add_bytes(collection, file_sizes())
+                return result
+            return wrapper
+
+        def append(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                before = file_sizes()
+                result = function(*args, **kwargs)
+                self.add_bytes(collection, file_sizes() - before)
+                return result
+            return wrapper
+
+        if not hasattr(store, "filename"):
+            return
+        store.save_all = rewrite(store.save_all)
+        store.compact = rewrite(store.compact)
+        for name in ("put", "delete"):
+            setattr(store, name, append(getattr(store, name)))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "operations": {
+                    operation: {
+                        "calls": histogram.count,
+                        "errors": self.errors.get(operation, 0),
+                        "seconds_total": round(histogram.total, 6),
+                        "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.counts)),
+                    }
+                    for operation, histogram in sorted(self.latencies.items())
+                },
+                "bytes_written": dict(sorted(self.bytes_written.items())),
+            }
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP airport_operation_seconds Duration of manager operations.",
+            "# TYPE airport_operation_seconds histogram",
+        ]
+        with self.lock:
+            for operation, histogram in sorted(self.latencies.items()):
+                label = f'operation="{operation}"'
+                cumulative = 0
+                for bound, count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'airport_operation_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"airport_operation_seconds_sum{{{label}}} {histogram.total:.6f}")
+                lines.append(f"airport_operation_seconds_count{{{label}}} {histogram.count}")
+            lines.append("# HELP airport_operation_errors_total Manager operations that raised.")
+            lines.append("# TYPE airport_operation_errors_total counter")
+            for operation, count in sorted(self.errors.items()):
+                lines.append(f'airport_operation_errors_total{{operation="{operation}"}} {count}')
+            lines.append("# HELP airport_bytes_written_total Bytes written to storage files.")
+            lines.append("# TYPE airport_bytes_written_total counter")
+            for collection, count in sorted(self.bytes_written.items()):
+                lines.append(f'airport_bytes_written_total{{collection="{collection}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename):
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "w") as file:
+            file.write(self.render_prometheus())
+        os.replace(temp_filename, filename)
+
+
+class MetricsWriter:
+    # Rewrites the Prometheus text file every interval seconds (for a node
+    # exporter textfile collector or similar) and once more on stop().
+    def __init__(self, metrics, filename, interval=15):
+        self.metrics = metrics
+        self.filename = filename
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="metrics-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            self.metrics.write_prometheus(self.filename)
+        except OSError:
+            pass
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.write()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import bisect
+import heapq
+import itertools
+import json
+import sys
+
+PAGE_SIZE = 20
+
+
+def sort_value(value):
+    # Comparable form of a field: None sorts after everything, text ignores case
+    if value is None:
+        return (1, 0)
+    if isinstance(value, str):
+        return (0, value.casefold())
+    return (0, value)
+
+
+def sort_key(field, id_field):
+    # (field, id) so that the key is unique and can serve as a cursor
+    return lambda record: (sort_value(getattr(record, field)), getattr(record, id_field))
+
+
+def encode_cursor(key):
+    return json.dumps(key, ensure_ascii=False)
+
+
+def decode_cursor(cursor):
+    def to_tuple(value):
+        return tuple(to_tuple(item) for item in value) if isinstance(value, list) else value
+
+    try:
+        return to_tuple(json.loads(cursor))
+    except (TypeError, ValueError):
+        raise ValueError("Cursor inválido.")
+
+
+def paginate(records, key, cursor=None, limit=PAGE_SIZE, where=None, descending=False, presorted=False):
+    # One page of records after cursor (the value returned as next_cursor
+    # by the previous page). Only limit + 1 records are kept at a time: a
+    # heap selects them from the filtered records, or, when records already
+    # come in ascending key order (presorted), the scan starts at the cursor
+    # (found by bisection in a list) and stops as soon as the page is full.
+    # Returns (page, next_cursor); next_cursor is None on the last page.
+    after = decode_cursor(cursor) if cursor else None
+    if limit < 1:
+        raise ValueError("O tamanho da página deve ser positivo.")
+    try:
+        if presorted and not descending and isinstance(records, list) and after is not None:
+            source = records
+            start = bisect.bisect_right(source, after, key=key)
+            records = (source[index] for index in range(start, len(source)))
+            after = None
+        if where:
+            records = filter(where, records)
+        if after is not None:
+            if descending:
+                records = (record for record in records if key(record) < after)
+            else:
+                records = (record for record in records if key(record) > after)
+        if presorted and not descending:
+            page = list(itertools.islice(records, limit + 1))
+        elif descending:
+            page = heapq.nlargest(limit + 1, records, key=key)
+        else:
+            page = heapq.nsmallest(limit + 1, records, key=key)
+    except TypeError:
+        raise ValueError("Cursor inválido para esta ordenação.")
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(key(page[-1]))
+    return page, None
+
+
+def parse_sort(sort, fields):
+    # "name" -> ("name", False); "-name" -> ("name", True)
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in fields:
+        raise ValueError(f"Ordenação inválida: {sort}. Opções: {', '.join(fields)} (prefixo '-' para descendente).")
+    return field, descending
+
+
+def browse(fetch, render, empty_message, title=None):
+    # Shows one page at a time; fetch(cursor) -> (page, next_cursor) and
+    # render(record) -> line. Each page goes out in a single write.
+    cursor = None
+    page_number = 1
+    while True:
+        page, cursor = fetch(cursor)
+        if not page and page_number == 1:
+            sys.stdout.write(empty_message + "\n\n")
+            return
+        lines = [render(record) for record in page]
+        if title and page_number == 1:
+            lines.insert(0, title)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        if cursor is None:
+            sys.stdout.write("\n")
+            return
+        answer = input(f"-- Página {page_number} -- ENTER para continuar, 'q' para sair: ")
+        if answer.strip().lower() == "q":
+            return
+        page_number += 1
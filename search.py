@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import bisect
+import functools
+import heapq
+import unicodedata
+
+
+# Names repeat a lot (loading passengers normalizes every one), so recent
+# results are memoized.
+@functools.lru_cache(maxsize=1 << 16)
+def normalize_name(name):
+    # "Gonçalo  Sá" -> "goncalo sa": no accents, case folded, single spaces
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = "".join(char if char.isalnum() else " " for char in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+class NameIndex:
+    # Inverted index from name tokens to the distinct normalized names that
+    # contain them, and from each name to its ids. Matching and ranking work on
+    # distinct names, so a common name shared by thousands of passengers costs
+    # the same as a unique one. The tokens are also kept sorted, so every token
+    # starting with a prefix is one bisect range away.
+    def __init__(self):
+        self.names = {}
+        self.ids_by_name = {}
+        self.names_by_token = {}
+        self.tokens = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, key, name):
+        if key in self.names:
+            self.remove(key)
+        normalized = normalize_name(name)
+        self.names[key] = normalized
+        ids = self.ids_by_name.get(normalized)
+        if ids is None:
+            ids = self.ids_by_name[normalized] = set()
+            for token in set(normalized.split()):
+                names = self.names_by_token.get(token)
+                if names is None:
+                    names = self.names_by_token[token] = set()
+                    bisect.insort(self.tokens, token)
+                names.add(normalized)
+        ids.add(key)
+
+    def remove(self, key):
+        normalized = self.names.pop(key, None)
+        if normalized is None:
+            return
+        ids = self.ids_by_name[normalized]
+        ids.discard(key)
+        if ids:
+            return
+        del self.ids_by_name[normalized]
+        for token in set(normalized.split()):
+            names = self.names_by_token[token]
+            names.discard(normalized)
+            if not names:
+                del self.names_by_token[token]
+                del self.tokens[bisect.bisect_left(self.tokens, token)]
+
+    def prefix_tokens(self, prefix):
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + "\U0010ffff")
+        return self.tokens[start:end]
+
+    def matching(self, prefix):
+        tokens = self.prefix_tokens(prefix)
+        if len(tokens) == 1:
+            return self.names_by_token[tokens[0]]
+        names = set()
+        for token in tokens:
+            names.update(self.names_by_token[token])
+        return names
+
+    def search(self, query, limit=20):
+        # Every query word must start some word of the name ("ana s" finds
+        # "Ana Sousa"). Best matches first: the whole name, then names that
+        # start with the query, then more whole-word hits, then shorter names;
+        # passengers sharing a name come out in id order.
+        query = normalize_name(query)
+        words = query.split()
+        if not words:
+            return []
+        # Narrowest word first keeps the intersection small
+        candidates = sorted((self.matching(word) for word in set(words)), key=len)
+        found = candidates[0]
+        for names in candidates[1:]:
+            found = found & names
+            if not found:
+                return []
+
+        def rank(name):
+            tokens = name.split()
+            return (name != query, not name.startswith(query), -sum(1 for word in words if word in tokens), len(name), name)
+
+        if limit is None:
+            ranked = sorted(found, key=rank)
+        else:
+            # Each name has at least one id, so limit names are always enough
+            ranked = heapq.nsmallest(limit, found, key=rank)
+        keys = []
+        for name in ranked:
+            keys.extend(sorted(self.ids_by_name[name]))
+            if limit is not None and len(keys) >= limit:
+                return keys[:limit]
+        return keys
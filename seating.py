@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import threading
+import time
+
+
+class SeatInventory:
+    # Per-flight seat counters guarded by the flight's own lock, so bookings on
+    # different flights never wait for each other.
+    hold_ids = itertools.count(1)
+
+    def __init__(self, available):
+        self.lock = threading.Lock()
+        self.available = available
+        self.holds = {}
+
+    def reserve(self, seat_class, count=1):
+        with self.lock:
+            self.expire_holds()
+            if self.available.get(seat_class, 0) < count:
+                return False
+            self.available[seat_class] -= count
+            return True
+
+    def release(self, seat_class, count=1):
+        with self.lock:
+            if seat_class in self.available:
+                self.available[seat_class] += count
+
+    def resize(self, changes):
+        # The plane's cabins changed by changes[seat_class] seats (negative to shrink)
+        with self.lock:
+            for seat_class, change in changes.items():
+                if seat_class in self.available:
+                    self.available[seat_class] += change
+
+    def hold(self, seat_class, count=1, timeout=300):
+        with self.lock:
+            self.expire_holds()
+            if self.available.get(seat_class, 0) < count:
+                return None
+            self.available[seat_class] -= count
+            hold_id = next(self.hold_ids)
+            self.holds[hold_id] = (seat_class, count, time.monotonic() + timeout)
+            return hold_id
+
+    def confirm_hold(self, hold_id):
+        with self.lock:
+            self.expire_holds()
+            return self.holds.pop(hold_id, None) is not None
+
+    def cancel_hold(self, hold_id):
+        with self.lock:
+            held = self.holds.pop(hold_id, None)
+            if held:
+                seat_class, count, _ = held
+                self.available[seat_class] += count
+
+    def expire_holds(self):
+        # Caller must hold self.lock
+        if not self.holds:
+            return
+        now = time.monotonic()
+        for hold_id, (seat_class, count, expires_at) in list(self.holds.items()):
+            if expires_at <= now:
+                del self.holds[hold_id]
+                self.available[seat_class] += count
+
+    def snapshot(self):
+        # Held seats are not persisted as taken: holds do not survive a restart.
+        with self.lock:
+            self.expire_holds()
+            counts = dict(self.available)
+            for seat_class, count, _ in self.holds.values():
+                counts[seat_class] += count
+            return counts
+
+
+# Seats per row in each cabin, in cabin order from the front of the plane.
+SEAT_LAYOUT = {
+    "Primeira Classe": 4,
+    "Classe Executiva": 4,
+    "Classe Econômica": 6
+}
+
+SEAT_LETTERS = "ABCDEFGHJK"
+
+
+class Cabin:
+    __slots__ = ("seat_class", "seats", "seats_per_row", "first_row", "last_row", "occupied", "free", "cursor", "released")
+
+    def __init__(self, seat_class, seats, seats_per_row, first_row):
+        self.seat_class = seat_class
+        self.seats = seats
+        self.seats_per_row = seats_per_row
+        self.first_row = first_row
+        self.last_row = first_row + (seats + seats_per_row - 1) // seats_per_row - 1
+        self.occupied = bytearray((seats + 7) // 8)
+        self.free = seats
+        # Allocation has walked up to cursor; seats freed below it since are
+        # kept in released (a heap, possibly with stale entries).
+        self.cursor = 0
+        self.released = []
+
+    def is_occupied(self, index):
+        return self.occupied[index >> 3] & (1 << (index & 7))
+
+    def mark(self, index):
+        self.occupied[index >> 3] |= 1 << (index & 7)
+        self.free -= 1
+
+    def unmark(self, index):
+        self.occupied[index >> 3] &= ~(1 << (index & 7))
+        self.free += 1
+        if index < self.cursor:
+            heapq.heappush(self.released, index)
+
+    def lowest_free(self):
+        # Lowest free index, or None; drops stale released entries and moves
+        # the cursor past occupied seats on the way.
+        released = self.released
+        while released:
+            if not self.is_occupied(released[0]):
+                return released[0]
+            heapq.heappop(released)
+        while self.cursor < self.seats and self.is_occupied(self.cursor):
+            self.cursor += 1
+        return self.cursor if self.cursor < self.seats else None
+
+    def label(self, index):
+        row = self.first_row + index // self.seats_per_row
+        return f"{row}{SEAT_LETTERS[index % self.seats_per_row]}"
+
+    def index(self, row, letter):
+        position = SEAT_LETTERS.find(letter)
+        if position < 0 or position >= self.seats_per_row:
+            return None
+        index = (row - self.first_row) * self.seats_per_row + position
+        return index if index < self.seats else None
+
+
+class SeatMap:
+    # One bit per seat and cabin. Allocation walks forward from a cursor that
+    # never moves back, and seats released behind it go to a heap, so the
+    # lowest free seat is found in O(log n) even after releases.
+    __slots__ = ("cabins",)
+
+    def __init__(self, seats_per_class):
+        self.cabins = {}
+        row = 1
+        for seat_class, seats_per_row in SEAT_LAYOUT.items():
+            seats = seats_per_class.get(seat_class, 0)
+            cabin = Cabin(seat_class, seats, seats_per_row, row)
+            self.cabins[seat_class] = cabin
+            row = cabin.last_row + 1
+
+    def free_count(self, seat_class):
+        cabin = self.cabins.get(seat_class)
+        return cabin.free if cabin else 0
+
+    def allocate(self, seat_class):
+        cabin = self.cabins.get(seat_class)
+        if not cabin or cabin.free == 0:
+            return None
+        index = cabin.lowest_free()
+        cabin.mark(index)
+        if index == cabin.cursor:
+            cabin.cursor += 1
+        return cabin.label(index)
+
+    def allocate_adjacent(self, seat_class, count):
+        # Returns count free seats side by side in one row, or None.
+        cabin = self.cabins.get(seat_class)
+        if not cabin or count > cabin.seats_per_row or cabin.free < count:
+            return None
+        row_start = (cabin.lowest_free() // cabin.seats_per_row) * cabin.seats_per_row
+        while row_start < cabin.seats:
+            run = 0
+            row_end = min(row_start + cabin.seats_per_row, cabin.seats)
+            for index in range(row_start, row_end):
+                run = 0 if cabin.is_occupied(index) else run + 1
+                if run == count:
+                    first = index - count + 1
+                    for seat in range(first, index + 1):
+                        cabin.mark(seat)
+                    return [cabin.label(seat) for seat in range(first, index + 1)]
+            row_start += cabin.seats_per_row
+        return None
+
+    def locate(self, seat_number):
+        seat_number = str(seat_number).strip().upper()
+        if len(seat_number) < 2 or not seat_number[:-1].isdigit():
+            return None, None
+        row, letter = int(seat_number[:-1]), seat_number[-1]
+        for cabin in self.cabins.values():
+            if cabin.first_row <= row <= cabin.last_row:
+                return cabin, cabin.index(row, letter)
+        return None, None
+
+    def occupy(self, seat_number):
+        cabin, index = self.locate(seat_number)
+        if cabin is None or index is None or cabin.is_occupied(index):
+            return False
+        cabin.mark(index)
+        return True
+
+    def release(self, seat_number):
+        cabin, index = self.locate(seat_number)
+        if cabin is None or index is None or not cabin.is_occupied(index):
+            return False
+        cabin.unmark(index)
+        return True
+
+    def seat_class_of(self, seat_number):
+        cabin, index = self.locate(seat_number)
+        return cabin.seat_class if cabin is not None and index is not None else None
@@ -0,0 +1,1093 @@
+# -*- coding: utf-8 -*-
+import array
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class ConflictError(ValueError):
+    pass
+
+
+@contextlib.contextmanager
+def joint_transaction(*stores):
+    # One transaction over several stores, e.g. the passengers and flights of
+    # a booking. SQLite stores share their database's transaction. Shared
+    # JSON stores buffer what is put meanwhile and, at the end, write it
+    # only if none of it conflicts in any of them (see write_together).
+    shared = [store for store in stores if getattr(store, "shared", False)]
+    with contextlib.ExitStack() as stack:
+        for store in stores:
+            stack.enter_context(store.lock if store in shared else store.transaction())
+        # A store already buffering belongs to an enclosing transaction
+        owned = [store for store in shared if store.pending is None]
+        for store in owned:
+            store.pending = []
+        try:
+            yield
+            batches = [(store, store.pending) for store in owned if store.pending]
+        finally:
+            for store in owned:
+                store.pending = None
+        if batches:
+            write_together(batches)
+
+
+def write_together(batches):
+    # batches: [(shared JsonStore, entries)]. Under every store's lock (taken
+    # in file name order, so two processes never wait on each other), either
+    # all entries are appended or, if a record changed elsewhere since this
+    # process last saw it, none is. In that case every record of the batches
+    # is queued to be read back from disk by the next sync(), undoing the
+    # refused changes in memory, and ConflictError is raised.
+    with contextlib.ExitStack() as stack:
+        for store, _ in sorted(batches, key=lambda batch: batch[0].filename):
+            stack.enter_context(store.locked())
+        error = None
+        for store, entries in batches:
+            store.pull()
+            error = error or store.conflict(entries)
+        if error:
+            for store, entries in batches:
+                store.requeue([store.entry_key(entry) for entry in entries])
+            raise error
+        for store, entries in batches:
+            store.append_entries(entries)
+
+
+@contextlib.contextmanager
+def file_lock(filename):
+    # Exclusive advisory lock on filename + ".lock", held for the with block.
+    # Only processes that also take it are kept out; the data files themselves
+    # are never locked. Without fcntl or msvcrt this is a no-op.
+    with open(filename + ".lock", "a+b") as file:
+        if fcntl:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_json_atomic(filename, data, indent=4):
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w") as file:
+        json.dump(data, file, indent=indent)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+def append_lines(filename, data):
+    # Appends data (complete lines, as bytes) and returns the new file size.
+    # A last line left unterminated by an interrupted write is closed first,
+    # so the new lines are not glued onto it; readers skip the torn line.
+    with open(filename, "a+b") as file:
+        size = file.seek(0, os.SEEK_END)
+        if size:
+            file.seek(size - 1)
+            if file.read(1) != b"\n":
+                data = b"\n" + data
+        file.write(data)
+        return file.tell()
+
+
+def write_json_records(filename, records, indent=4):
+    # Same text as write_json_atomic(filename, list(records)), but records can
+    # be any iterable and only one is encoded at a time.
+    temp_filename = filename + ".tmp"
+    padding = " " * indent
+    count = 0
+    with open(temp_filename, "w") as file:
+        for record in records:
+            text = json.dumps(record, indent=indent)
+            file.write(("[\n" if count == 0 else ",\n") + padding + text.replace("\n", "\n" + padding))
+            count += 1
+        file.write("\n]" if count else "[]")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+    return count
+
+
+def iter_json_array(filename, chunk_size=1 << 16, progress=None):
+    # Yields the elements of a top-level JSON array one at a time, keeping at
+    # most a couple of chunks of text in memory. progress(chars_read, total_size)
+    # is called after every chunk.
+    decoder = json.JSONDecoder()
+    total_size = os.path.getsize(filename)
+    with open(filename, "r") as file:
+        buffer = file.read(chunk_size)
+        chars_read = len(buffer)
+        eof = not buffer
+        position = 0
+        started = False
+        # separated: a value may come next (after '[' or ','); empty: nothing
+        # read since '[' yet
+        separated = empty = True
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer) and not started:
+                if buffer[position] != "[":
+                    raise json.JSONDecodeError("Expecting '['", buffer, position)
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == "]":
+                if separated and not empty:
+                    raise json.JSONDecodeError("Expecting value", buffer, position)
+                return
+            if position < len(buffer) and buffer[position] == ",":
+                if separated:
+                    raise json.JSONDecodeError("Expecting value", buffer, position)
+                separated = True
+                position += 1
+                continue
+            if position < len(buffer) and not separated:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+            if position < len(buffer):
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    if end < len(buffer) or eof:
+                        yield value
+                        position = end
+                        separated = empty = False
+                        continue
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+            elif eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, position)
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            chars_read += len(chunk)
+            buffer = buffer[position:] + chunk
+            position = 0
+            if progress:
+                progress(chars_read, total_size)
+
+
+SNAPSHOT_MAGIC = b"APSNAP1\n"
+INT_NULL = -2 ** 63
+BOOL_NULL = 2
+
+
+def column_type(values):
+    # Exact-type checks so that a round trip never turns 0 into 0.0 or True into 1
+    kinds = {type(value) for value in values if value is not None}
+    if kinds <= {int}:
+        return "int"
+    if kinds == {float}:
+        return "float"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {str}:
+        return "str"
+    return "json"
+
+
+def to_little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def write_binary_snapshot(filename, records, prefix=b""):
+    # Column-oriented layout: one typed array per field plus a shared table of
+    # interned strings (names, nationalities, statuses, seat dicts as JSON...).
+    fields = list(records[0]) if records else []
+    # Index 0 of the string table stands for None
+    strings = {None: 0}
+
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    columns = []
+    for field in fields:
+        values = [record.get(field) for record in records]
+        kind = column_type(values)
+        if kind == "int":
+            payload = array.array("q", [INT_NULL if value is None else value for value in values])
+        elif kind == "float":
+            payload = array.array("d", [float("nan") if value is None else value for value in values])
+            nulls = bytes(value is None for value in values)
+            columns.append((field, "float_nulls", nulls))
+        elif kind == "bool":
+            payload = bytes(BOOL_NULL if value is None else value for value in values)
+        elif kind == "str":
+            payload = array.array("I", [intern(value) for value in values])
+        else:
+            payload = array.array("I", [intern(json.dumps(value)) for value in values])
+        if isinstance(payload, array.array):
+            payload = to_little_endian(payload).tobytes()
+        columns.append((field, kind, payload))
+
+    # Lengths are in characters so the reader can decode the whole table at once
+    table = [value or "" for value in strings]
+    lengths = to_little_endian(array.array("I", map(len, table))).tobytes()
+    blob = "".join(table).encode("utf-8")
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        file.write(prefix)
+        file.write(SNAPSHOT_MAGIC)
+        file.write(struct.pack("<QIIQ", len(records), len(columns), len(table), len(blob)))
+        file.write(lengths)
+        file.write(blob)
+        for field, kind, payload in columns:
+            name = field.encode("utf-8")
+            kind = kind.encode("ascii")
+            file.write(struct.pack("<HB", len(name), len(kind)) + name + kind)
+            file.write(struct.pack("<Q", len(payload)))
+            file.write(payload)
+    os.replace(temp_filename, filename)
+
+
+def read_binary_snapshot(filename, prefix_size=0):
+    count, columns = read_binary_columns(filename, prefix_size)
+    if not columns:
+        return [{} for _ in range(count)]
+    return list(map(dict, map(zip, itertools.repeat(list(columns)), zip(*columns.values()))))
+
+
+def read_binary_columns(filename, prefix_size=0):
+    # Returns (record count, {field: list of values}) without building records.
+    # prefix_size bytes written before the snapshot (see JsonStore's cache) are skipped.
+    with open(filename, "rb") as file:
+        data = file.read()
+    if not data.startswith(SNAPSHOT_MAGIC, prefix_size):
+        raise ValueError(f"{filename} não é um snapshot binário válido.")
+    offset = prefix_size + len(SNAPSHOT_MAGIC)
+    count, column_count, string_count, blob_size = struct.unpack_from("<QIIQ", data, offset)
+    offset += struct.calcsize("<QIIQ")
+
+    lengths = to_little_endian(array.array("I", data[offset:offset + 4 * string_count]))
+    offset += 4 * string_count
+    text = data[offset:offset + blob_size].decode("utf-8")
+    offset += blob_size
+    ends = list(itertools.accumulate(lengths))
+    strings = list(map(text.__getitem__, map(slice, [0] + ends[:-1], ends)))
+    if strings:
+        strings[0] = None
+
+    columns = {}
+    float_nulls = {}
+    for _ in range(column_count):
+        name_length, kind_length = struct.unpack_from("<HB", data, offset)
+        offset += 3
+        field = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+        kind = data[offset:offset + kind_length].decode("ascii")
+        offset += kind_length
+        (size,) = struct.unpack_from("<Q", data, offset)
+        offset += 8
+        payload = data[offset:offset + size]
+        offset += size
+
+        if kind == "float_nulls":
+            float_nulls[field] = payload
+            continue
+        if kind == "int":
+            values = to_little_endian(array.array("q", payload)).tolist()
+            values = [None if value == INT_NULL else value for value in values] if INT_NULL in values else values
+        elif kind == "float":
+            values = to_little_endian(array.array("d", payload)).tolist()
+            nulls = float_nulls.get(field)
+            if nulls and any(nulls):
+                values = [None if null else value for value, null in zip(values, nulls)]
+        elif kind == "bool":
+            values = list(map((False, True, None).__getitem__, payload))
+        elif kind == "str":
+            values = list(map(strings.__getitem__, to_little_endian(array.array("I", payload))))
+        else:
+            indexes = to_little_endian(array.array("I", payload))
+            parsed = {index: json.loads(strings[index]) for index in set(indexes)}
+            if any(isinstance(value, (dict, list)) for value in parsed.values()):
+                # Mutable values (e.g. seat dicts) must not be shared between records
+                values = [json.loads(strings[index]) for index in indexes]
+            else:
+                values = list(map(parsed.__getitem__, indexes))
+        columns[field] = values
+    return count, columns
+
+
+# (mtime in ns, size) of the JSON file a parse cache was built from
+CACHE_STAMP = struct.Struct("<qQ")
+
+
+class JsonStore:
+    # JSON snapshot (the original file format) plus an optional JSON Lines journal.
+    # In journal mode every change appends one line to the .journal file and the
+    # snapshot is only rewritten once the journal reaches compact_every entries.
+    # With snapshot=True a binary copy (.snap) is written next to the JSON and
+    # read instead of it while it is at least as recent. With cache=True every
+    # parse of the JSON is kept in a binary .cache stamped with the file's mtime
+    # and size, and reused while both are unchanged.
+    #
+    # shared=True is for several processes on the same files: it implies the
+    # journal, every read and write happens under file_lock, and the
+    # collection has a generation number (the one in the .version file plus
+    # the journal entries after it). sync() returns the records other
+    # processes changed since this one last looked, and put/delete refuse
+    # (ConflictError) to overwrite a record changed meanwhile by someone else.
+    def __init__(self, filename, key, journal=False, compact_every=1000, snapshot=False, cache=False, shared=False):
+        self.filename = filename
+        self.key = key
+        self.journal = journal or shared
+        self.compact_every = compact_every
+        self.journal_filename = filename + ".journal"
+        self.journal_entries = 0
+        self.snapshot = snapshot
+        self.snapshot_filename = filename + ".snap"
+        self.cache = cache
+        self.cache_filename = filename + ".cache"
+        self.shared = shared
+        self.version_filename = filename + ".version"
+        self.lock = threading.RLock()
+        self.lock_depth = 0
+        # Generation of the .version file and of the last entry seen, and the
+        # journal byte offset up to which entries have been read
+        self.base = 0
+        self.generation = 0
+        self.journal_offset = 0
+        # key -> record (None when deleted) written by other processes and not
+        # yet handed out by sync(); stale when a compaction skipped past us
+        self.incoming = {}
+        self.stale = False
+        self.pending = None
+
+    def snapshot_is_current(self):
+        if not self.snapshot or not os.path.exists(self.snapshot_filename):
+            return False
+        if not os.path.exists(self.filename):
+            return True
+        return os.path.getmtime(self.snapshot_filename) >= os.path.getmtime(self.filename)
+
+    def source_stamp(self):
+        stat = os.stat(self.filename)
+        return CACHE_STAMP.pack(stat.st_mtime_ns, stat.st_size)
+
+    def read_cache(self):
+        # Records from the parse cache, or None when it is off, missing or stale
+        if not self.cache or not os.path.exists(self.cache_filename):
+            return None
+        try:
+            with open(self.cache_filename, "rb") as file:
+                stamp = file.read(CACHE_STAMP.size)
+            if stamp != self.source_stamp():
+                return None
+            return read_binary_snapshot(self.cache_filename, CACHE_STAMP.size)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def write_cache(self, records, stamp):
+        # stamp is taken before parsing, so a file changed meanwhile leaves a stale cache
+        if self.cache:
+            try:
+                write_binary_snapshot(self.cache_filename, records, prefix=stamp)
+            except OSError:
+                pass
+
+    def iter_and_cache(self, progress=None):
+        # Streams the JSON file and caches the parse once it has been read to
+        # the end. The raw records are kept until then, so caching gives up
+        # the streaming memory savings for that first load.
+        stamp = self.source_stamp()
+        records = []
+        for record in iter_json_array(self.filename, progress=progress):
+            records.append(record)
+            yield record
+        self.write_cache(records, stamp)
+
+    @contextlib.contextmanager
+    def locked(self):
+        # file_lock taken once per thread stack (flock would block on a second
+        # open of the lock file by this same process)
+        with self.lock:
+            if self.lock_depth:
+                self.lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self.lock_depth -= 1
+                return
+            with file_lock(self.filename):
+                self.lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self.lock_depth = 0
+
+    def load(self):
+        if self.shared:
+            with self.locked():
+                return self.load_shared()
+        has_journal = os.path.exists(self.journal_filename)
+        if self.snapshot_is_current():
+            records = read_binary_snapshot(self.snapshot_filename)
+        elif has_journal and not os.path.exists(self.filename):
+            records = []
+        else:
+            records = self.read_cache()
+            if records is None:
+                stamp = self.source_stamp()
+                with open(self.filename, "r") as file:
+                    records = json.load(file)
+                self.write_cache(records, stamp)
+        if has_journal:
+            records = self.replay(records)
+        return records
+
+    def replay(self, records):
+        by_key = {record[self.key]: record for record in records}
+        for key, record in self.read_journal().items():
+            if record is None:
+                by_key.pop(key, None)
+            else:
+                by_key[key] = record
+        return list(by_key.values())
+
+    def read_journal(self):
+        # key -> latest record, or None when the last entry deleted it
+        changes = {}
+        self.journal_entries = 0
+        with open(self.journal_filename, "rb") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn line from an interrupted write; later entries
+                    # start on a line of their own (see append_lines)
+                    continue
+                if entry["op"] == "put":
+                    changes[entry["data"][self.key]] = entry["data"]
+                elif entry["op"] == "del":
+                    changes[entry["key"]] = None
+                self.journal_entries += 1
+        return changes
+
+    def read_base(self):
+        try:
+            with open(self.version_filename, "r") as file:
+                return json.load(file)["base"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return 0
+
+    def write_base(self, base):
+        write_json_atomic(self.version_filename, {"base": base}, indent=None)
+
+    def read_journal_from(self, offset):
+        # (entries [(key, record or None)], new offset) for the complete lines
+        # after offset; a line still being written is left for the next read
+        try:
+            with open(self.journal_filename, "rb") as file:
+                file.seek(offset)
+                data = file.read()
+        except FileNotFoundError:
+            return [], 0
+        end = data.rfind(b"\n") + 1
+        entries = []
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry["op"] == "put":
+                entries.append((entry["data"][self.key], entry["data"]))
+            elif entry["op"] == "del":
+                entries.append((entry["key"], None))
+        return entries, offset + end
+
+    def read_compacted(self):
+        # Records as of the last compaction (snapshot, cache or JSON)
+        if self.snapshot_is_current():
+            return read_binary_snapshot(self.snapshot_filename)
+        if not os.path.exists(self.filename):
+            return []
+        records = self.read_cache()
+        if records is None:
+            stamp = self.source_stamp()
+            with open(self.filename, "r") as file:
+                records = json.load(file)
+            self.write_cache(records, stamp)
+        return records
+
+    def load_shared(self):
+        # Whole collection as of now; the caller holds the lock
+        self.base = self.read_base()
+        records = self.read_compacted()
+        entries, self.journal_offset = self.read_journal_from(0)
+        self.generation = self.base + len(entries)
+        self.journal_entries = len(entries)
+        self.incoming = {}
+        self.stale = False
+        by_key = {record[self.key]: record for record in records}
+        for key, record in entries:
+            if record is None:
+                by_key.pop(key, None)
+            else:
+                by_key[key] = record
+        return list(by_key.values())
+
+    def pull(self):
+        # Reads what other processes appended since the last pull into
+        # self.incoming; the caller holds the lock
+        base = self.read_base()
+        if base != self.base:
+            # Compacted or rewritten: entries up to base are now in the JSON
+            # and the journal starts over. If some of them were never read
+            # here, only a full reload can recover them.
+            if base != self.generation:
+                self.stale = True
+            self.base = self.generation = base
+            self.journal_offset = 0
+        entries, self.journal_offset = self.read_journal_from(self.journal_offset)
+        self.generation += len(entries)
+        self.journal_entries = self.generation - self.base
+        for key, record in entries:
+            self.incoming[key] = record
+
+    def sync(self):
+        # {key: record, or None when deleted} for the records other processes
+        # changed since the last load or sync, or None when the collection has
+        # to be loaded again in full. Always {} when the store is not shared.
+        if not self.shared:
+            return {}
+        with self.locked():
+            self.pull()
+            incoming, self.incoming = self.incoming, {}
+            if self.stale:
+                self.stale = False
+                return None
+            return incoming
+
+    def entry_key(self, entry):
+        return entry["data"][self.key] if entry["op"] == "put" else entry["key"]
+
+    def conflict(self, entries):
+        # ConflictError for entries if one of their records changed elsewhere
+        # since we last saw it, else None; the caller holds the lock and pulled
+        if self.stale:
+            return ConflictError("Os dados foram reorganizados noutro terminal e vão ser recarregados. Repita a operação.")
+        for entry in entries:
+            key = self.entry_key(entry)
+            if key in self.incoming:
+                return ConflictError(f"O registo {key} foi alterado noutro terminal. Os dados vão ser atualizados; repita a operação.")
+        return None
+
+    def requeue(self, keys):
+        # Hands the on-disk version of keys (None if absent) to the next
+        # sync(), so changes made here but refused go back to what is on
+        # disk; the caller holds the lock and pulled. A stale store is
+        # reloaded in full anyway.
+        missing = {key for key in keys if key not in self.incoming}
+        if not missing or self.stale:
+            return
+        found = {record[self.key]: record for record in self.read_compacted() if record[self.key] in missing}
+        entries, _ = self.read_journal_from(0)
+        for key, record in entries:
+            if key in missing:
+                found[key] = record
+        for key in missing:
+            self.incoming[key] = found.get(key)
+
+    def reread(self, keys):
+        # requeue() for callers outside a write, e.g. records changed in
+        # memory whose write was abandoned
+        if self.shared:
+            with self.locked():
+                self.pull()
+                self.requeue(keys)
+
+    def append_entries(self, entries):
+        # The caller holds the lock and checked conflict()
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode("utf-8")
+        # Everything up to the end is read: our entries, and a torn line
+        # before them that nobody counts
+        self.journal_offset = append_lines(self.journal_filename, data)
+        self.generation += len(entries)
+        self.journal_entries += len(entries)
+        if self.journal_entries >= self.compact_every:
+            self.compact_shared()
+
+    def compact_shared(self):
+        # Folds the journal into the JSON, from what is on disk rather than
+        # from this process's memory; the caller holds the lock
+        generation, offset, incoming = self.generation, self.journal_offset, self.incoming
+        records = self.load_shared()
+        # load_shared read the same journal we are up to date with
+        self.generation, self.journal_offset, self.incoming = generation, offset, incoming
+        write_json_atomic(self.filename, records)
+        if self.snapshot:
+            self.write_snapshot(records)
+        self.write_base(self.generation)
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self.base = self.generation
+        self.journal_offset = 0
+        self.journal_entries = 0
+
+    def iter_records(self, progress=None):
+        # Streaming counterpart of load(): the snapshot is parsed record by
+        # record and only the (bounded) journal is held in memory.
+        if self.shared:
+            yield from self.load()
+            return
+        changes = self.read_journal() if os.path.exists(self.journal_filename) else {}
+        if self.snapshot_is_current():
+            snapshot = iter(read_binary_snapshot(self.snapshot_filename))
+        elif changes and not os.path.exists(self.filename):
+            snapshot = iter(())
+        else:
+            cached = self.read_cache()
+            if cached is not None:
+                snapshot = iter(cached)
+            elif self.cache:
+                snapshot = self.iter_and_cache(progress)
+            else:
+                snapshot = iter_json_array(self.filename, progress=progress)
+        for record in snapshot:
+            key = record[self.key]
+            if key in changes:
+                record = changes.pop(key)
+                if record is None:
+                    continue
+            yield record
+        for record in changes.values():
+            if record is not None:
+                yield record
+
+    def save_all(self, records):
+        if self.shared:
+            # A full rewrite would drop whatever others wrote since our last sync
+            with self.locked():
+                self.pull()
+                if self.incoming or self.stale:
+                    raise ConflictError("A coleção foi alterada noutro terminal; gravação completa cancelada.")
+                self.write_all(records)
+                self.generation += 1
+                self.write_base(self.generation)
+                self.base = self.generation
+                self.journal_offset = 0
+            return
+        self.write_all(records)
+
+    def write_all(self, records):
+        write_json_atomic(self.filename, records)
+        if self.snapshot:
+            self.write_snapshot(records)
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self.journal_entries = 0
+
+    def write_snapshot(self, records):
+        write_binary_snapshot(self.snapshot_filename, records)
+
+    def append(self, entry):
+        if self.shared:
+            with self.lock:
+                if self.pending is not None:
+                    self.pending.append(entry)
+                    return
+            write_together([(self, [entry])])
+            return
+        append_lines(self.journal_filename, (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8"))
+        self.journal_entries += 1
+
+    def put(self, record):
+        self.append({"op": "put", "data": record})
+
+    def delete(self, key):
+        self.append({"op": "del", "key": key})
+
+    def needs_compaction(self):
+        # Shared stores compact themselves when writing
+        return not self.shared and self.journal_entries >= self.compact_every
+
+    def compact(self):
+        # Folds the journal into the JSON from what is on disk, so it does not
+        # matter how much of the collection the caller has loaded
+        self.write_all(self.load())
+
+    def write_changes(self, changes, all_records=None):
+        # Persists changes ({key: record, or None when deleted}). With a
+        # journal they are appended (after a compaction when one is due);
+        # otherwise the file is rewritten from all_records(), or, when the
+        # caller only loaded part of the collection (all_records is None),
+        # from the file with the changes applied.
+        if self.journal:
+            if self.needs_compaction():
+                self.compact()
+            with self.transaction():
+                for key, record in changes.items():
+                    if record is None:
+                        self.delete(key)
+                    else:
+                        self.put(record)
+            return
+        if all_records is not None:
+            self.save_all(all_records())
+            return
+        by_key = {record[self.key]: record for record in self.load()}
+        for key, record in changes.items():
+            if record is None:
+                by_key.pop(key, None)
+            else:
+                by_key[key] = record
+        self.save_all(list(by_key.values()))
+
+    def transaction(self):
+        # Shared: entries put meanwhile are written together at the end, or
+        # not at all if the block fails or one of them conflicts
+        if self.shared:
+            return joint_transaction(self)
+        return contextlib.nullcontext()
+
+
+class BackgroundWriter:
+    # Coalesces writes off the caller's thread. mark_dirty(flush, key) records
+    # that key changed; interval seconds after the first mark the writer
+    # thread calls flush(keys) once per collection with every key marked
+    # since, so a burst of edits becomes a single write. A key marked again
+    # while its flush runs is simply flushed again on the next round.
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        # ConflictErrors from flushes, for the caller's thread (raise_conflicts)
+        self.conflicts = []
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="background-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def mark_dirty(self, flush, key):
+        with self.condition:
+            self.pending.setdefault(flush, set()).add(key)
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if self.stopping:
+                    return
+                # Debounce: let the burst finish before writing
+                self.condition.wait_for(lambda: self.stopping, timeout=self.interval)
+                if self.stopping:
+                    return
+            self.flush()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.condition:
+                pending, self.pending = self.pending, {}
+            for flush, keys in pending.items():
+                try:
+                    flush(keys)
+                except ConflictError as e:
+                    # Retrying would fail the same way: the other terminal's
+                    # version stays and the store hands it to the next sync
+                    with self.condition:
+                        self.conflicts.append(e)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Erro ao gravar em segundo plano: {e}", file=sys.stderr)
+                    with self.condition:
+                        self.pending.setdefault(flush, set()).update(keys)
+                except ValueError as e:
+                    # e.g. a record the database refuses; it would be refused again
+                    print(f"Erro ao gravar em segundo plano: {e}", file=sys.stderr)
+
+    def raise_conflicts(self):
+        # Raises, on the caller's thread, the conflicts flushes ran into since the last call
+        with self.condition:
+            conflicts, self.conflicts = self.conflicts, []
+        if conflicts:
+            raise ConflictError(" ".join(dict.fromkeys(map(str, conflicts))))
+
+    def stop(self):
+        # Flushes everything still pending; safe to call more than once.
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.flush()
+        try:
+            self.raise_conflicts()
+        except ConflictError as e:
+            print(f"Erro ao gravar em segundo plano: {e}", file=sys.stderr)
+
+
+# (record field, column, SQL type) for each table. Fields stored as JSON text
+# are listed in json_fields.
+SQLITE_TABLES = {
+    "passengers": {
+        "key": "passenger_id",
+        "columns": [
+            ("passenger_id", "passenger_id", "INTEGER PRIMARY KEY"),
+            ("name", "name", "TEXT"),
+            ("age", "age", "INTEGER"),
+            ("gender", "gender", "TEXT"),
+            ("nationality", "nationality", "TEXT"),
+            ("passport_number", "passport_number", "TEXT"),
+            ("ticket_status", "ticket_status", "TEXT"),
+            ("checked_in", "checked_in", "INTEGER"),
+            ("baggage_weight", "baggage_weight", "REAL"),
+            ("flight_id", "flight_id", "INTEGER"),
+            ("seat_class", "seat_class", "TEXT"),
+            ("seat_number", "seat_number", "TEXT"),
+        ],
+        "bool_fields": ["checked_in"],
+        "json_fields": [],
+        "indexes": [
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_passengers_passport ON passengers (passport_number)",
+            "CREATE INDEX IF NOT EXISTS idx_passengers_flight ON passengers (flight_id)",
+        ],
+    },
+    "flights": {
+        "key": "flight_id",
+        "columns": [
+            ("flight_id", "flight_id", "INTEGER PRIMARY KEY"),
+            ("destination", "destination", "TEXT"),
+            ("departure_time", "departure_time", "TEXT"),
+            ("arrival_time", "arrival_time", "TEXT"),
+            ("plane_id", "plane_id", "INTEGER"),
+            ("status", "status", "TEXT"),
+            ("available_seats", "available_seats", "TEXT"),
+        ],
+        "bool_fields": [],
+        "json_fields": ["available_seats"],
+        "indexes": [
+            "CREATE INDEX IF NOT EXISTS idx_flights_destination_departure ON flights (destination, departure_time)",
+            "CREATE INDEX IF NOT EXISTS idx_flights_plane ON flights (plane_id)",
+        ],
+    },
+    "planes": {
+        "key": "ID",
+        "columns": [
+            ("ID", "plane_id", "INTEGER PRIMARY KEY"),
+            ("Modelo", "model_name", "TEXT"),
+            ("Primeira Classe", "executive_seats", "INTEGER"),
+            ("Classe Executiva", "business_seats", "INTEGER"),
+            ("Classe Econômica", "economy_seats", "INTEGER"),
+            ("Total", "total_seats", "INTEGER"),
+        ],
+        "bool_fields": [],
+        "json_fields": [],
+        "indexes": [],
+    },
+    "waitlist": {
+        "key": "passenger_id",
+        "columns": [
+            ("passenger_id", "passenger_id", "INTEGER PRIMARY KEY"),
+            ("flight_id", "flight_id", "INTEGER"),
+            ("seat_class", "seat_class", "TEXT"),
+            ("requested_at", "requested_at", "REAL"),
+            ("loyalty", "loyalty", "INTEGER"),
+            ("fare", "fare", "INTEGER"),
+        ],
+        "bool_fields": [],
+        "json_fields": [],
+        "indexes": [
+            "CREATE INDEX IF NOT EXISTS idx_waitlist_flight ON waitlist (flight_id, seat_class)",
+        ],
+    },
+}
+
+
+class SQLiteDatabase:
+    # One sqlite3 connection shared by the passenger, flight and plane stores so
+    # that a booking can update several tables in a single transaction.
+    def __init__(self, path="airport.db"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Held for a whole transaction, so a background writer thread and the
+        # caller's thread never interleave statements on the shared connection
+        self.lock = threading.RLock()
+        self.transaction_depth = 0
+        for table, spec in SQLITE_TABLES.items():
+            columns = ", ".join(f"{column} {sql_type}" for _, column, sql_type in spec["columns"])
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            for statement in spec["indexes"]:
+                self.connection.execute(statement)
+        self.connection.commit()
+
+    def store(self, table):
+        return SQLiteStore(self, table)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self.lock:
+            self.transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                self.transaction_depth -= 1
+                if self.transaction_depth == 0:
+                    self.connection.rollback()
+                raise
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.connection.commit()
+
+    def commit(self):
+        with self.lock:
+            if self.transaction_depth == 0:
+                self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class SQLiteStore:
+    # The managers load the tables once and answer lookups from their own
+    # indexes; find() runs the same lookups as indexed queries without
+    # loading anything.
+    def __init__(self, database, table):
+        self.database = database
+        self.table = table
+        self.spec = SQLITE_TABLES[table]
+        self.key = self.spec["key"]
+        self.fields = [field for field, _, _ in self.spec["columns"]]
+        self.column_names = [column for _, column, _ in self.spec["columns"]]
+        self.key_column = self.column_names[self.fields.index(self.key)]
+        placeholders = ", ".join("?" for _ in self.fields)
+        # An upsert on the key only: a clash on another unique column (the
+        # passport) fails instead of replacing that other row
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self.column_names if column != self.key_column)
+        self.insert_sql = (f"INSERT INTO {table} ({', '.join(self.column_names)}) VALUES ({placeholders}) "
+                           f"ON CONFLICT({self.key_column}) DO UPDATE SET {updates}")
+        self.select_sql = f"SELECT {', '.join(self.column_names)} FROM {table}"
+
+    def to_row(self, record):
+        row = []
+        for field in self.fields:
+            value = record.get(field)
+            if field in self.spec["json_fields"]:
+                value = json.dumps(value)
+            row.append(value)
+        return row
+
+    def from_row(self, row):
+        record = dict(zip(self.fields, row))
+        for field in self.spec["bool_fields"]:
+            record[field] = bool(record[field])
+        for field in self.spec["json_fields"]:
+            record[field] = json.loads(record[field]) if record[field] else {}
+        return record
+
+    def load(self):
+        return list(self.iter_records())
+
+    def iter_records(self, progress=None):
+        rows = self.database.connection.execute(f"{self.select_sql} ORDER BY {self.key_column}")
+        for row in rows:
+            yield self.from_row(row)
+
+    def find(self, range_field=None, start=None, end=None, **criteria):
+        # Records whose fields equal criteria and, with range_field, whose
+        # range_field is between start and end (both inclusive and optional),
+        # in key order
+        columns = dict(zip(self.fields, self.column_names))
+        conditions = [f"{columns[field]} = ?" for field in criteria]
+        values = list(criteria.values())
+        for bound, operator in ((start, ">="), (end, "<=")):
+            if range_field is not None and bound is not None:
+                conditions.append(f"{columns[range_field]} {operator} ?")
+                values.append(bound)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.database.connection.execute(f"{self.select_sql}{where} ORDER BY {self.key_column}", values)
+        return [self.from_row(row) for row in rows]
+
+    def save_all(self, records):
+        with self.database.transaction():
+            self.database.connection.execute(f"DELETE FROM {self.table}")
+            try:
+                self.database.connection.executemany(self.insert_sql, [self.to_row(record) for record in records])
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Registos em conflito na tabela {self.table}: {e}") from e
+
+    def put(self, record):
+        with self.database.transaction():
+            try:
+                self.database.connection.execute(self.insert_sql, self.to_row(record))
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"O registo {record.get(self.key)} está em conflito na tabela {self.table}: {e}") from e
+
+    def delete(self, key):
+        with self.database.transaction():
+            self.database.connection.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+
+    def write_changes(self, changes, all_records=None):
+        # Deletions go first, and a record whose passport is still held by
+        # one written later in the batch waits for it, so the order of
+        # changes does not matter
+        with self.database.transaction():
+            for key, record in changes.items():
+                if record is None:
+                    self.delete(key)
+            waiting = [record for record in changes.values() if record is not None]
+            while waiting:
+                failed = []
+                for record in waiting:
+                    try:
+                        self.put(record)
+                    except ValueError as e:
+                        failed.append((record, e))
+                if len(failed) == len(waiting):
+                    raise failed[0][1]
+                waiting = [record for record, _ in failed]
+
+    def sync(self):
+        return {}
+
+    def reread(self, keys):
+        pass
+
+    def transaction(self):
+        return self.database.transaction()
+
+
+def import_json(store, filename):
+    records = JsonStore(filename, store.key).load()
+    store.save_all(records)
+    return len(records)
+
+
+def export_json(store, filename):
+    records = store.load()
+    JsonStore(filename, store.key).save_all(records)
+    return len(records)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import MenuSystem
+
+ECONOMY = "Classe Econômica"
+# name, gender and passport of the passengers in the menu fixture (IDs 1 to 4)
+PASSENGERS = [("Ana", "F", "12345670"), ("Rui", "M", "12345671"), ("Eva", "F", "12345672"), ("Leo", "M", "12345673")]
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # The managers read and write their JSON files in the current directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def open_menu(**options):
+    menu = MenuSystem(**options)
+    menu.ensure_loaded("passengers")
+    return menu
+
+
+def populate(menu, seats=(0, 0, 3)):
+    # One plane with seats (first, executive, economy), flying to Lisboa
+    # (flight 1) a day after it flies to Porto (flight 2), and PASSENGERS
+    menu.plane_manager.register_plane("A320", *seats)
+    menu.flight_manager.register_flight("Lisboa", "2026-01-02 10:00", "2026-01-02 11:00", 1)
+    menu.flight_manager.register_flight("Porto", "2026-01-01 10:00", "2026-01-01 11:00", 1)
+    for name, gender, passport_number in PASSENGERS:
+        menu.passenger_manager.register_passenger(name, 30, gender, "PT", passport_number)
+    return menu
+
+
+def book(menu, passenger_id, flight_id=1, seat_class=ECONOMY):
+    return menu.passenger_manager.book_flights([(passenger_id, flight_id, seat_class)], menu.flight_manager)[0]
+
+
+@pytest.fixture
+def seats():
+    # The menu fixture's cabins; a test module overrides this fixture to change them
+    return (0, 0, 3)
+
+
+@pytest.fixture
+def menu(seats):
+    return populate(open_menu(), seats)
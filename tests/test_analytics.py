@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+
+import pytest
+
+import analytics
+from analytics import export_report, load_factor_report
+from conftest import ECONOMY
+from main import Flight, Plane
+
+
+def flights():
+    small, large = Plane("A320", 1, 2, 2, 6), Plane("A330", 2, 0, 4, 20)
+    lisbon = Flight(1, "Lisboa", "2026-01-01 10:00", "2026-01-01 12:00", small)
+    porto = Flight(2, "Porto", "2026-01-02 10:00", "2026-01-02 11:00", large)
+    undated = Flight(3, "Lisboa", "sem data", "sem data", small)
+    lisbon.seats.reserve(ECONOMY, 3)
+    lisbon.seats.reserve("Primeira Classe")
+    porto.seats.reserve(ECONOMY, 10)
+    return [lisbon, porto, undated]
+
+
+def test_load_factor_report():
+    report = load_factor_report(flights())
+    assert (report["flights"], report["capacity"], report["booked"]) == (3, 44, 14)
+    assert report["load_factor"] == round(14 / 44, 4)
+    # Seat hours: 10 seats x 2h + 24 seats x 1h; the undated flight counts no hours
+    assert report["seat_hours"] == 44.0
+    assert report["booked_seat_hours"] == 18.0
+    economy = next(entry for entry in report["by_class"] if entry["seat_class"] == ECONOMY)
+    assert (economy["capacity"], economy["booked"], economy["load_factor"]) == (32, 13, round(13 / 32, 4))
+    lisbon = next(row for row in report["by_destination"] if row["destination"] == "Lisboa")
+    assert (lisbon["flights"], lisbon["capacity"], lisbon["booked"]) == (2, 20, 4)
+    assert [row["day"] for row in report["by_day"]] == ["2026-01-01", "2026-01-02", "N/A"]
+
+
+def test_python_fallback_matches_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    expected = load_factor_report(flights())
+    monkeypatch.setattr(analytics, "np", None)
+    assert load_factor_report(flights()) == expected
+
+
+def test_empty_report():
+    report = load_factor_report([])
+    assert (report["flights"], report["capacity"], report["load_factor"]) == (0, 0, None)
+
+
+def test_export_as_csv_and_json():
+    report = load_factor_report(flights())
+    export_report(report, "report.csv")
+    with open("report.csv", newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0]["group"] == "total" and rows[0]["booked"] == "14"
+    assert {row["group"] for row in rows[1:]} == {"by_class", "by_destination", "by_plane_type", "by_day"}
+    export_report(report, "report.json")
+    with open("report.json", encoding="utf-8") as file:
+        assert json.load(file) == report
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+import threading
+
+from conftest import ECONOMY, open_menu, populate
+from storage import BackgroundWriter
+
+
+def test_burst_of_marks_is_flushed_once():
+    calls = []
+    flushed = threading.Event()
+
+    def flush(keys):
+        calls.append(set(keys))
+        flushed.set()
+
+    writer = BackgroundWriter(interval=0.05).start()
+    for key in (1, 2, 1, 3):
+        writer.mark_dirty(flush, key)
+    assert flushed.wait(2)
+    writer.stop()
+    assert calls == [{1, 2, 3}]
+
+
+def test_failed_flush_is_retried():
+    calls = []
+
+    def flush(keys):
+        calls.append(set(keys))
+        if len(calls) == 1:
+            raise OSError("disco cheio")
+
+    writer = BackgroundWriter()
+    writer.mark_dirty(flush, 1)
+    writer.flush()
+    writer.mark_dirty(flush, 2)
+    writer.flush()
+    assert calls == [{1}, {1, 2}]
+
+
+def test_manager_changes_are_written_on_stop():
+    writer = BackgroundWriter(interval=60).start()
+    menu = populate(open_menu(writer=writer), (0, 0, 2))
+    assert menu.passenger_manager.book_flights([(1, 1, "3")], menu.flight_manager)[0]["ok"]
+    menu.passenger_manager.delete_passenger(2, menu.flight_manager)
+    assert not os.path.exists("passengers.json")
+
+    writer.stop()
+    reloaded = open_menu()
+    assert [p.passenger_id for p in reloaded.passenger_manager.passengers] == [1, 3, 4]
+    assert reloaded.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 1
+
+
+def test_metrics_are_written_when_the_menu_ends_with_an_error():
+    main = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    # With stdin closed the first input() raises EOFError
+    result = subprocess.run([sys.executable, main, "--metrics", "metrics.prom", "--sqlite", "airport.db",
+                             "--background-save", "5"], stdin=subprocess.DEVNULL, capture_output=True, timeout=60)
+    assert result.returncode != 0 and b"EOFError" in result.stderr
+    with open("metrics.prom") as file:
+        assert "airport_operation_seconds" in file.read()
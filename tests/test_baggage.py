@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import baggage
+from baggage import (BAD_DIMENSIONS, BAD_WEIGHT, BAGGAGE_OK, TOO_HEAVY, TOO_LARGE, BaggageLimits,
+                     baggage_error, baggage_errors)
+from conftest import open_menu
+
+BAGS = ([10, 0, 10, 30, 10, 23], [50, 50, -1, 50, 60, 50], [30, 30, 30, 30, 50, 30], [20, 20, 20, 20, 50, 20],
+        [23] * 6, [158] * 6)
+
+
+def test_column_checks_match_the_single_bag_check():
+    expected = [BAGGAGE_OK, BAD_WEIGHT, BAD_DIMENSIONS, TOO_HEAVY, TOO_LARGE, BAGGAGE_OK]
+    assert [baggage_error(*bag) for bag in zip(*BAGS)] == expected
+    assert baggage_errors(*BAGS) == expected
+
+
+def test_pure_python_fallback(monkeypatch):
+    monkeypatch.setattr(baggage, "np", None)
+    assert baggage_errors(*BAGS) == [BAGGAGE_OK, BAD_WEIGHT, BAD_DIMENSIONS, TOO_HEAVY, TOO_LARGE, BAGGAGE_OK]
+    assert baggage_errors([], [], [], [], [], []) == []
+
+
+def test_route_limits_win_over_class_limits():
+    limits = BaggageLimits(by_class={"Primeira Classe": {"max_weight": 32}},
+                           by_route={"Funchal": {"max_total_size": 200}, "São Paulo": {"max_weight": 40}})
+    assert limits.limits_for() == (23, 158)
+    assert limits.limits_for("Primeira Classe") == (32, 158)
+    assert limits.limits_for("Primeira Classe", " funchal") == (32, 200)
+    assert limits.limits_for("Primeira Classe", "São Paulo") == (40, 158)
+
+
+def test_batched_check_in_accepts_and_rejects_each_passenger():
+    menu = open_menu(baggage_limits=BaggageLimits(by_route={"Funchal": {"max_weight": 30}}))
+    menu.plane_manager.register_plane("A320", 0, 0, 4)
+    menu.flight_manager.register_flight("Funchal", "2026-01-01 10:00", "2026-01-01 11:00", 1)
+    passengers = menu.passenger_manager
+    for index in range(4):
+        passengers.register_passenger(f"P{index}", 30, "F", "PT", f"1000000{index}")
+    assert passengers.book_flights([(1, 1, "3")], menu.flight_manager)[0]["ok"]
+    results = passengers.check_in_batch([(1, 28, 50, 30, 20), (2, 28, 50, 30, 20), (3, "x", 1, 1, 1),
+                                         (4, 10, 50, 30, 20), (4, 10, 50, 30, 20), (9, 1, 1, 1, 1)],
+                                        menu.flight_manager)
+    assert [result["ok"] for result in results] == [True, False, False, True, False, False]
+    assert results[1]["error"] == "Peso da bagagem ultrapassa o limite máximo de 23 kg. Check-in negado!"
+    assert results[4]["error"] == "O passageiro aparece mais de uma vez no lote."
+    assert passengers.find_passenger_by_id(1).checked_in
+    with pytest.raises(ValueError):
+        passengers.check_in_by_id(1, 10, 50, 30, 20, menu.flight_manager)
+
+    reloaded = open_menu()
+    assert [p.passenger_id for p in reloaded.passenger_manager.passengers if p.checked_in] == [1, 4]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import json
+from collections import Counter
+
+from benchmark import bench_memory, bench_scale, bench_snapshot, rounded, timed
+from datagen import dataset_records, flight_records, passenger_records, plane_records, write_dataset
+
+
+def test_timings_are_rounded_only_for_display():
+    _, seconds = timed(sum, range(1000))
+    assert seconds > 0
+    assert rounded({"load_seconds": 0.123456, "lookups_per_second": 7}) == {"load_seconds": 0.1235, "lookups_per_second": 7}
+
+
+def test_scale_benchmark_runs_on_a_small_dataset(capsys):
+    result = bench_scale(300, ops=50, write_ops=3)
+    assert result["passengers"] == 300
+    assert result["batch_booking_ok"]
+    assert result["passenger_id_lookups_per_second"] > 0
+    assert capsys.readouterr().out == ""
+
+
+def test_generated_dataset_is_deterministic_and_consistent():
+    counts = write_dataset(".", passengers=2000, seed=7)
+    with open("passengers.json") as file:
+        passengers = json.load(file)
+    with open("flights.json") as file:
+        flights = {flight["flight_id"]: flight for flight in json.load(file)}
+    assert counts == {"planes": 3, "flights": 20, "passengers": 2000}
+    assert len({p["passport_number"] for p in passengers}) == 2000
+    assert passengers == list(passenger_records(2000, flight_records(20, plane_records(3, 7), 7), 7))
+
+    booked = Counter((p["flight_id"], p["seat_class"]) for p in passengers if p["flight_id"] is not None)
+    seats = Counter((p["flight_id"], p["seat_number"]) for p in passengers if p["flight_id"] is not None)
+    assert max(seats.values()) == 1
+    planes = {plane["ID"]: plane for plane in plane_records(3, 7)}
+    for (flight_id, seat_class), count in booked.items():
+        flight = flights[flight_id]
+        assert flight["available_seats"][seat_class] + count == planes[flight["plane_id"]][seat_class]
+
+
+def test_snapshot_and_memory_benchmarks_use_the_generated_passengers():
+    _, _, passengers = dataset_records(500)
+    booked = sum(1 for passenger in passengers if passenger["flight_id"] is not None)
+    assert 0 < booked < 500
+    assert bench_snapshot(500)["passengers"] == 500
+    assert bench_memory(500)["same_records"]
+
+
+def test_generated_flights_never_share_a_plane():
+    by_plane = {}
+    for flight in flight_records(200, plane_records(4)):
+        by_plane.setdefault(flight["plane_id"], []).append((flight["departure_time"], flight["arrival_time"]))
+    for intervals in by_plane.values():
+        intervals.sort()
+        assert all(arrival <= departure for (_, arrival), (departure, _) in zip(intervals, intervals[1:]))
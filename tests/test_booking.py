@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from conftest import ECONOMY, open_menu, populate
+from storage import SQLiteDatabase
+
+
+def test_batch_is_booked_together_and_seated_side_by_side(menu):
+    results = menu.passenger_manager.book_flights([(1, 1, "3"), (2, 1, ECONOMY), (3, 1, "3")], menu.flight_manager)
+    assert all(result["ok"] for result in results)
+    seats = [menu.passenger_manager.find_passenger_by_id(passenger_id).seat_number for passenger_id in (1, 2, 3)]
+    assert seats == ["1A", "1B", "1C"]
+    assert menu.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 0
+
+    reloaded = open_menu()
+    assert reloaded.passenger_manager.find_passenger_by_id(2).seat_number == "1B"
+    assert reloaded.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 0
+
+
+def test_one_invalid_booking_rejects_the_whole_batch(menu):
+    results = menu.passenger_manager.book_flights([(1, 1, "3"), (9, 1, "3")], menu.flight_manager)
+    assert [result["ok"] for result in results] == [False, False]
+    assert results[1]["error"] == "Passageiro não encontrado."
+    assert menu.passenger_manager.find_passenger_by_id(1).flight_id is None
+    assert menu.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 3
+
+
+def test_batch_larger_than_the_free_seats_is_rejected(menu):
+    results = menu.passenger_manager.book_flights([(passenger_id, 1, "3") for passenger_id in (1, 2, 3, 4)], menu.flight_manager)
+    assert not any(result["ok"] for result in results)
+    assert results[3]["error"] == f"Não há assentos disponíveis na classe {ECONOMY}."
+    assert menu.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 3
+
+
+def test_batch_round_trips_through_sqlite():
+    menu = populate(open_menu(database=SQLiteDatabase("airport.db")))
+    assert all(result["ok"] for result in menu.passenger_manager.book_flights([(1, 1, "3"), (2, 1, "3")], menu.flight_manager))
+    reloaded = open_menu(database=SQLiteDatabase("airport.db"))
+    assert reloaded.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 1
+    assert [p.flight_id for p in reloaded.passenger_manager.passengers] == [1, 1, None, None]
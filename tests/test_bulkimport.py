@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+
+import pytest
+
+from main import PassengerManager
+
+CSV = """name,age,gender,nationality,passport_number
+Ana,30,F,PT,12345678
+Rui,abc,M,PT,12345679
+"Sofia
+Reis",41,f,BR,123456780
+Eva,25,F,PT,12345678
+Existente,50,M,PT,99999999
+,20,M,PT,11111111
+"""
+
+
+def imported(workers, chunk_size=2):
+    with open("passengers.csv", "w", encoding="utf-8") as file:
+        file.write(CSV)
+    manager = PassengerManager()
+    manager.register_passenger("Já cá", 60, "M", "PT", "99999999")
+    result = manager.import_passengers("passengers.csv", workers=workers, chunk_size=chunk_size)
+    return manager, result
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_csv_import_keeps_valid_rows_and_reports_the_rest(workers):
+    manager, result = imported(workers)
+    assert result == {"read": 6, "imported": 2, "rejected": 4, "rejects_file": "passengers_rejeitados.csv"}
+    assert [(p.passenger_id, p.name, p.gender) for p in manager.passengers[1:]] == [(2, "Ana", "Feminino"), (3, "Sofia\nReis", "Feminino")]
+    with open("passengers_rejeitados.csv", newline="", encoding="utf-8") as file:
+        rows = {int(row["line"]): row["reason"] for row in csv.DictReader(file)}
+    # Lines are the file's: the quoted name spans lines 4 and 5
+    assert rows == {
+        3: "Idade inválida! Deve ser um número inteiro.",
+        6: "Passaporte repetido no ficheiro (linha 2).",
+        7: "Já existe um passageiro com o número de passaporte 99999999.",
+        8: "Nome em falta.",
+    }
+
+    reloaded = PassengerManager()
+    reloaded.load_passengers()
+    assert len(reloaded.passengers) == 3
+
+
+def test_jsonl_import():
+    lines = [{"name": "Ana", "age": 30, "gender": "F", "nationality": "PT", "passport_number": "12345678"}, "{partido", [1]]
+    with open("passengers.jsonl", "w", encoding="utf-8") as file:
+        file.write("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n\n")
+    manager = PassengerManager()
+    result = manager.import_passengers("passengers.jsonl", rejects_filename="rejeitados.csv", workers=1)
+    assert (result["imported"], result["rejected"], result["rejects_file"]) == (1, 2, "rejeitados.csv")
+    assert manager.find_passenger_by_passport("12345678").name == "Ana"
+
+
+def test_missing_file_imports_nothing():
+    manager = PassengerManager()
+    with pytest.raises(FileNotFoundError):
+        manager.import_passengers("nao_existe.csv", workers=1)
+    assert len(manager.passengers) == 0
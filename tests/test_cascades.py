@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import ECONOMY, book, open_menu
+
+
+@pytest.fixture
+def seats():
+    return (0, 0, 2)
+
+
+def test_removing_a_flight_cancels_its_bookings_and_waitlist(menu):
+    assert book(menu, 1)["ok"] and book(menu, 2)["ok"] and book(menu, 3, 2)["ok"]
+    menu.passenger_manager.join_waitlist(4, 1, ECONOMY, menu.flight_manager)
+    menu.flight_manager.delete_flight(1, menu.passenger_manager)
+
+    for menu in (menu, open_menu()):
+        passengers = menu.passenger_manager
+        ana = passengers.find_passenger_by_id(1)
+        assert ana.flight_id is None and ana.seat_number is None
+        assert ana.ticket_status == "Cancelado"
+        assert passengers.passengers_on_flight(1) == []
+        assert 4 not in passengers.waitlist
+        assert passengers.find_passenger_by_id(3).flight_id == 2
+        assert menu.flight_manager.find_flight_by_id(1) is None
+
+
+def test_a_plane_in_use_cannot_be_removed(menu):
+    with pytest.raises(ValueError, match="2 voo"):
+        menu.plane_manager.delete_plane(1, menu.flight_manager)
+    assert menu.plane_manager.find_plane_by_id(1)
+
+    menu.flight_manager.delete_flight(1, menu.passenger_manager)
+    menu.flight_manager.delete_flight(2, menu.passenger_manager)
+    menu.plane_manager.delete_plane(1, menu.flight_manager)
+    assert open_menu().plane_manager.find_plane_by_id(1) is None
+
+
+def test_growing_a_plane_adds_seats_and_promotes_the_waitlist(menu):
+    assert book(menu, 1)["ok"] and book(menu, 2)["ok"]
+    menu.passenger_manager.join_waitlist(3, 1, ECONOMY, menu.flight_manager)
+    menu.plane_manager.edit_plane(1, economy_seats=4, flight_manager=menu.flight_manager,
+                                  passenger_manager=menu.passenger_manager)
+
+    eva = menu.passenger_manager.find_passenger_by_id(3)
+    assert eva.flight_id == 1 and eva.seat_number is not None
+    assert 3 not in menu.passenger_manager.waitlist
+    flight = menu.flight_manager.find_flight_by_id(1)
+    assert flight.available_seats[ECONOMY] == 1
+    assert flight.seat_map.free_count(ECONOMY) == 1
+    assert menu.flight_manager.find_flight_by_id(2).available_seats[ECONOMY] == 4
+
+    again = open_menu()
+    assert again.plane_manager.find_plane_by_id(1).economy_seats == 4
+    assert again.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 1
+    assert again.passenger_manager.find_passenger_by_id(3).seat_number == eva.seat_number
+
+
+def test_shrinking_a_plane_moves_passengers_off_removed_seats(menu):
+    menu.plane_manager.edit_plane(1, economy_seats=4, flight_manager=menu.flight_manager,
+                                  passenger_manager=menu.passenger_manager)
+    for passenger_id in (1, 2, 3):
+        assert book(menu, passenger_id)["ok"]
+    menu.passenger_manager.cancel_booking(1, menu.flight_manager)
+    menu.plane_manager.edit_plane(1, economy_seats=2, flight_manager=menu.flight_manager,
+                                  passenger_manager=menu.passenger_manager)
+
+    flight = menu.flight_manager.find_flight_by_id(1)
+    seats = {menu.passenger_manager.find_passenger_by_id(passenger_id).seat_number for passenger_id in (2, 3)}
+    assert len(seats) == 2
+    assert all(flight.seat_map.seat_class_of(seat) == ECONOMY for seat in seats)
+    assert flight.available_seats[ECONOMY] == 0
+    assert flight.seat_map.free_count(ECONOMY) == 0
+
+
+def test_a_plane_cannot_shrink_below_the_seats_taken(menu):
+    assert book(menu, 1)["ok"] and book(menu, 2)["ok"]
+    with pytest.raises(ValueError, match="2 lugares ocupados"):
+        menu.plane_manager.edit_plane(1, economy_seats=1, flight_manager=menu.flight_manager,
+                                      passenger_manager=menu.passenger_manager)
+    assert menu.plane_manager.find_plane_by_id(1).economy_seats == 2
+    assert menu.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 0
+    assert open_menu().plane_manager.find_plane_by_id(1).economy_seats == 2
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import ECONOMY, open_menu, populate
+from main import Passenger, PassengerTable
+
+RECORD = {"passenger_id": 1, "name": "Ana", "age": 30, "gender": "Feminino", "nationality": "PT",
+          "passport_number": "12345678", "ticket_status": "Verificado", "checked_in": True,
+          "baggage_weight": 12.5, "flight_id": 3, "seat_class": ECONOMY, "seat_number": "5C"}
+
+
+def test_passenger_has_slots():
+    passenger = Passenger(**RECORD)
+    with pytest.raises(AttributeError):
+        passenger.extra = 1
+
+
+def test_table_rows_read_back_like_passengers():
+    table = PassengerTable()
+    row = table.add(**RECORD)
+    table.add(**{**RECORD, "passenger_id": 2, "flight_id": None, "seat_class": None, "seat_number": None,
+                 "checked_in": False, "baggage_weight": 20})
+    assert row.to_dict() == Passenger(**RECORD).to_dict()
+    second = list(table)[1]
+    assert (second.flight_id, second.seat_class, second.checked_in) == (None, None, False)
+    assert type(second.baggage_weight) is int
+    # Repeated strings share one pooled value
+    assert len(table.pools["nationality"].values) <= 2
+
+
+def test_removed_rows_are_skipped_and_views_stay_valid():
+    table = PassengerTable()
+    first = table.add(**RECORD)
+    second = table.add(**{**RECORD, "passenger_id": 2, "name": "Rui"})
+    table.remove(first)
+    assert len(table) == 1
+    assert [row.name for row in table] == ["Rui"]
+    assert second.name == "Rui"
+    with pytest.raises(ValueError):
+        table.remove(first)
+
+
+def test_columnar_manager_behaves_like_the_object_one():
+    menu = populate(open_menu(columnar=True), (0, 0, 2))
+    assert menu.passenger_manager.book_flights([(2, 1, "3")], menu.flight_manager)[0]["ok"]
+    menu.passenger_manager.delete_passenger(1, menu.flight_manager)
+
+    reloaded = open_menu(columnar=True)
+    assert isinstance(reloaded.passenger_manager.passengers, PassengerTable)
+    rui = reloaded.passenger_manager.find_passenger_by_passport("12345671")
+    assert (rui.passenger_id, rui.flight_id, rui.seat_number) == (2, 1, "1A")
+    assert len(reloaded.passenger_manager.passengers) == 3
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from headless import COMMAND_DATA, COMMANDS, run_commands
+from main import MenuSystem
+
+
+def run(menu, *commands):
+    output = io.StringIO()
+    run_commands(menu, io.StringIO("".join(json.dumps(command) + "\n" for command in commands)), output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_failing_file_commands_do_not_stop_the_stream():
+    menu = MenuSystem()
+    responses = run(
+        menu,
+        {"command": "import_passengers", "args": {"filename": "nao_existe.csv"}},
+        {"command": "export_manifest", "args": {"filename": "pasta/inexistente/manifesto.csv"}},
+        {"command": "add_passenger", "args": {"name": "Ana", "age": 30, "gender": "F", "nationality": "PT",
+                                              "passport_number": "12345678"}},
+    )
+    assert [response["ok"] for response in responses] == [False, False, True]
+    assert "nao_existe.csv" in responses[0]["error"]
+    assert responses[2]["result"]["passenger_id"] == 1
+
+
+def test_commands_drive_the_managers_and_report_errors_per_line():
+    menu = MenuSystem()
+    output = io.StringIO()
+    lines = [
+        json.dumps({"id": "p", "command": "create_plane", "args": {"model_name": "A320", "executive_seats": 0,
+                                                                   "business_seats": 0, "economy_seats": 1}}),
+        json.dumps({"command": "add_flight", "args": {"destination": "Porto", "departure_time": "2026-01-01 10:00",
+                                                      "arrival_time": "2026-01-01 11:00", "plane_id": 1}}),
+        "",
+        json.dumps({"command": "add_passenger", "args": {"name": "Ana", "age": 30, "gender": "F", "nationality": "PT",
+                                                         "passport_number": "12345678"}}),
+        json.dumps({"command": "book_flight", "args": {"passenger_id": 1, "flight_id": 1, "seat_class": "3"}}),
+        json.dumps({"command": "book_flight", "args": {"passenger_id": 1, "flight_id": 1, "seat_class": "3"}}),
+        "{not json",
+        json.dumps({"command": "voar"}),
+        json.dumps({"command": "add_passenger", "args": {"name": "Rui"}}),
+    ]
+    assert run_commands(menu, io.StringIO("\n".join(lines) + "\n"), output) == 8
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response["ok"] for response in responses] == [True, True, True, True, False, False, False, False]
+    assert responses[0]["id"] == "p" and responses[0]["result"]["ID"] == 1
+    assert responses[3]["result"]["seat_class"] == "Classe Econômica"
+    assert responses[6]["error"] == "Comando desconhecido: voar"
+    assert responses[7]["id"] == 9
+    assert menu.passenger_manager.find_passenger_by_id(1).flight_id == 1
+
+
+def test_an_unexpected_error_fails_only_its_command(monkeypatch):
+    def broken(menu):
+        raise RuntimeError("avaria")
+
+    monkeypatch.setitem(COMMANDS, "broken", broken)
+    monkeypatch.setitem(COMMAND_DATA, "broken", ())
+    responses = run(MenuSystem(), {"command": "broken"}, {"command": "list_planes"})
+    assert responses[0] == {"id": 1, "ok": False, "error": "Erro inesperado (RuntimeError): avaria"}
+    assert responses[1]["ok"]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import open_menu
+
+
+def test_lookups_by_id_and_passport(menu):
+    passengers = menu.passenger_manager
+    assert passengers.find_passenger_by_id(2).name == "Rui"
+    assert passengers.find_passenger_by_passport("12345670").passenger_id == 1
+    assert passengers.find_passenger_by_id(5) is None
+    assert menu.flight_manager.find_flight_by_id(1).destination == "Lisboa"
+    assert menu.plane_manager.find_plane_by_id(1).model_name == "A320"
+
+
+def test_duplicate_passport_is_rejected(menu):
+    with pytest.raises(ValueError):
+        menu.passenger_manager.register_passenger("Rita", 25, "F", "PT", "12345670")
+    with pytest.raises(ValueError):
+        menu.passenger_manager.edit_passenger(2, passport_number="12345670")
+
+
+def test_indexes_follow_edits_and_removals(menu):
+    passengers = menu.passenger_manager
+    passengers.edit_passenger(1, passport_number="87654321")
+    assert passengers.find_passenger_by_passport("12345670") is None
+    assert passengers.find_passenger_by_passport("87654321").name == "Ana"
+    passengers.delete_passenger(2, menu.flight_manager)
+    assert passengers.find_passenger_by_id(2) is None
+    assert passengers.find_passenger_by_passport("12345671") is None
+    # The freed passport can be used again
+    passengers.register_passenger("Rita", 25, "F", "PT", "12345671")
+
+
+def test_indexes_are_rebuilt_on_load(menu):
+    reloaded = open_menu()
+    assert reloaded.passenger_manager.find_passenger_by_passport("12345671").name == "Rui"
+    assert reloaded.flight_manager.find_flight_by_id(1).plane is reloaded.plane_manager.find_plane_by_id(1)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from main import PassengerManager
+from storage import JsonStore
+
+
+def manager(journal=True, compact_every=1000):
+    passengers = PassengerManager(journal=journal)
+    passengers.store.compact_every = compact_every
+    return passengers
+
+
+def register(manager, count, first=0):
+    for index in range(first, first + count):
+        manager.register_passenger(f"P{index}", 30, "F", "PT", f"1000000{index}")
+
+
+def names(manager):
+    return {p.passenger_id: p.name for p in manager.passengers}
+
+
+def test_journal_round_trip():
+    passengers = manager()
+    register(passengers, 3)
+    rui = passengers.find_passenger_by_id(2)
+    rui.name = "Rui"
+    passengers.record_passenger(rui)
+    passengers.record_passenger_removal(3)
+    assert os.path.exists("passengers.json.journal")
+
+    reloaded = manager()
+    reloaded.load_passengers()
+    assert names(reloaded) == {1: "P0", 2: "Rui"}
+
+
+def test_journal_is_compacted_when_due():
+    passengers = manager(compact_every=3)
+    register(passengers, 5)
+    with open("passengers.json") as file:
+        assert len(json.load(file)) >= 3
+    reloaded = manager()
+    reloaded.load_passengers()
+    assert len(reloaded.passengers) == 5
+
+
+def test_without_journal_every_change_rewrites_the_file():
+    passengers = manager(journal=False)
+    register(passengers, 2)
+    assert not os.path.exists("passengers.json.journal")
+    with open("passengers.json") as file:
+        assert [record["name"] for record in json.load(file)] == ["P0", "P1"]
+
+
+def test_change_under_partial_load_is_not_lost_when_compaction_is_due():
+    register(manager(compact_every=1000), 4)
+    partial = manager(compact_every=2)
+    partial.load_passengers(limit=2)
+    assert partial.partial_load
+    assert partial.store.needs_compaction()
+    first = partial.find_passenger_by_id(1)
+    first.name = "Ana"
+    partial.record_passenger(first)
+
+    reloaded = manager()
+    reloaded.load_passengers()
+    assert names(reloaded) == {1: "Ana", 2: "P1", 3: "P2", 4: "P3"}
+
+
+def test_change_under_partial_load_without_journal_is_merged_into_the_file():
+    register(manager(journal=False), 4)
+    partial = manager(journal=False)
+    partial.load_passengers(limit=2)
+    first = partial.find_passenger_by_id(1)
+    first.name = "Ana"
+    partial.record_passenger(first)
+    partial.record_passenger_removal(2)
+
+    reloaded = manager(journal=False)
+    reloaded.load_passengers()
+    assert names(reloaded) == {1: "Ana", 3: "P2", 4: "P3"}
+
+
+def test_entries_written_after_a_torn_line_survive_a_reload():
+    passengers = manager()
+    register(passengers, 2)
+    with open("passengers.json.journal", "a") as file:
+        file.write('{"op":"put","data":{"passenger_id":9,"na')
+    register(passengers, 2, first=2)
+
+    reloaded = manager()
+    reloaded.load_passengers()
+    assert sorted(names(reloaded)) == [1, 2, 3, 4]
+
+
+def test_shared_entries_written_after_a_torn_line_are_read():
+    writer = JsonStore("planes.json", "ID", shared=True)
+    writer.load()
+    writer.put({"ID": 1})
+    with open("planes.json.journal", "a") as file:
+        file.write('{"op":"put","da')
+    reader = JsonStore("planes.json", "ID", shared=True)
+    reader.load()
+    writer.put({"ID": 2})
+    writer.put({"ID": 3})
+
+    assert reader.sync() == {2: {"ID": 2}, 3: {"ID": 3}}
+    assert sorted(record["ID"] for record in JsonStore("planes.json", "ID", shared=True).load()) == [1, 2, 3]
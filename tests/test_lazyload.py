@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+
+from lazyload import LazyLoader
+from main import MenuSystem
+from storage import JsonStore
+
+
+def counting_loader(calls):
+    loader = LazyLoader()
+    loader.register("planes", lambda: calls.append("planes"))
+    loader.register("flights", lambda: calls.append("flights"), ("planes",))
+    loader.register("passengers", lambda: calls.append("passengers"), ("flights",))
+    return loader
+
+
+def test_steps_run_once_after_their_dependencies():
+    calls = []
+    loader = counting_loader(calls)
+    loader.ensure("passengers")
+    loader.ensure("flights", "passengers")
+    assert calls == ["planes", "flights", "passengers"]
+    assert loader.is_loaded("planes")
+
+
+def test_reset_loads_the_step_again():
+    calls = []
+    loader = counting_loader(calls)
+    loader.ensure("flights")
+    loader.reset("flights")
+    loader.ensure("flights")
+    assert calls == ["planes", "flights", "flights"]
+
+
+def test_prefetch_and_ensure_share_one_load():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+    loader = LazyLoader()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        calls.append("planes")
+
+    loader.register("planes", slow)
+    thread = loader.prefetch()
+    assert started.wait(5)
+    waiter = threading.Thread(target=loader.ensure, args=("planes",))
+    waiter.start()
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+    assert calls == ["planes"]
+
+
+def test_prefetch_reports_errors_to_stderr(capsys):
+    loader = LazyLoader()
+    loader.register("planes", lambda: 1 / 0)
+    loader.prefetch().join(5)
+    assert "segundo plano" in capsys.readouterr().err
+    assert not loader.is_loaded("planes")
+
+
+def test_menu_reads_collections_only_when_asked():
+    menu = MenuSystem()
+    menu.plane_manager.register_plane(model_name="A320", executive_seats=0, business_seats=0, economy_seats=2)
+    menu = MenuSystem()
+    assert not menu.loader.is_loaded("planes")
+    menu.ensure_loaded("flights")
+    assert menu.loader.is_loaded("planes") and not menu.loader.is_loaded("passengers")
+    assert 1 in menu.plane_manager.planes_by_id
+
+
+def write_records(filename, records):
+    with open(filename, "w") as file:
+        json.dump(records, file)
+
+
+def test_parse_cache_is_reused_until_the_json_changes():
+    write_records("planes.json", [{"ID": 1, "model_name": "A320"}])
+    store = JsonStore("planes.json", "ID", cache=True)
+    assert store.load() == [{"ID": 1, "model_name": "A320"}]
+    assert os.path.exists("planes.json.cache")
+    assert store.read_cache() == [{"ID": 1, "model_name": "A320"}]
+
+    write_records("planes.json", [{"ID": 1, "model_name": "A320"}, {"ID": 2, "model_name": "B737"}])
+    assert store.read_cache() is None
+    assert [record["ID"] for record in store.load()] == [1, 2]
+    assert len(store.read_cache()) == 2
+
+
+def test_parse_cache_is_ignored_when_off():
+    write_records("planes.json", [{"ID": 1}])
+    JsonStore("planes.json", "ID").load()
+    assert not os.path.exists("planes.json.cache")
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+
+import pytest
+
+
+@pytest.fixture
+def seats():
+    return (0, 4, 10)
+
+
+@pytest.fixture
+def menu(menu):
+    bookings = [(1, 1, "3"), (2, 1, "2"), (3, 2, "3"), (4, 1, "3")]
+    assert all(result["ok"] for result in menu.passenger_manager.book_flights(bookings, menu.flight_manager))
+    return menu
+
+
+def test_passengers_by_flight_follow_bookings(menu):
+    passengers = menu.passenger_manager
+    assert sorted(p.passenger_id for p in passengers.passengers_on_flight(1)) == [1, 2, 4]
+    passengers.cancel_booking(4, menu.flight_manager)
+    assert sorted(p.passenger_id for p in passengers.passengers_on_flight(1)) == [1, 2]
+    assert passengers.passengers_on_flight(3) == []
+
+
+def test_manifest_is_in_seat_order(menu):
+    rows = menu.passenger_manager.flight_manifest(1, menu.flight_manager)
+    assert [(row["passenger_id"], row["seat_number"]) for row in rows] == [(2, "1A"), (1, "2A"), (4, "2B")]
+    with pytest.raises(ValueError):
+        menu.passenger_manager.flight_manifest(9, menu.flight_manager)
+
+
+def test_export_streams_every_flight_in_departure_order(menu):
+    assert menu.passenger_manager.export_manifest("manifesto.csv", menu.flight_manager) == 4
+    with open("manifesto.csv", newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["flight_id"], row["passenger_id"]) for row in rows] == [("2", "3"), ("1", "2"), ("1", "1"), ("1", "4")]
+
+    assert menu.passenger_manager.export_manifest("manifesto.jsonl", menu.flight_manager, [2]) == 1
+    with open("manifesto.jsonl", encoding="utf-8") as file:
+        assert [json.loads(line)["name"] for line in file] == ["Eva"]
+    with pytest.raises(ValueError):
+        menu.passenger_manager.export_manifest("manifesto.csv", menu.flight_manager, [2, 9])
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from conftest import open_menu
+from main import PassengerManager
+from metrics import Metrics
+from storage import JsonStore
+
+
+def test_operations_are_counted_and_timed():
+    metrics = Metrics()
+    menu = open_menu(metrics=metrics)
+    menu.passenger_manager.register_passenger("Ana", 30, "F", "PT", "12345678")
+    menu.passenger_manager.find_passenger_by_id(1)
+    menu.passenger_manager.find_passenger_by_id(2)
+    with pytest.raises(ValueError):
+        menu.passenger_manager.check_in_by_id(9, 10, 50, 30, 20)
+    operations = metrics.snapshot()["operations"]
+    lookups = operations["passengers.find_passenger_by_id"]
+    # check_in_by_id looks the passenger up too
+    assert (lookups["calls"], lookups["errors"]) == (3, 0)
+    assert sum(lookups["buckets"].values()) == 3
+    assert operations["passengers.check_in_by_id"]["errors"] == 1
+    assert operations["passengers.load_passengers"]["calls"] == 1
+
+
+def test_bytes_written_follow_journal_appends_and_compactions():
+    metrics = Metrics()
+    manager = PassengerManager(store=JsonStore("passengers.json", "passenger_id", journal=True, compact_every=3))
+    metrics.instrument("passengers", manager)
+    manager.register_passenger("Ana", 30, "F", "PT", "12345678")
+    appended = metrics.snapshot()["bytes_written"]["passengers"]
+    assert 0 < appended < 400
+    for index in range(3):
+        manager.register_passenger("Rui", 30, "M", "PT", f"2345678{index}")
+    # On top of the four appends, the compaction rewrote passengers.json
+    assert metrics.snapshot()["bytes_written"]["passengers"] > 4 * appended + os.path.getsize("passengers.json") // 2
+
+
+def test_prometheus_text():
+    metrics = Metrics()
+    metrics.observe("flights.find_flights", 0.002)
+    metrics.observe("flights.find_flights", 2, failed=True)
+    metrics.add_bytes("flights", 120)
+    metrics.write_prometheus("metrics.prom")
+    with open("metrics.prom") as file:
+        text = file.read()
+    assert 'airport_operation_seconds_bucket{operation="flights.find_flights",le="0.005"} 1' in text
+    assert 'airport_operation_seconds_bucket{operation="flights.find_flights",le="+Inf"} 2' in text
+    assert 'airport_operation_seconds_count{operation="flights.find_flights"} 2' in text
+    assert 'airport_operation_errors_total{operation="flights.find_flights"} 1' in text
+    assert 'airport_bytes_written_total{collection="flights"} 120' in text
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+
+from main import PassengerManager
+from paging import browse, paginate, sort_key
+
+RECORDS = [SimpleNamespace(record_id=index, name=name)
+           for index, name in enumerate(["bia", "Ana", None, "carla", "ana", "Duarte", None], 1)]
+
+
+def pages(records, key, limit, **options):
+    result, cursor = [], None
+    while True:
+        page, cursor = paginate(records, key, cursor, limit, **options)
+        result.append([record.record_id for record in page])
+        if cursor is None:
+            return result
+
+
+def test_pages_cover_every_record_once_in_order():
+    key = sort_key("name", "record_id")
+    assert pages(RECORDS, key, 3) == [[2, 5, 1], [4, 6, 3], [7]]
+    assert pages(RECORDS, key, 3, descending=True) == [[7, 3, 6], [4, 1, 5], [2]]
+    assert pages(RECORDS, key, 10, where=lambda record: record.name) == [[2, 5, 1, 4, 6]]
+
+
+def test_presorted_scan_matches_the_heap():
+    key = sort_key("record_id", "record_id")
+    assert pages(RECORDS, key, 2, presorted=True) == pages(RECORDS, key, 2) == [[1, 2], [3, 4], [5, 6], [7]]
+    odd = lambda record: record.record_id % 2
+    assert pages(RECORDS, key, 2, presorted=True, where=odd) == [[1, 3], [5, 7]]
+
+
+def test_bad_cursor_and_limit():
+    key = sort_key("name", "record_id")
+    with pytest.raises(ValueError):
+        paginate(RECORDS, key, cursor="{", limit=2)
+    with pytest.raises(ValueError):
+        paginate(RECORDS, key, cursor="[1, 2]", limit=2)
+    with pytest.raises(ValueError):
+        paginate(RECORDS, key, limit=0)
+
+
+def test_passenger_pages_with_filters_and_sort():
+    manager = PassengerManager()
+    for index, (name, nationality) in enumerate([("Rui", "PT"), ("Ana", "BR"), ("Eva", "pt"), ("Bia", "PT")]):
+        manager.register_passenger(name, 20 + index, "F", nationality, f"1000000{index}")
+    first = manager.page_passengers(nationality="PT", sort="-name", limit=2)
+    assert [p.name for p in first["items"]] == ["Rui", "Eva"]
+    second = manager.page_passengers(nationality="PT", sort="-name", cursor=first["next_cursor"], limit=2)
+    assert ([p.name for p in second["items"]], second["next_cursor"]) == (["Bia"], None)
+    with pytest.raises(ValueError):
+        manager.page_passengers(sort="peso")
+
+
+def test_browse_writes_one_page_at_a_time(monkeypatch, capsys):
+    answers = iter(["", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    fetch = lambda cursor: paginate(RECORDS, sort_key("record_id", "record_id"), cursor, 2, presorted=True)
+    browse(fetch, lambda record: f"#{record.record_id}", "Nada.", "Registos:")
+    assert capsys.readouterr().out == "Registos:\n#1\n#2\n#3\n#4\n"
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from main import PassengerManager
+from search import NameIndex, normalize_name
+
+
+def index(*names):
+    name_index = NameIndex()
+    for key, name in enumerate(names, 1):
+        name_index.add(key, name)
+    return name_index
+
+
+def test_names_are_normalized():
+    assert normalize_name("  Gonçalo  SÁ-Pereira ") == "goncalo sa pereira"
+
+
+def test_prefix_search_ignores_case_and_accents():
+    name_index = index("Gonçalo Sá", "Ana Sousa", "Mariana Santos", "Ana")
+    assert name_index.search("goncalo") == [1]
+    assert name_index.search("ANA S") == [2]
+    # Shorter names first when nothing else tells them apart
+    assert name_index.search("s") == [2, 1, 3]
+    assert name_index.search("xyz") == []
+    assert name_index.search("  ") == []
+
+
+def test_best_matches_come_first():
+    name_index = index("Ana Sousa", "Anabela Lopes", "Ana", "Ana")
+    assert name_index.search("ana") == [3, 4, 1, 2]
+    assert name_index.search("ana", limit=3) == [3, 4, 1]
+
+
+def test_removal_and_rename_update_the_index():
+    name_index = index("Ana Sousa", "Rui Sousa")
+    name_index.remove(1)
+    assert name_index.search("ana") == []
+    assert name_index.tokens == ["rui", "sousa"]
+    name_index.add(2, "Rui Costa")
+    assert name_index.search("sousa") == []
+    assert len(name_index) == 1
+
+
+def test_manager_search_follows_edits():
+    manager = PassengerManager()
+    manager.register_passenger("João Gonçalves", 30, "M", "PT", "12345678")
+    manager.register_passenger("Joana Reis", 30, "F", "PT", "12345679")
+    assert [p.passenger_id for p in manager.find_passengers(name="jo")] == [2, 1]
+    manager.edit_passenger(2, name="Inês Reis")
+    assert [p.passenger_id for p in manager.find_passengers(name="ines")] == [2]
+    assert [p.passenger_id for p in manager.find_passengers(name="joa")] == [1]
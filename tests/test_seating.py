@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from benchmark import bench_seats
+from conftest import ECONOMY
+from seating import SeatInventory, SeatMap
+
+
+def economy(seats):
+    return SeatMap({"Primeira Classe": 0, "Classe Executiva": 0, ECONOMY: seats})
+
+
+def test_allocates_front_to_back():
+    seat_map = economy(8)
+    assert [seat_map.allocate(ECONOMY) for _ in range(8)] == ["1A", "1B", "1C", "1D", "1E", "1F", "2A", "2B"]
+    assert seat_map.allocate(ECONOMY) is None
+    assert seat_map.free_count(ECONOMY) == 0
+
+
+def test_released_seats_are_reused_lowest_first():
+    seat_map = economy(600)
+    labels = [seat_map.allocate(ECONOMY) for _ in range(600)]
+    cabin = seat_map.cabins[ECONOMY]
+    for label in (labels[500], labels[10], labels[300]):
+        assert seat_map.release(label)
+    # The cursor stays at the end; the freed seats come from the heap
+    assert cabin.cursor == 600
+    assert [seat_map.allocate(ECONOMY) for _ in range(3)] == [labels[10], labels[300], labels[500]]
+    assert seat_map.allocate(ECONOMY) is None
+
+
+def test_released_seat_taken_by_number_is_skipped():
+    seat_map = economy(12)
+    labels = [seat_map.allocate(ECONOMY) for _ in range(6)]
+    seat_map.release(labels[2])
+    assert seat_map.occupy(labels[2])
+    assert not seat_map.occupy(labels[2])
+    assert seat_map.allocate(ECONOMY) == "2A"
+
+
+def test_adjacent_seats_use_a_row_with_released_seats():
+    seat_map = economy(12)
+    labels = [seat_map.allocate(ECONOMY) for _ in range(12)]
+    seat_map.release(labels[3])
+    seat_map.release(labels[4])
+    assert seat_map.allocate_adjacent(ECONOMY, 3) is None
+    assert seat_map.allocate_adjacent(ECONOMY, 2) == ["1D", "1E"]
+    assert seat_map.free_count(ECONOMY) == 0
+
+
+def test_concurrent_reservations_never_oversell():
+    inventory = SeatInventory({ECONOMY: 500})
+    booked = [0] * 8
+
+    def worker(index):
+        while inventory.reserve(ECONOMY):
+            booked[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(booked) == 500
+    assert inventory.available[ECONOMY] == 0
+
+
+def test_reserve_and_release_counts():
+    inventory = SeatInventory({ECONOMY: 3})
+    assert inventory.reserve(ECONOMY, 2)
+    assert not inventory.reserve(ECONOMY, 2)
+    inventory.release(ECONOMY)
+    assert inventory.reserve(ECONOMY, 2)
+    assert not inventory.reserve("Primeira Classe")
+
+
+def test_holds_are_confirmed_cancelled_or_expire():
+    inventory = SeatInventory({ECONOMY: 3})
+    confirmed = inventory.hold(ECONOMY)
+    cancelled = inventory.hold(ECONOMY)
+    expiring = inventory.hold(ECONOMY, timeout=0)
+    assert inventory.confirm_hold(confirmed)
+    inventory.cancel_hold(cancelled)
+    assert not inventory.confirm_hold(expiring)
+    assert inventory.snapshot() == {ECONOMY: 2}
+    assert inventory.available[ECONOMY] == 2
+
+
+def test_seat_benchmark_measures_the_inventory_locks():
+    result = bench_seats(threads=3, flights=4, seats_per_class=50)
+    assert result["consistent"] and result["booked"] == result["capacity"] == 600
+    # Every reservation, and every refusal once a class is full, takes a lock
+    assert result["lock_acquisitions"] >= result["booked"]
+    assert 0 <= result["lock_contended_share"] <= 1
+    assert result["mean_lock_hold_us"] > 0
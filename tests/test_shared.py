@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import ECONOMY, open_menu
+from storage import BackgroundWriter, ConflictError
+
+
+def terminal(**options):
+    return open_menu(shared=True, **options)
+
+
+@pytest.fixture
+def terminals():
+    a = terminal()
+    a.plane_manager.register_plane("A320", 2, 4, 20)
+    for hour in range(10, 15):
+        a.flight_manager.register_flight("Lisboa", f"2026-01-01 {hour}:00", f"2026-01-01 {hour}:30", 1)
+    a.passenger_manager.register_passenger("Ana", 30, "F", "PT", "12345678")
+    a.passenger_manager.register_passenger("Rui", 40, "M", "PT", "12345679")
+    return a, terminal()
+
+
+def all_pages(manager, limit):
+    pages, cursor = [], None
+    while True:
+        page = manager.page_flights(cursor=cursor, limit=limit)
+        pages.append([flight.flight_id for flight in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_sync_brings_in_other_terminals_records(terminals):
+    a, b = terminals
+    assert len(b.passenger_manager.passengers) == 2
+    a.passenger_manager.register_passenger("Eva", 25, "F", "PT", "12345670")
+    b.sync()
+    assert b.passenger_manager.find_passenger_by_id(3).name == "Eva"
+    assert b.passenger_manager.passengers_by_passport["12345670"].passenger_id == 3
+
+
+def test_edits_to_different_records_merge(terminals):
+    a, b = terminals
+    ana = a.passenger_manager.find_passenger_by_id(1)
+    ana.name = "Ana Maria"
+    a.passenger_manager.record_passenger(ana)
+    rui = b.passenger_manager.find_passenger_by_id(2)
+    rui.name = "Rui Pedro"
+    b.passenger_manager.record_passenger(rui)
+    a.sync()
+    b.sync()
+    for menu in (a, b):
+        assert [p.name for p in menu.passenger_manager.passengers] == ["Ana Maria", "Rui Pedro"]
+
+
+def test_edit_of_a_record_changed_elsewhere_conflicts(terminals):
+    a, b = terminals
+    ana = a.passenger_manager.find_passenger_by_id(1)
+    ana.age = 31
+    a.passenger_manager.record_passenger(ana)
+    stale = b.passenger_manager.find_passenger_by_id(1)
+    stale.age = 99
+    with pytest.raises(ConflictError):
+        b.passenger_manager.record_passenger(stale)
+    b.sync()
+    assert b.passenger_manager.find_passenger_by_id(1).age == 31
+
+
+def test_paging_after_sync_keeps_every_flight(terminals):
+    a, b = terminals
+    a.flight_manager.set_flight_status(1, "Delayed")
+    b.sync()
+    assert [flight.flight_id for flight in b.flight_manager.flights] == [1, 2, 3, 4, 5]
+    assert b.flight_manager.find_flight_by_id(1).status == "Delayed"
+    assert all_pages(b.flight_manager, 2) == [[1, 2], [3, 4], [5]]
+
+
+def test_new_flight_from_another_terminal_is_paged_in_order(terminals):
+    a, b = terminals
+    a.flight_manager.register_flight("Porto", "2026-01-02 10:00", "2026-01-02 11:00", 1)
+    b.flight_manager.delete_flight(2)
+    b.sync()
+    assert all_pages(b.flight_manager, 2) == [[1, 3], [4, 5], [6]]
+
+
+def test_refused_booking_is_undone_in_memory_and_never_half_written(terminals):
+    a, b = terminals
+    a.passenger_manager.book_flights([(1, 1, ECONOMY)], a.flight_manager)
+    # B has not seen A's booking, so its write of flight 1 conflicts
+    with pytest.raises(ConflictError):
+        b.passenger_manager.book_flights([(2, 1, ECONOMY)], b.flight_manager)
+    b.sync()
+    rui = b.passenger_manager.find_passenger_by_id(2)
+    flight = b.flight_manager.find_flight_by_id(1)
+    assert rui.flight_id is None and rui.seat_number is None
+    assert b.passenger_manager.passengers_on_flight(1) == [b.passenger_manager.find_passenger_by_id(1)]
+    assert flight.available_seats[ECONOMY] == 19
+    assert flight.get_seat_map().free_count(ECONOMY) == 19
+
+    # Nothing of the refused booking reached the disk
+    a.sync()
+    assert a.passenger_manager.find_passenger_by_id(2).flight_id is None
+    assert a.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 19
+
+    # Retried after the sync it goes through
+    b.passenger_manager.book_flights([(2, 1, ECONOMY)], b.flight_manager)
+    a.sync()
+    assert a.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 18
+    assert len(a.passenger_manager.passengers_on_flight(1)) == 2
+
+
+def test_passenger_conflict_keeps_the_flight_unwritten(terminals):
+    a, b = terminals
+    ana = a.passenger_manager.find_passenger_by_id(1)
+    ana.name = "Ana Maria"
+    a.passenger_manager.record_passenger(ana)
+    with pytest.raises(ConflictError):
+        b.passenger_manager.book_flights([(1, 2, ECONOMY)], b.flight_manager)
+    a.sync()
+    assert a.flight_manager.find_flight_by_id(2).available_seats[ECONOMY] == 20
+    b.sync()
+    assert b.passenger_manager.find_passenger_by_id(1).name == "Ana Maria"
+    assert b.passenger_manager.find_passenger_by_id(1).flight_id is None
+    assert b.flight_manager.find_flight_by_id(2).available_seats[ECONOMY] == 20
+
+
+def test_refused_write_is_not_persisted_by_a_later_write(terminals):
+    a, b = terminals
+    ana = a.passenger_manager.find_passenger_by_id(1)
+    ana.age = 31
+    a.passenger_manager.record_passenger(ana)
+    stale = b.passenger_manager.find_passenger_by_id(1)
+    stale.age = 99
+    with pytest.raises(ConflictError):
+        b.passenger_manager.record_passenger(stale)
+    # Until B syncs, writing the same record again is refused too
+    with pytest.raises(ConflictError):
+        b.passenger_manager.record_passenger(stale)
+    a.sync()
+    assert a.passenger_manager.find_passenger_by_id(1).age == 31
+
+
+def test_background_writer_reports_conflicts():
+    a = terminal()
+    a.passenger_manager.register_passenger("Ana", 30, "F", "PT", "12345678")
+    writer = BackgroundWriter(interval=60)
+    b = terminal(writer=writer)
+    ana = a.passenger_manager.find_passenger_by_id(1)
+    ana.age = 31
+    a.passenger_manager.record_passenger(ana)
+    stale = b.passenger_manager.find_passenger_by_id(1)
+    stale.age = 99
+    b.passenger_manager.record_passenger(stale)
+    writer.flush()
+    with pytest.raises(ConflictError):
+        b.sync()
+    assert b.passenger_manager.find_passenger_by_id(1).age == 31
+    b.sync()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import pytest
+
+from storage import JsonStore, read_binary_snapshot, write_binary_snapshot
+
+RECORDS = [
+    {"id": 1, "name": "João", "weight": 12.5, "checked_in": True, "flight_id": None, "seats": {"A": 1}, "note": ""},
+    {"id": 2, "name": "Ana", "weight": None, "checked_in": None, "flight_id": 7, "seats": {"A": 1}, "note": "x"},
+    {"id": 3, "name": None, "weight": 0.0, "checked_in": False, "flight_id": 0, "seats": [1, "b"], "note": "x"},
+]
+
+
+def test_binary_snapshot_round_trip_keeps_types():
+    write_binary_snapshot("records.snap", RECORDS)
+    records = read_binary_snapshot("records.snap")
+    assert records == RECORDS
+    assert [type(record["flight_id"]) for record in records] == [type(None), int, int]
+    assert type(records[2]["weight"]) is float and type(records[0]["checked_in"]) is bool
+    # Mutable values are not shared between records
+    records[0]["seats"]["A"] = 0
+    assert records[1]["seats"] == {"A": 1}
+
+
+def test_empty_snapshot():
+    write_binary_snapshot("records.snap", [])
+    assert read_binary_snapshot("records.snap") == []
+
+
+def test_invalid_file_is_rejected():
+    with open("records.snap", "wb") as file:
+        file.write(b"not a snapshot")
+    with pytest.raises(ValueError):
+        read_binary_snapshot("records.snap")
+
+
+def test_store_uses_the_snapshot_only_while_it_is_current():
+    store = JsonStore("records.json", "id", snapshot=True)
+    store.save_all(RECORDS)
+    assert os.path.exists(store.snapshot_filename)
+    os.remove("records.json")
+    assert store.load() == RECORDS
+
+    # A JSON file written after the snapshot wins
+    with open("records.json", "w") as file:
+        json.dump(RECORDS[:1], file)
+    stamp = os.path.getmtime(store.snapshot_filename) + 10
+    os.utime("records.json", (stamp, stamp))
+    assert store.load() == RECORDS[:1]
+
+
+def test_journal_is_replayed_over_the_snapshot():
+    store = JsonStore("records.json", "id", snapshot=True, journal=True)
+    store.save_all(RECORDS)
+    store.put({**RECORDS[0], "name": "Rui"})
+    store.delete(2)
+    assert [(record["id"], record["name"]) for record in store.load()] == [(1, "Rui"), (3, None)]
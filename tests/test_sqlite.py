@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from conftest import ECONOMY, book, open_menu, populate
+from storage import SQLiteDatabase, import_json
+
+
+def open_database_menu():
+    return open_menu(database=SQLiteDatabase("airport.db"))
+
+
+def test_records_round_trip_through_sqlite():
+    menu = populate(open_database_menu(), (2, 4, 20))
+    assert book(menu, 1)["ok"]
+    menu.passenger_manager.delete_passenger(2, menu.flight_manager)
+
+    reloaded = open_database_menu()
+    ana = reloaded.passenger_manager.find_passenger_by_id(1)
+    assert (ana.name, ana.flight_id, ana.seat_class) == ("Ana", 1, ECONOMY)
+    assert reloaded.passenger_manager.find_passenger_by_id(2) is None
+    assert reloaded.passenger_manager.passengers_by_passport["12345670"] is ana
+    flight = reloaded.flight_manager.find_flight_by_id(1)
+    assert flight.available_seats[ECONOMY] == 19
+    assert reloaded.plane_manager.find_plane_by_id(1).model_name == "A320"
+
+
+def plane(plane_id):
+    return {"ID": plane_id, "Modelo": "A320", "Primeira Classe": 0, "Classe Executiva": 0, ECONOMY: 2, "Total": 2}
+
+
+def test_failed_transaction_writes_nothing():
+    database = SQLiteDatabase("airport.db")
+    planes = database.store("planes")
+    planes.put(plane(1))
+    try:
+        with database.transaction():
+            planes.delete(1)
+            with database.transaction():
+                planes.put(plane(2))
+            raise ValueError("falhou")
+    except ValueError:
+        pass
+    assert SQLiteDatabase("airport.db").store("planes").load() == [plane(1)]
+
+
+def test_waitlist_and_bulk_writes_round_trip():
+    menu = populate(open_database_menu(), (0, 0, 1))
+    assert book(menu, 1)["ok"]
+    menu.passenger_manager.join_waitlist(2, 1, ECONOMY, menu.flight_manager)
+    menu.passenger_manager.join_waitlist(3, 1, ECONOMY, menu.flight_manager)
+
+    reloaded = open_database_menu()
+    assert reloaded.passenger_manager.waitlist.position(3) == 2
+    reloaded.passenger_manager.cancel_booking(1, reloaded.flight_manager)
+
+    again = open_database_menu()
+    rui = again.passenger_manager.find_passenger_by_id(2)
+    assert rui.flight_id == 1 and rui.seat_number is not None
+    assert again.passenger_manager.waitlist.position(3) == 1
+    assert again.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 0
+
+
+def passenger(passenger_id, passport_number, flight_id=None):
+    return {"passenger_id": passenger_id, "name": f"P{passenger_id}", "age": 30, "gender": "Feminino",
+            "nationality": "PT", "passport_number": passport_number, "ticket_status": "Aguardando",
+            "checked_in": False, "baggage_weight": 0, "flight_id": flight_id, "seat_class": None, "seat_number": None}
+
+
+def test_a_passport_clash_fails_instead_of_replacing_the_other_passenger():
+    store = SQLiteDatabase("airport.db").store("passengers")
+    store.put(passenger(1, "12345678"))
+    store.put(passenger(1, "12345670"))
+    with pytest.raises(ValueError, match="passport_number"):
+        store.put(passenger(2, "12345670"))
+    assert [record["passport_number"] for record in store.load()] == ["12345670"]
+
+    with open("passengers.json", "w") as file:
+        json.dump([passenger(3, "11111111"), passenger(4, "11111111")], file)
+    with pytest.raises(ValueError):
+        import_json(store, "passengers.json")
+    assert [record["passenger_id"] for record in store.load()] == [1]
+
+
+def test_changes_do_not_depend_on_their_order():
+    store = SQLiteDatabase("airport.db").store("passengers")
+    store.save_all([passenger(1, "11111111"), passenger(2, "22222222")])
+    # 3 takes the passport of 1, deleted later in the batch
+    store.write_changes({3: passenger(3, "11111111"), 2: passenger(2, "33333333"), 1: None})
+    store.write_changes({2: passenger(2, "44444444"), 4: passenger(4, "33333333")})
+    assert {record["passenger_id"]: record["passport_number"] for record in store.load()} == {
+        2: "44444444", 3: "11111111", 4: "33333333"}
+
+
+def test_find_runs_indexed_queries():
+    database = SQLiteDatabase("airport.db")
+    passengers = database.store("passengers")
+    passengers.save_all([passenger(1, "11111111", 1), passenger(2, "22222222", 2), passenger(3, "33333333", 1)])
+    flights = database.store("flights")
+    flights.save_all([
+        {"flight_id": flight_id, "destination": destination, "departure_time": departure,
+         "arrival_time": departure, "plane_id": 1, "status": "Agendado", "available_seats": {}}
+        for flight_id, destination, departure in [(1, "Porto", "2026-01-01 10:00"), (2, "Porto", "2026-01-02 10:00"),
+                                                  (3, "Faro", "2026-01-01 12:00")]
+    ])
+
+    assert [record["passenger_id"] for record in passengers.find(flight_id=1)] == [1, 3]
+    assert passengers.find(passport_number="22222222")[0]["passenger_id"] == 2
+    window = flights.find("departure_time", "2026-01-01 00:00", "2026-01-01 23:59", destination="Porto")
+    assert [record["flight_id"] for record in window] == [1]
+    assert window[0]["available_seats"] == {}
+
+    def plan(sql):
+        return " ".join(row[-1] for row in database.connection.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+    assert "idx_passengers_flight" in plan("SELECT * FROM passengers WHERE flight_id = 1")
+    assert "idx_flights_plane" in plan("SELECT * FROM flights WHERE plane_id = 1")
+    assert "idx_flights_destination_departure" in plan(
+        "SELECT * FROM flights WHERE destination = 'Porto' AND departure_time >= '2026-01-01'")
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from main import PassengerManager
+from storage import JsonStore, iter_json_array
+
+
+def write(filename, value):
+    with open(filename, "w") as file:
+        json.dump(value, file)
+
+
+def test_array_is_streamed_across_chunk_boundaries():
+    records = [{"id": index, "text": "a, [b] {c} \"d\" ç" * (index % 3)} for index in range(50)]
+    write("records.json", records)
+    progress = []
+    streamed = list(iter_json_array("records.json", chunk_size=7, progress=lambda read, total: progress.append((read, total))))
+    assert streamed == records
+    assert progress[-1][0] == progress[-1][1]
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]\n", "[1, 2]"])
+def test_small_arrays(text):
+    with open("records.json", "w") as file:
+        file.write(text)
+    assert list(iter_json_array("records.json", chunk_size=2)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["{}", "[1, 2", "[1 2]", ",[1]", "[,1]", "[1,,2]", "[1,]"])
+def test_malformed_input_raises(text):
+    with open("records.json", "w") as file:
+        file.write(text)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array("records.json", chunk_size=2))
+
+
+def test_passengers_are_filtered_while_streaming():
+    write("passengers.json", [
+        {"passenger_id": passenger_id, "name": f"P{passenger_id}", "age": 30, "gender": "Feminino",
+         "nationality": "PT" if passenger_id % 2 else "BR", "passport_number": f"1000000{passenger_id}",
+         "flight_id": None, "seat_class": None, "seat_number": None}
+        for passenger_id in range(1, 8)
+    ])
+    manager = PassengerManager(store=JsonStore("passengers.json", "passenger_id"))
+    manager.load_passengers(where=lambda record: record["nationality"] == "PT")
+    assert [p.passenger_id for p in manager.passengers] == [1, 3, 5, 7]
+    assert manager.partial_load
+    assert manager.id_counter == 8
+    manager.load_passengers()
+    assert len(manager.passengers) == 7 and not manager.partial_load
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from main import Flight, MenuSystem, Plane
+from timetable import PlaneSchedule, parse_time
+
+PLANE = Plane("A320", 1, 2, 4, 20)
+
+
+def flight(flight_id, departure, arrival, status="Agendado"):
+    return Flight(flight_id, "Lisboa", f"2026-01-01 {departure}", f"2026-01-01 {arrival}", PLANE, status)
+
+
+def window(start, end):
+    return parse_time(f"2026-01-01 {start}"), parse_time(f"2026-01-01 {end}")
+
+
+def test_conflict_with_disjoint_intervals():
+    schedule = PlaneSchedule()
+    schedule.rebuild([flight(1, "08:00", "09:00"), flight(2, "12:00", "13:00"), flight(3, "10:00", "11:00", "Cancelado")])
+    assert schedule.conflict(1, *window("08:30", "10:30")) == 1
+    assert schedule.conflict(1, *window("11:30", "12:30")) == 2
+    assert schedule.conflict(1, *window("09:00", "12:00")) is None
+    assert schedule.conflict(2, *window("08:00", "13:00")) is None
+
+
+def test_conflict_with_overlapping_loaded_flights():
+    # A long flight loaded from the file hides behind a shorter one that starts later
+    schedule = PlaneSchedule()
+    schedule.rebuild([flight(1, "08:00", "18:00"), flight(2, "09:00", "10:00")])
+    assert schedule.conflict(1, *window("11:00", "12:00")) == 1
+    assert [interval[2] for interval in schedule.busy_intervals(1, *window("11:00", "12:00"))] == [1]
+
+
+def test_overlap_added_after_load_is_detected():
+    schedule = PlaneSchedule()
+    schedule.rebuild([flight(2, "09:00", "10:00")])
+    schedule.add(flight(1, "08:00", "18:00"))
+    assert schedule.conflict(1, *window("11:00", "12:00")) == 1
+    schedule.remove(flight(1, "08:00", "18:00"))
+    assert schedule.conflict(1, *window("11:00", "12:00")) is None
+
+
+def flights_menu():
+    menu = MenuSystem()
+    menu.ensure_loaded("flights")
+    menu.plane_manager.register_plane("A320", 2, 4, 20)
+    for destination, hour in [("Lisboa", 12), ("Porto", 9), ("lisboa ", 8), ("Faro", 15), ("Lisboa", 18)]:
+        menu.flight_manager.register_flight(destination, f"2026-01-01 {hour}:00", f"2026-01-01 {hour}:30", 1)
+    return menu
+
+
+def test_flights_by_destination_and_departure_window():
+    flights = flights_menu().flight_manager
+    assert [f.flight_id for f in flights.find_flights("LISBOA")] == [3, 1, 5]
+    assert [f.flight_id for f in flights.find_flights(start="2026-01-01 09:00", end="2026-01-01 15:00")] == [2, 1, 4]
+    assert [f.flight_id for f in flights.find_flights("Lisboa", end="2026-01-01 12:00")] == [3, 1]
+    assert flights.find_flights("Madrid") == []
+    with pytest.raises(ValueError):
+        flights.find_flights(start="amanhã")
+
+
+def test_next_departures():
+    flights = flights_menu().flight_manager
+    assert [f.flight_id for f in flights.next_departures("2026-01-01 09:00", 2)] == [2, 1]
+    assert [f.flight_id for f in flights.next_departures("2026-01-01 09:00", 5, "lisboa")] == [1, 5]
+
+
+def test_schedule_follows_removals_and_reloads():
+    menu = flights_menu()
+    menu.flight_manager.delete_flight(1)
+    assert [f.flight_id for f in menu.flight_manager.find_flights("Lisboa")] == [3, 5]
+    reloaded = MenuSystem()
+    reloaded.ensure_loaded("flights")
+    assert [f.flight_id for f in reloaded.flight_manager.find_flights("Lisboa")] == [3, 5]
+
+
+def test_manager_rejects_a_plane_on_two_flights_at_once():
+    menu = MenuSystem()
+    menu.ensure_loaded("flights")
+    planes, flights = menu.plane_manager, menu.flight_manager
+    planes.register_plane("A320", 2, 4, 20)
+    planes.register_plane("A321", 2, 4, 20)
+    flights.register_flight("Lisboa", "2026-01-01 10:00", "2026-01-01 12:00", 1)
+    with pytest.raises(ValueError, match="voo 1"):
+        flights.register_flight("Porto", "2026-01-01 11:00", "2026-01-01 13:00", 1)
+    flights.register_flight("Porto", "2026-01-01 12:00", "2026-01-01 13:00", 1)
+    assert [plane.plane_id for plane in flights.free_planes("2026-01-01 11:00", "2026-01-01 11:30")] == [2]
+
+    # A cancelled flight frees its plane until it is reinstated
+    flights.set_flight_status(1, "Cancelado")
+    flights.register_flight("Faro", "2026-01-01 10:00", "2026-01-01 11:00", 1)
+    with pytest.raises(ValueError):
+        flights.set_flight_status(1, "Agendado")
+    assert flights.find_flight_by_id(1).status == "Cancelado"
+
+    utilization = {row["plane_id"]: row for row in flights.plane_utilization("2026-01-01 10:00", "2026-01-01 14:00")}
+    assert (utilization[1]["flights"], utilization[1]["busy_hours"], utilization[1]["utilization"]) == (2, 2.0, 0.5)
+    assert utilization[2]["flights"] == 0
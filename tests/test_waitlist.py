@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import ECONOMY, book, open_menu, populate
+from waitlist import Waitlist
+
+
+@pytest.fixture
+def seats():
+    return (0, 0, 1)
+
+
+def test_deleting_a_booked_passenger_promotes_the_waitlist(menu):
+    passengers = menu.passenger_manager
+    flight = menu.flight_manager.find_flight_by_id(1)
+    assert book(menu, 1)["ok"]
+    passengers.join_waitlist(2, 1, ECONOMY, menu.flight_manager)
+    passengers.delete_passenger(1, menu.flight_manager)
+    rui = passengers.find_passenger_by_id(2)
+    assert rui.flight_id == 1 and rui.seat_number is not None
+    assert 2 not in passengers.waitlist
+    assert flight.available_seats[ECONOMY] == 0
+    assert flight.seat_map.free_count(ECONOMY) == 0
+
+
+def test_deleting_a_booked_passenger_frees_the_seat(menu):
+    flight = menu.flight_manager.find_flight_by_id(1)
+    assert book(menu, 1)["ok"]
+    menu.passenger_manager.delete_passenger(1, menu.flight_manager)
+    assert flight.available_seats[ECONOMY] == 1
+    assert flight.seat_map.free_count(ECONOMY) == 1
+    assert book(menu, 2)["ok"]
+
+    reloaded = open_menu()
+    assert reloaded.flight_manager.find_flight_by_id(1).available_seats[ECONOMY] == 0
+
+
+def test_join_reports_the_position_in_priority_order():
+    waitlist = Waitlist("loyalty")
+    for passenger_id, loyalty in [(1, 0), (2, 3), (3, 1), (4, 3)]:
+        waitlist.add({"passenger_id": passenger_id, "flight_id": 1, "seat_class": ECONOMY,
+                      "requested_at": passenger_id, "loyalty": loyalty, "fare": 0})
+    assert [waitlist.position(passenger_id) for passenger_id in (2, 4, 3, 1)] == [1, 2, 3, 4]
+    waitlist.remove(2)
+    assert waitlist.position(1) == 3
+    assert waitlist.position(2) is None
+    assert [entry["passenger_id"] for entry in waitlist.waiting(1, ECONOMY)] == [4, 3, 1]
+
+
+def test_join_waitlist_returns_the_position(menu):
+    assert book(menu, 1)["ok"]
+    joined = [menu.passenger_manager.join_waitlist(passenger_id, 1, ECONOMY, menu.flight_manager)
+              for passenger_id in (2, 3)]
+    assert [entry["position"] for entry in joined] == [1, 2]
+
+
+def test_cancellation_promotes_by_priority_and_the_waitlist_is_persisted():
+    menu = populate(open_menu(waitlist_priority="loyalty"), (0, 0, 1))
+    passengers = menu.passenger_manager
+    assert book(menu, 1)["ok"]
+    with pytest.raises(ValueError):
+        passengers.join_waitlist(1, 1, ECONOMY, menu.flight_manager)
+    passengers.join_waitlist(2, 1, ECONOMY, menu.flight_manager)
+    passengers.join_waitlist(3, 1, ECONOMY, menu.flight_manager, loyalty=3)
+    passengers.join_waitlist(4, 1, ECONOMY, menu.flight_manager, loyalty=1)
+    passengers.leave_waitlist(4)
+
+    reloaded = open_menu(waitlist_priority="loyalty")
+    assert [entry["passenger_id"] for entry in reloaded.passenger_manager.waitlist.waiting(1, ECONOMY)] == [3, 2]
+    promoted = reloaded.passenger_manager.cancel_booking(1, reloaded.flight_manager)
+    assert [p.passenger_id for p in promoted] == [3]
+    assert reloaded.passenger_manager.waitlist.position(2) == 1
+
+
+def test_removing_the_flight_drops_its_waitlist(menu):
+    assert book(menu, 1)["ok"]
+    menu.passenger_manager.join_waitlist(2, 1, ECONOMY, menu.flight_manager)
+    menu.flight_manager.delete_flight(1, menu.passenger_manager)
+    assert len(menu.passenger_manager.waitlist) == 0
+    assert menu.passenger_manager.find_passenger_by_id(1).flight_id is None
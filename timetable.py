@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import bisect
+import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def parse_time(text):
+    # "YYYY-MM-DD HH:MM" -> seconds since 1970 (no time zone), None if invalid
+    try:
+        moment = datetime.datetime.strptime(str(text).strip(), TIME_FORMAT)
+    except ValueError:
+        return None
+    return int((moment - EPOCH).total_seconds())
+
+
+def format_time(timestamp):
+    return (EPOCH + datetime.timedelta(seconds=timestamp)).strftime(TIME_FORMAT)
+
+
+def destination_key(destination):
+    return " ".join(str(destination).split()).casefold()
+
+
+class FlightSchedule:
+    # Sorted (departure timestamp, flight id) lists, one over every flight and
+    # one per destination, so a departure window is two bisects and a slice.
+    # Flights whose departure time does not parse are left out.
+    def __init__(self):
+        self.departures = []
+        self.by_destination = {}
+
+    def __len__(self):
+        return len(self.departures)
+
+    def rebuild(self, flights):
+        # One sort per list instead of an insort per flight
+        self.departures = []
+        self.by_destination = {}
+        for flight in flights:
+            if flight.departure_ts is not None:
+                entry = (flight.departure_ts, flight.flight_id)
+                self.departures.append(entry)
+                self.by_destination.setdefault(destination_key(flight.destination), []).append(entry)
+        self.departures.sort()
+        for entries in self.by_destination.values():
+            entries.sort()
+
+    def add(self, flight):
+        if flight.departure_ts is None:
+            return
+        entry = (flight.departure_ts, flight.flight_id)
+        bisect.insort(self.departures, entry)
+        bisect.insort(self.by_destination.setdefault(destination_key(flight.destination), []), entry)
+
+    def remove(self, flight):
+        if flight.departure_ts is None:
+            return
+        entry = (flight.departure_ts, flight.flight_id)
+        self.discard(self.departures, entry)
+        key = destination_key(flight.destination)
+        entries = self.by_destination.get(key)
+        if entries is not None:
+            self.discard(entries, entry)
+            if not entries:
+                del self.by_destination[key]
+
+    @staticmethod
+    def discard(entries, entry):
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def between(self, destination=None, start=None, end=None, limit=None):
+        # Flight ids departing in [start, end], earliest first
+        if destination is None:
+            entries = self.departures
+        else:
+            entries = self.by_destination.get(destination_key(destination), [])
+        first = 0 if start is None else bisect.bisect_left(entries, (start,))
+        last = len(entries) if end is None else bisect.bisect_left(entries, (end + 1,))
+        if limit is not None:
+            last = min(last, first + limit)
+        return [flight_id for _, flight_id in entries[first:last]]
+
+
+CANCELLED_STATUSES = {"canceled", "cancelled", "cancelado"}
+
+
+def occupies_plane(flight):
+    return (flight.departure_ts is not None and flight.arrival_ts is not None
+            and str(flight.status).strip().casefold() not in CANCELLED_STATUSES)
+
+
+class PlaneSchedule:
+    # Busy intervals [departure, arrival) per plane, kept sorted. While a
+    # plane's intervals are disjoint (flights registered through the manager
+    # are checked first) a conflict is decided by the neighbours of a bisect;
+    # planes whose loaded or synced flights overlap are kept in overlapping
+    # and scanned instead. Cancelled flights and flights without valid times
+    # do not occupy their plane.
+    def __init__(self):
+        self.intervals = {}
+        self.overlapping = set()
+
+    def rebuild(self, flights):
+        self.intervals = {}
+        self.overlapping = set()
+        for flight in flights:
+            if occupies_plane(flight):
+                self.intervals.setdefault(flight.plane.plane_id, []).append((flight.departure_ts, flight.arrival_ts, flight.flight_id))
+        for plane_id, intervals in self.intervals.items():
+            intervals.sort()
+            if any(intervals[i][1] > intervals[i + 1][0] for i in range(len(intervals) - 1)):
+                self.overlapping.add(plane_id)
+
+    def add(self, flight):
+        if not occupies_plane(flight):
+            return
+        plane_id = flight.plane.plane_id
+        intervals = self.intervals.setdefault(plane_id, [])
+        interval = (flight.departure_ts, flight.arrival_ts, flight.flight_id)
+        position = bisect.bisect_left(intervals, interval)
+        intervals.insert(position, interval)
+        if ((position > 0 and intervals[position - 1][1] > interval[0])
+                or (position + 1 < len(intervals) and interval[1] > intervals[position + 1][0])):
+            self.overlapping.add(plane_id)
+
+    def remove(self, flight, plane_id=None):
+        plane_id = flight.plane.plane_id if plane_id is None else plane_id
+        intervals = self.intervals.get(plane_id)
+        if not intervals or flight.departure_ts is None:
+            return
+        position = bisect.bisect_left(intervals, (flight.departure_ts,))
+        while position < len(intervals) and intervals[position][0] == flight.departure_ts:
+            if intervals[position][2] == flight.flight_id:
+                del intervals[position]
+                break
+            position += 1
+        if not intervals:
+            del self.intervals[plane_id]
+            self.overlapping.discard(plane_id)
+
+    def conflict(self, plane_id, start, end):
+        # Id of a flight using the plane somewhere in [start, end), or None
+        intervals = self.intervals.get(plane_id)
+        if not intervals:
+            return None
+        if plane_id in self.overlapping:
+            busy = self.busy_intervals(plane_id, start, end)
+            return busy[0][2] if busy else None
+        position = bisect.bisect_left(intervals, (end,))
+        if position > 0 and intervals[position - 1][1] > start:
+            return intervals[position - 1][2]
+        return None
+
+    def busy_intervals(self, plane_id, start, end):
+        # (start, end, flight_id) of every interval overlapping [start, end)
+        intervals = self.intervals.get(plane_id, [])
+        if plane_id in self.overlapping:
+            position = 0
+        else:
+            position = max(bisect.bisect_left(intervals, (start,)) - 1, 0)
+        found = []
+        while position < len(intervals) and intervals[position][0] < end:
+            if intervals[position][1] > start:
+                found.append(intervals[position])
+            position += 1
+        return found
+
+    def utilization(self, plane_id, start, end):
+        # (flights, busy seconds) inside [start, end)
+        busy = self.busy_intervals(plane_id, start, end)
+        return len(busy), sum(min(stop, end) - max(begin, start) for begin, stop, _ in busy)
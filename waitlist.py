@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+
+# Sort keys for waitlist entries; smaller comes first. fare and loyalty are
+# ranks where higher is better (e.g. fare 2 = flexible, loyalty 3 = gold).
+WAITLIST_PRIORITIES = {
+    "request_time": lambda entry: (entry["requested_at"],),
+    "fare_class": lambda entry: (-entry["fare"], entry["requested_at"]),
+    "loyalty": lambda entry: (-entry["loyalty"], entry["requested_at"]),
+}
+
+
+class Waitlist:
+    # One heap per (flight, seat class). Leaving the list only forgets the
+    # entry; its stale heap item is skipped when it reaches the top, so join,
+    # leave and promote are all O(log n).
+    def __init__(self, priority="request_time"):
+        if priority not in WAITLIST_PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}. Opções: {', '.join(WAITLIST_PRIORITIES)}.")
+        self.priority = priority
+        self.priority_key = WAITLIST_PRIORITIES[priority]
+        self.queues = {}
+        self.entries = {}
+        self.sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, passenger_id):
+        return passenger_id in self.entries
+
+    def add(self, entry):
+        sequence = next(self.sequence)
+        self.entries[entry["passenger_id"]] = (sequence, entry)
+        queue = self.queues.setdefault((entry["flight_id"], entry["seat_class"]), [])
+        heapq.heappush(queue, (self.priority_key(entry), sequence, entry["passenger_id"]))
+
+    def get(self, passenger_id):
+        found = self.entries.get(passenger_id)
+        return found[1] if found else None
+
+    def remove(self, passenger_id):
+        found = self.entries.pop(passenger_id, None)
+        return found[1] if found else None
+
+    def is_live(self, item):
+        found = self.entries.get(item[2])
+        return found is not None and found[0] == item[1]
+
+    def peek(self, flight_id, seat_class):
+        queue = self.queues.get((flight_id, seat_class))
+        while queue and not self.is_live(queue[0]):
+            heapq.heappop(queue)
+        if not queue:
+            self.queues.pop((flight_id, seat_class), None)
+            return None
+        return self.entries[queue[0][2]][1]
+
+    def pop(self, flight_id, seat_class):
+        entry = self.peek(flight_id, seat_class)
+        if entry is not None:
+            heapq.heappop(self.queues[(flight_id, seat_class)])
+            self.remove(entry["passenger_id"])
+        return entry
+
+    def position(self, passenger_id):
+        # 1-based place in the passenger's queue: one pass counting the live
+        # entries that rank ahead, without sorting the queue
+        found = self.entries.get(passenger_id)
+        if found is None:
+            return None
+        sequence, entry = found
+        rank = (self.priority_key(entry), sequence)
+        queue = self.queues.get((entry["flight_id"], entry["seat_class"]), [])
+        return 1 + sum(1 for item in queue if item[:2] < rank and self.is_live(item))
+
+    def waiting(self, flight_id, seat_class):
+        # Live entries in promotion order (a sorted copy; the heap is untouched)
+        queue = self.queues.get((flight_id, seat_class), [])
+        return [self.entries[item[2]][1] for item in sorted(queue) if self.is_live(item)]
+
+    def drop_flight(self, flight_id):
+        dropped = []
+        for key in [key for key in self.queues if key[0] == flight_id]:
+            for item in self.queues.pop(key):
+                if self.is_live(item):
+                    dropped.append(self.remove(item[2]))
+        return dropped
+
+    def records(self):
+        return [entry for _, entry in self.entries.values()]